@@ -4,16 +4,37 @@ from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
 from datetime import timedelta
-from environment import SECRET_KEY, DATABASE_URL, JWT_SECRET_KEY, ADMIN_NAME, ADMIN_ID, PASSWORD, SQLALCHEMY_TRACK_MODIFICATIONS, TOKEN_EXPIRY
+from sqlalchemy import inspect
+from environment import SECRET_KEY, DATABASE_URL, JWT_SECRET_KEY, ADMIN_NAME, ADMIN_ID, PASSWORD, SQLALCHEMY_TRACK_MODIFICATIONS, TOKEN_EXPIRY, AUTO_MIGRATE, EMAIL_OUTBOX_ENABLED, JSON_PROVIDER
+from environment import RATE_LIMIT_ENABLED, RATE_LIMITS, RATE_LIMIT_URL, RATE_LIMIT_PROXY_HOPS
+from utils.metrics import InstrumentedQueuePool
 import atexit
+import click
 
 # Initialize extensions
 db = SQLAlchemy()
 jwt = JWTManager()
 bcrypt = Bcrypt()
 
+def ensure_admin_user():
+    """Create the default admin user if not exists"""
+    from models.user import User
+    admin = User.query.filter_by(email=ADMIN_ID).first()
+    if not admin:
+        admin_user = User(
+            user_name=ADMIN_NAME,
+            email=ADMIN_ID,
+            password=PASSWORD,
+            is_admin=True
+        )
+        db.session.add(admin_user)
+        db.session.commit()
+
 def create_app():
     app = Flask(__name__)
+    if JSON_PROVIDER == 'orjson':
+        from utils.json_provider import FastJSONProvider
+        app.json = FastJSONProvider(app)
     # CORS(app, resources={r"/api/*": {"origins": "https://www.bkkprintsvc.com"}})
     CORS(app, resources={"/api/*": {"origins": ["https://www.bkkprintsvc.com", "http://localhost:5173"]}})
     # Configuration
@@ -23,7 +44,9 @@ def create_app():
         'pool_recycle': 300,
         'pool_pre_ping': True,
         'pool_size': 10,
-        'max_overflow': 20
+        'max_overflow': 20,
+        # QueuePool that also records checkout wait time for /metrics
+        'poolclass': InstrumentedQueuePool
     }
     app.config['JWT_SECRET_KEY'] = JWT_SECRET_KEY
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=int(TOKEN_EXPIRY))
@@ -32,6 +55,8 @@ def create_app():
     # Initialize extensions with app
     db.init_app(app)
     jwt.init_app(app)
+    from services.principal_service import PrincipalService
+    jwt.token_in_blocklist_loader(PrincipalService.is_token_revoked)
     bcrypt.init_app(app)
     CORS(app)
     
@@ -43,6 +68,7 @@ def create_app():
     from controllers.receipt_item_controller import receipt_item_bp
     from controllers.dashboard_controller import dashboard_bp
     from controllers.scheduler_controller import scheduler_bp
+    from controllers.metrics_controller import metrics_bp, prometheus_bp
     @app.route("/")
     def home():
         return "Welcome!"
@@ -53,23 +79,62 @@ def create_app():
     app.register_blueprint(receipt_bp, url_prefix='/api/receipts')
     app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
     app.register_blueprint(scheduler_bp, url_prefix='/api/scheduler')
+    app.register_blueprint(metrics_bp, url_prefix='/api/metrics')
+    app.register_blueprint(prometheus_bp)
     
     # Create tables
     with app.app_context():
+        from utils.query_counter import init_query_counter
+        init_query_counter(app, db.engine)
+        from utils.metrics import init_metrics
+        init_metrics(app, db.engine)
+        if RATE_LIMIT_ENABLED:
+            from utils.rate_limit import init_rate_limiter, parse_rules
+            init_rate_limiter(app, parse_rules(RATE_LIMITS), RATE_LIMIT_URL, RATE_LIMIT_PROXY_HOPS)
+        # A database built from scratch by create_all already has every migration's schema
+        fresh = not inspect(db.engine).has_table('users')
         db.create_all()
-        
-        # Create default admin user if not exists
-        from models.user import User
-        admin = User.query.filter_by(email=ADMIN_ID).first()
-        if not admin:
-            admin_user = User(
-                user_name=ADMIN_NAME,
-                email=ADMIN_ID,
-                password=PASSWORD,
-                is_admin=True
-            )
-            db.session.add(admin_user)
-            db.session.commit()
+        from services.migration_service import MigrationService
+        if fresh:
+            MigrationService.stamp()
+        elif AUTO_MIGRATE:
+            # Bring existing databases up to date (indexes etc. that create_all never adds)
+            applied, error = MigrationService.upgrade()
+            if error:
+                print("❌ Schema migration failed:", error)
+            elif applied:
+                print("✅ Applied schema migrations:", ', '.join(applied))
+
+        # The models may reference columns a pending migration adds; `flask db-upgrade` creates the admin then
+        pending = [migration.VERSION for migration in MigrationService.pending()]
+        if pending:
+            print("⚠️ Schema migrations pending:", ', '.join(pending), "- run `flask db-upgrade`")
+        else:
+            ensure_admin_user()
+    @app.cli.command('rebuild-sales-rollup')
+    @click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), default=None)
+    @click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), default=None)
+    def rebuild_sales_rollup(start_date, end_date):
+        """Backfill the daily_product_sales rollup from receipts"""
+        from services.sales_rollup_service import SalesRollupService
+        rows, error = SalesRollupService.rebuild(
+            start_date.date() if start_date else None,
+            end_date.date() if end_date else None
+        )
+        if error:
+            raise click.ClickException(error)
+        click.echo(f"Rebuilt daily_product_sales ({rows} rows)")
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade():
+        """Apply pending schema migrations"""
+        from services.migration_service import MigrationService
+        applied, error = MigrationService.upgrade()
+        if error:
+            raise click.ClickException(error)
+        ensure_admin_user()
+        click.echo(f"Applied migrations: {', '.join(applied) or 'none pending'}")
+
     # Initialize and start scheduler
     global scheduler_service
     from services.scheduler_service import SchedulerService
@@ -78,5 +143,20 @@ def create_app():
     
     # Shutdown scheduler when app stops
     atexit.register(lambda: scheduler_service.stop() if scheduler_service else None)
+
+    # Worker pool for background dashboard reports
+    global report_job_service
+    from services.report_job_service import ReportJobService
+    report_job_service = ReportJobService(app)
+    atexit.register(report_job_service.stop)
+
+    # Background sender for queued emails
+    global email_outbox_service
+    email_outbox_service = None
+    if EMAIL_OUTBOX_ENABLED:
+        from services.email_outbox_service import EmailOutboxService
+        email_outbox_service = EmailOutboxService(app)
+        email_outbox_service.start()
+        atexit.register(email_outbox_service.stop)
     
     return app
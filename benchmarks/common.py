@@ -0,0 +1,35 @@
+"""Shared setup for the benchmark scripts: a throwaway SQLite database and a seeded catalog"""
+import os
+import tempfile
+
+# Configure a disposable database before the app (and environment.py) are imported
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'benchmark.db'))
+os.environ.setdefault('TAX_RATE', '0.07')
+os.environ.setdefault('ADMIN_NAME', 'benchmark')
+os.environ.setdefault('ADMIN_ID', 'benchmark@example.com')
+os.environ.setdefault('PASSWORD', 'benchmark')
+os.environ.setdefault('DASHBOARD_CACHE_ENABLED', 'false')
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+
+from app import create_app, db
+
+
+def create_benchmark_app():
+    return create_app()
+
+
+def seed_products(admin_id, count=20):
+    """Create ``count`` products and return their ids"""
+    from models.product import Product
+    products = [
+        Product(name=f"Service {i:02d}", unit_price=5 + i, created_by=admin_id)
+        for i in range(count)
+    ]
+    db.session.add_all(products)
+    db.session.commit()
+    return [product.prod_id for product in products]
+
+
+def admin_user_id():
+    from models.user import User
+    return User.query.filter_by(email=os.environ['ADMIN_ID']).first().user_id
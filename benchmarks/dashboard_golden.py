@@ -0,0 +1,321 @@
+"""Checks that both dashboard engines return what the original row-by-row pipeline returned.
+
+Seeds a throwaway database with benchmarks.datagen plus edge cases (receipts
+without items, deleted items, a product named like the package, items dated
+differently from their receipt), then compares the columnar pandas engine and
+the SQL engine (with and without the daily_product_sales rollup) with the
+reference below for every period and package. Values must match in type,
+floats within 1e-9:
+
+    python -m benchmarks.dashboard_golden --receipts 3000
+
+Exits non-zero on any difference. The reference is the pipeline as it was
+before the vectorized rewrite: ORM receipts serialized with to_dict, item
+frames built from those dicts, and the previous period read the same way.
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+PACKAGES = ['Full Package', 'Customer Convenience Package']
+
+
+def reference_dashboard_data(start_date, end_date, package, currency, period="today"):
+    """The original pandas dashboard, less its logging and the column drops that did not affect the output"""
+    import pandas as pd
+    from flask import jsonify
+    from models.receipt import Receipt
+    from models.loaders import receipt_list_options
+    from services.dashboard_aggregates import DashboardAggregateService
+    from services.dashboard_services import DashboardService
+
+    response = {"status": False, "message": "Something went wrong", "data": None}
+    report_link = DashboardService.report_link(period, start_date, end_date)
+    start_date, end_date, window, error = DashboardService.resolve_date_window(start_date, end_date)
+    if error:
+        response["message"] = error
+        return jsonify(response, 400)
+    receipts = Receipt.query.options(*receipt_list_options()).filter_by(deleted_at=None).filter(
+        *DashboardAggregateService.window_filters(window)
+    ).order_by(Receipt.created_at.desc()).all()
+    receipts = [r.to_dict() for r in receipts]
+    if not receipts:
+        response["message"] = "No records available for the selected time period"
+        return jsonify(response, 204)
+
+    receipt_df = pd.DataFrame(receipts)
+    items = []
+    for r in receipts:
+        for itm in r['items']:
+            itm["receipt_number"] = r['receipt_number']
+        items.extend(r["items"])
+    items_df = pd.DataFrame(items)
+    full_pkg = receipt_df[receipt_df["package"] == package].rename(
+        columns={"package": "product_name", "gross_amount": "std_price"}
+    ).reset_index(drop=True)
+    tmp_df = items_df[items_df['receipt_id'].isin(full_pkg['receipt_id'])]
+    tmp_df = tmp_df.drop_duplicates(subset=['receipt_id'], keep='first').reset_index(drop=True)
+    full_pkg = full_pkg.merge(tmp_df[['receipt_id', 'created_at']], on='receipt_id', how='inner', suffixes=('', '_from_df1'))
+    full_pkg['created_at'] = full_pkg['created_at_from_df1']
+    full_pkg.drop(columns=['created_at_from_df1'], inplace=True)
+    items_df = items_df[~items_df['receipt_number'].isin(full_pkg['receipt_number'])]
+    merged_df = pd.concat([items_df, full_pkg], ignore_index=True, sort=False)
+    merged_df["quantity"] = merged_df["quantity"].fillna(1)
+    cond = merged_df["product_name"] == package
+    merged_df.loc[cond, "total_std_price"] = merged_df.loc[cond, "std_price"]
+    merged_df.loc[cond, "total_vend_price"] = merged_df.loc[cond, "std_price"]
+    merged_df.loc[cond, "vend_price"] = merged_df.loc[cond, "std_price"]
+
+    totalReceipts = receipt_df.shape[0]
+    totalRevenue = receipt_df['gross_amount'].sum()
+    totalStdRevenue = merged_df["total_std_price"].sum()
+    totalProducts = merged_df["quantity"].sum()
+    uniqueProducts = merged_df["product_name"].nunique()
+    uniqueProductslist = merged_df["product_name"].unique().tolist()
+    productRevenue = (
+        merged_df.groupby("product_name")
+        .agg(revenue=("total_vend_price", "sum"), quantity=("quantity", "sum"))
+        .reset_index().rename(columns={"product_name": "name"}).to_dict("records")
+    )
+    priceComparison = (
+        merged_df.groupby("product_name")
+        .agg(std_price=("std_price", "mean"), vend_price=("vend_price", "mean"))
+        .reset_index().rename(columns={"product_name": "name"}).to_dict("records")
+    )
+    merged_df['created_at'] = pd.to_datetime(merged_df['created_at'])
+    merged_df["period_group"] = merged_df["created_at"].dt.strftime("%Y-%m-%d %H:%M")
+    revenueOverTime = (
+        merged_df.groupby("period_group")
+        .agg(revenue=("total_vend_price", "sum"), receipts=("receipt_number", pd.Series.nunique))
+        .reset_index().rename(columns={"period_group": "date"}).to_dict("records")
+    )
+
+    prev_receipts = []
+    if start_date and end_date:
+        prev_start, prev_end = DashboardService.previous_period_range(start_date, end_date)
+        prev_receipts = [r.to_dict() for r in Receipt.query.options(*receipt_list_options()).filter(
+            Receipt.deleted_at.is_(None), Receipt.created_at >= prev_start, Receipt.created_at < prev_end
+        ).all()]
+    if prev_receipts:
+        prev_df = pd.DataFrame([item for r in prev_receipts for item in r["items"]])
+        prev_totalRevenue = prev_df["total_vend_price"].sum()
+        prev_totalReceipts = len(prev_receipts)
+        prev_totalProducts = prev_df["quantity"].sum()
+        prev_uniqueProducts = prev_df["product_name"].nunique()
+        prev_productRevenue = (
+            prev_df.groupby("product_name")
+            .agg(revenue=("total_vend_price", "sum"), quantity=("quantity", "sum"))
+            .reset_index().rename(columns={"product_name": "name"}).to_dict("records")
+        )
+    else:
+        prev_totalRevenue = prev_totalReceipts = prev_totalProducts = prev_uniqueProducts = 0
+        prev_productRevenue = []
+    product_comparison = DashboardService.periodic_product_revenue(productRevenue, prev_productRevenue)
+    revenueTrend = DashboardService.calc_trend(totalRevenue, prev_totalRevenue)
+    receiptsTrend = DashboardService.calc_trend(totalReceipts, prev_totalReceipts)
+    productTrend = DashboardService.calc_trend(totalProducts, prev_totalProducts)
+    uniqueProductTrend = DashboardService.calc_trend(uniqueProducts, prev_uniqueProducts)
+    growthTrend = DashboardService.calc_growth_trend(revenueTrend, receiptsTrend, productTrend, uniqueProductTrend)
+
+    items = []
+    for r in receipts:
+        for itm in r['items']:
+            itm["receipt_number"] = r['receipt_number']
+            itm["created_at"] = r['created_at']
+            itm["package"] = r['package']
+        items.extend(r["items"])
+    items_df = pd.DataFrame(items)
+    full_pkg = receipt_df[receipt_df["package"] == package].rename(
+        columns={"package": "product_name", "package_amt": "std_price"}
+    )
+    full_pkg['package'] = full_pkg['product_name']
+    merged_df = pd.concat([items_df, full_pkg], ignore_index=True, sort=False)
+    merged_df["quantity"] = merged_df["quantity"].fillna(1)
+    cond = merged_df["product_name"] == package
+    merged_df.loc[cond, "total_std_price"] = merged_df.loc[cond, "std_price"]
+    merged_df.loc[cond, "total_vend_price"] = merged_df.loc[cond, "std_price"]
+    merged_df.loc[cond, "vend_price"] = merged_df.loc[cond, "std_price"]
+    df_qt = merged_df.pivot_table(index=["receipt_number", "created_at"], columns="product_name",
+                                  values="quantity", aggfunc="sum", fill_value=0).reset_index()
+    df_prc = merged_df.pivot_table(index=["receipt_number", "created_at"], columns="product_name",
+                                   values="total_vend_price", aggfunc="sum", fill_value=0).reset_index()
+    if package in df_prc.columns:
+        df_prc2 = df_prc[df_prc[package] != 0]
+        df_prc1 = df_prc[df_prc[package] == 0]
+        df_prc1 = df_prc1[~df_prc1['receipt_number'].isin(df_prc2['receipt_number'])]
+        df_prc = pd.concat([df_prc1, df_prc2], ignore_index=True, sort=False)
+    df_prc = df_prc.sort_values(by='created_at', ascending=True)
+    df_qt = df_qt.sort_values(by='created_at', ascending=True)
+
+    response["status"] = True
+    response["message"] = "Dashboard data generated successfully"
+    response["data"] = {
+        "period": period,
+        "totalReceipts": totalReceipts,
+        "totalRevenue": totalRevenue,
+        "prev_totalRevenue": prev_totalRevenue,
+        "totalStdRevenue": totalStdRevenue,
+        "totalProducts": totalProducts,
+        "uniqueProducts": uniqueProducts,
+        "productRevenue": productRevenue,
+        "product_comparison": product_comparison,
+        "revenueOverTime": revenueOverTime,
+        "priceComparison": priceComparison,
+        "revenueTrend": revenueTrend,
+        "receiptsTrend": receiptsTrend,
+        "productTrend": productTrend,
+        "uniqueProductTrend": uniqueProductTrend,
+        "growthTrend": growthTrend,
+        "quantity_report": df_qt.to_dict('records'),
+        "revenue_report": df_prc.to_dict('records'),
+        "uniqueProductslist": uniqueProductslist,
+        "sales_report": report_link
+    }
+    response['period'] = period
+    return jsonify(response, 200)
+
+
+def seed_edge_cases(admin_id):
+    """Receipts the generator never produces"""
+    from app import db
+    from models import Receipt, ReceiptItem, Product
+    from services.product_catalog import product_catalog
+    from services.sales_rollup_service import SalesRollupService
+
+    products = Product.query.limit(3).all()
+    named_like_package = Product(name='Full Package', unit_price=Decimal(40), created_by=admin_id)
+    db.session.add(named_like_package)
+    product_catalog.bump()
+    db.session.commit()
+    now = datetime.now()
+
+    def receipt(package, amount, lines, created_at, items_created_at=None, deleted_lines=()):
+        row = Receipt(package=package, package_amt=Decimal(amount), total_std_amount=Decimal(0),
+                      total_vend_amount=Decimal(0), tax_amount=Decimal(0), gross_amount=Decimal(amount) + 7,
+                      created_by=admin_id, recipient_number=None, recipient_name='Edge case',
+                      payment_mode='CASH', transaction_number=None)
+        row.receipt_id = str(uuid.uuid4())
+        row.receipt_number = 'EDGE-' + uuid.uuid4().hex[:8].upper()
+        row.created_at = row.updated_at = created_at
+        db.session.add(row)
+        for n, (product, quantity) in enumerate(lines):
+            item = ReceiptItem(row.receipt_id, product.prod_id, False, quantity, product.unit_price, Decimal('3.5'))
+            item.created_at = item.updated_at = items_created_at or created_at
+            item.deleted_at = created_at if n in deleted_lines else None
+            db.session.add(item)
+
+    receipt('Full Package', 150, [], now - timedelta(hours=1))
+    receipt('Standard', 0, [], now - timedelta(hours=2))
+    receipt('Standard', 0, [(named_like_package, 2), (products[0], 1)], now - timedelta(hours=3))
+    receipt('Full Package', 120, [(named_like_package, 1), (products[1], 3)], now - timedelta(hours=4),
+            items_created_at=now - timedelta(hours=4) + timedelta(minutes=3))
+    receipt('Customer Convenience Package', 90, [(products[2], 2), (products[0], 1)],
+            now - timedelta(hours=5), deleted_lines=(0,))
+    receipt('Full Package', 80, [(products[2], 2), (products[1], 1)], now - timedelta(days=2), deleted_lines=(0, 1))
+    db.session.commit()
+    product_catalog.refresh()
+    # The receipts above bypass ReceiptService, so bring the rollup up to date
+    rollup_rows, error = SalesRollupService.rebuild()
+    if error:
+        raise RuntimeError(error)
+
+
+def normalized(response):
+    """Decoded JSON body; NaN (the stdlib provider's encoding of a missing name) becomes None like orjson's"""
+    def clean(value):
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        if isinstance(value, dict):
+            return {key: clean(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [clean(item) for item in value]
+        return value
+    return clean(json.loads(response.get_data()))
+
+
+def differences(expected, actual, path=''):
+    """Paths where ``actual`` differs from ``expected``, in type, keys and order, or value (floats within 1e-9)"""
+    if isinstance(expected, float) and isinstance(actual, float):
+        return [] if math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-9) else [f"{path}: {expected!r} != {actual!r}"]
+    if type(expected) is not type(actual):
+        return [f"{path}: {type(expected).__name__} != {type(actual).__name__}"]
+    if isinstance(expected, dict):
+        if list(expected) != list(actual):
+            return [f"{path}: keys {list(expected)} != {list(actual)}"]
+        return [diff for key in expected for diff in differences(expected[key], actual[key], f"{path}.{key}")]
+    if isinstance(expected, list):
+        if len(expected) != len(actual):
+            return [f"{path}: {len(expected)} != {len(actual)} entries"]
+        return [diff for n, (a, b) in enumerate(zip(expected, actual)) for diff in differences(a, b, f"{path}[{n}]")]
+    return [] if expected == actual else [f"{path}: {expected!r} != {actual!r}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--receipts', type=int, default=3000)
+    args = parser.parse_args()
+
+    from benchmarks.common import create_benchmark_app, admin_user_id
+    from benchmarks.datagen import generate
+    from controllers.dashboard_controller import _dashboard_request_params
+    from services.dashboard_services import DashboardService
+    import services.sales_rollup_service as sales_rollup_service
+
+    def sql_engine(use_rollup):
+        def build(start_date, end_date, package, currency, period):
+            sales_rollup_service.DASHBOARD_USE_ROLLUP = use_rollup
+            return DashboardService.get_dashboard_data(start_date, end_date, package, currency, period, engine='sql')
+        return build
+
+    engines = [
+        ('columnar', DashboardService.get_dashboard_data_pandas),
+        ('sql', sql_engine(False)),
+        ('sql+rollup', sql_engine(True)),
+    ]
+
+    app = create_benchmark_app()
+    cases = [{'period': period, 'package': package}
+             for period in ['today', '7', '30', 'year', 'all'] for package in PACKAGES]
+    cases.append({'period': 'custom', 'start_date': (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d'),
+                  'end_date': (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')})
+    cases.append({'period': 'custom', 'start_date': '2000-01-01', 'end_date': '2000-01-02'})
+
+    failures = 0
+    with app.app_context():
+        # The services print progress; keep it out of the results
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            generate(receipts=args.receipts)
+            seed_edge_cases(admin_user_id())
+        for case in cases:
+            results = []
+            for build in [reference_dashboard_data] + [build for _, build in engines]:
+                with app.test_request_context('/api/dashboard/dashboard-data'):
+                    start_date, end_date, period, package, currency = _dashboard_request_params(case)
+                    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                        started = time.perf_counter()
+                        response = build(start_date, end_date, package, currency, period)
+                        elapsed = time.perf_counter() - started
+                    results.append((normalized(response), elapsed))
+            (expected, reference_s), actual = results[0], results[1:]
+            label = ' '.join(f"{key}={value}" for key, value in case.items())
+            print(f"{label} (reference {reference_s * 1000:.1f} ms)")
+            for (name, _), (result, elapsed) in zip(engines, actual):
+                diffs = differences(expected, result)
+                failures += bool(diffs)
+                print(f"  {'ok  ' if not diffs else 'FAIL'} {name:<12} {elapsed * 1000:8.1f} ms")
+                for diff in diffs[:10]:
+                    print('       ' + diff)
+    if failures:
+        print(f"{failures} engine results differ from the reference pipeline")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Synthetic receipt data for the benchmarks.
+
+Seeds users, products, receipts and items spread over the last ``days`` days:
+Standard, "Full Package" and "Customer Convenience Package" receipts, free
+items and soft-deleted receipts, with amounts computed the way
+ReceiptService.create_receipt computes them. Deterministic for a given seed.
+
+Seed a standalone database (seeding the same one again needs another --seed):
+    python -m benchmarks.datagen --database-url sqlite:////tmp/bench.db --receipts 20000
+"""
+import argparse
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+PACKAGES = ['Standard', 'Standard', 'Full Package', 'Customer Convenience Package']
+PAYMENT_MODES = ['CASH', 'CARD', 'QR']
+SERVICES = ['Print A4', 'Print A3', 'Scan', 'Lamination', 'Binding', 'Photo', 'Copy', 'Fax', 'Typing', 'Translation']
+
+
+def generate(users=3, products=20, receipts=2000, max_items=5, days=400,
+             free_ratio=0.1, delete_ratio=0.05, seed=7, chunk_size=500):
+    """Insert the synthetic data (inside an app context) and return the counts per table"""
+    from app import db
+    from models import User, Product, Receipt, ReceiptItem
+    from services.sales_rollup_service import SalesRollupService
+    from services.product_catalog import product_catalog
+    from environment import TAX_RATE
+
+    rng = random.Random(seed)
+    tax_rate = Decimal(str(TAX_RATE))
+    now = datetime.now()
+
+    admin = User.query.filter_by(is_admin=True).first()
+    cashiers = [admin]
+    for i in range(users):
+        user = User(user_name=f"Cashier {i:02d}", email=f"cashier{i:02d}.{seed}@example.com",
+                    password=f"cashier-{i}", created_by=admin.user_id)
+        cashiers.append(user)
+    db.session.add_all(cashiers[1:])
+
+    catalog = []
+    for i in range(products):
+        catalog.append(Product(
+            name=f"{SERVICES[i % len(SERVICES)]} {i // len(SERVICES) + 1}",
+            unit_price=Decimal(rng.randint(2, 60)),
+            created_by=admin.user_id,
+            created_at=now - timedelta(days=days + 1, seconds=products - i)
+        ))
+    db.session.add_all(catalog)
+    product_catalog.bump()
+    db.session.commit()
+
+    item_count = 0
+    deleted_count = 0
+    for offset in range(0, receipts, chunk_size):
+        for _ in range(min(chunk_size, receipts - offset)):
+            created_at = now - timedelta(days=rng.randint(0, days), seconds=rng.randint(0, 86399))
+            created_at = min(created_at, now - timedelta(seconds=1))
+            package = rng.choice(PACKAGES)
+            package_amt = Decimal(rng.randint(100, 300)) if package != 'Standard' else Decimal('0')
+
+            items = []
+            total_vend = Decimal('0.00')
+            total_std = Decimal('0.00')
+            for product in rng.sample(catalog, rng.randint(1, min(max_items, len(catalog)))):
+                is_free = rng.random() < free_ratio
+                quantity = rng.randint(1, 5)
+                vendor_price = Decimal(rng.randint(1, 60))
+                if not is_free:
+                    total_vend += vendor_price * quantity
+                    total_std += product.unit_price * quantity
+                items.append(ReceiptItem(None, product.prod_id, is_free, quantity, product.unit_price, vendor_price))
+
+            tax_amount = total_vend * tax_rate
+            gross_amount = total_vend + tax_amount
+            if package == 'Full Package':
+                tax_amount = package_amt * tax_rate
+                gross_amount = package_amt
+            receipt = Receipt(
+                package=package, package_amt=package_amt, total_std_amount=total_std,
+                total_vend_amount=total_vend, tax_amount=tax_amount, gross_amount=gross_amount,
+                created_by=rng.choice(cashiers).user_id, recipient_number=None,
+                recipient_name=f"Customer {rng.randint(1, 5000)}", payment_mode=rng.choice(PAYMENT_MODES),
+                transaction_number=None
+            )
+            receipt.receipt_id = str(uuid.uuid4())
+            receipt.receipt_number = f"IN-{created_at.strftime('%d%m%Y')}-{uuid.UUID(int=rng.getrandbits(128)).hex[:8].upper()}"
+            receipt.created_at = receipt.updated_at = created_at
+            deleted_at = None
+            if rng.random() < delete_ratio:
+                deleted_at = created_at + timedelta(minutes=rng.randint(1, 120))
+                deleted_count += 1
+            receipt.deleted_at = deleted_at
+            for item in items:
+                item.receipt_id = receipt.receipt_id
+                item.created_at = item.updated_at = created_at
+                item.deleted_at = deleted_at
+            item_count += len(items)
+            db.session.add(receipt)
+            db.session.add_all(items)
+        db.session.commit()
+
+    rollup_rows, error = SalesRollupService.rebuild()
+    if error:
+        raise RuntimeError(error)
+    product_catalog.refresh()
+    return {
+        'users': len(cashiers) - 1,
+        'products': len(catalog),
+        'receipts': receipts,
+        'deleted_receipts': deleted_count,
+        'receipt_items': item_count,
+        'rollup_rows': rollup_rows
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='database to seed (defaults to a throwaway SQLite file)')
+    parser.add_argument('--users', type=int, default=3)
+    parser.add_argument('--products', type=int, default=20)
+    parser.add_argument('--receipts', type=int, default=2000)
+    parser.add_argument('--max-items', type=int, default=5)
+    parser.add_argument('--days', type=int, default=400)
+    parser.add_argument('--free-ratio', type=float, default=0.1)
+    parser.add_argument('--delete-ratio', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+
+    from benchmarks.common import create_benchmark_app
+    app = create_benchmark_app()
+    with app.app_context():
+        counts = generate(args.users, args.products, args.receipts, args.max_items, args.days,
+                          args.free_ratio, args.delete_ratio, args.seed)
+    print(', '.join(f"{name}: {count}" for name, count in counts.items()))
+    print(f"Seeded {os.environ['DATABASE_URL']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Checks that the hot receipt queries are planned on the composite indexes.
+
+Run with ``python -m benchmarks.explain_hot_queries``; exits non-zero when a
+query's plan does not mention its expected index. Set DATABASE_URL to check a
+MySQL / PostgreSQL database instead of the throwaway SQLite one.
+"""
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import create_benchmark_app, seed_products, admin_user_id, db
+from sqlalchemy import text
+
+
+def hot_queries(admin_id):
+    from models.receipt import Receipt
+    from models.receipt_item import ReceiptItem
+    now = datetime.now()
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        ('dashboard / previous period range', 'ix_receipts_deleted_at_created_at',
+         Receipt.query.filter(Receipt.deleted_at.is_(None),
+                              Receipt.created_at >= now - timedelta(days=30),
+                              Receipt.created_at <= now)),
+        ('scheduler daily receipts', 'ix_receipts_deleted_at_created_at',
+         Receipt.query.filter(Receipt.created_at >= day_start,
+                              Receipt.created_at < day_start + timedelta(days=1),
+                              Receipt.deleted_at.is_(None))),
+        ("cashier's receipts, newest first", 'ix_receipts_created_by_created_at',
+         Receipt.query.filter(Receipt.created_by == admin_id, Receipt.deleted_at.is_(None))
+         .order_by(Receipt.created_at.desc()).limit(10)),
+        ('receipt items of a receipt', 'ix_receipt_items_receipt_id',
+         ReceiptItem.query.filter(ReceiptItem.receipt_id == 'receipt-id')),
+    ]
+
+
+def explain(query):
+    dialect = db.engine.dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = db.session.execute(text(prefix + sql)).fetchall()
+    return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+
+def main():
+    app = create_benchmark_app()
+    failures = 0
+    with app.app_context():
+        admin_id = admin_user_id()
+        seed_products(admin_id)
+        if db.engine.dialect.name == 'sqlite':
+            db.session.execute(text('ANALYZE'))
+        for label, index, query in hot_queries(admin_id):
+            plan = explain(query)
+            ok = index in plan
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {label} -> {index}")
+            print('     ' + plan.replace('\n', '\n     '))
+    if failures:
+        print(f"{failures} hot queries are not using their index")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Login throughput under concurrency, and what a login burst does to receipt creation.
+
+Fires --clients concurrent clients doing --logins sign-ins each (a shift
+change) while a cashier keeps creating receipts, then reports sign-ins per
+second, 429 rejections and receipt latency against an idle baseline.
+Compare the dedicated bcrypt pool with hashing in the request threads:
+
+    python -m benchmarks.login --clients 32
+    python -m benchmarks.login --clients 32 --workers 0
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from decimal import Decimal
+
+PASSWORD = 'benchmark-password'
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))] * 1000 if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--logins', type=int, default=4, help='sign-ins per client')
+    parser.add_argument('--cost', type=int, help='bcrypt cost (BCRYPT_LOG_ROUNDS)')
+    parser.add_argument('--workers', type=int, help='bcrypt pool size (BCRYPT_WORKERS, 0 = request threads)')
+    parser.add_argument('--queue-limit', type=int, help='calls waiting for the pool (BCRYPT_QUEUE_LIMIT)')
+    args = parser.parse_args()
+    for name, value in (('BCRYPT_LOG_ROUNDS', args.cost), ('BCRYPT_WORKERS', args.workers),
+                        ('BCRYPT_QUEUE_LIMIT', args.queue_limit)):
+        if value is not None:
+            os.environ[name] = str(value)
+
+    from benchmarks.common import create_benchmark_app, admin_user_id, seed_products, db
+    from models.user import User
+    from services.receipt_service import ReceiptService
+    from environment import BCRYPT_LOG_ROUNDS, BCRYPT_WORKERS, BCRYPT_QUEUE_LIMIT
+
+    app = create_benchmark_app()
+    with app.app_context():
+        admin_id = admin_user_id()
+        prod_ids = seed_products(admin_id, 5)
+        emails = [f'login{i:02d}@example.com' for i in range(args.users)]
+        db.session.add_all([User(f'Login {i:02d}', email, PASSWORD, created_by=admin_id) for i, email in enumerate(emails)])
+        db.session.commit()
+    receipt = {
+        'recipient_name': 'Benchmark', 'package': 'Standard', 'package_amt': Decimal('0'), 'payment_mode': 'CASH',
+        'items': [{'prod_id': prod_id, 'is_free': False, 'vendor_price': Decimal('10'), 'quantity': 1}
+                  for prod_id in prod_ids]
+    }
+
+    def create_receipts(timings, stop=None, count=None):
+        with app.app_context():
+            while (stop is not None and not stop.is_set()) or (count is not None and len(timings) < count):
+                started = time.perf_counter()
+                _, error = ReceiptService.create_receipt(receipt, admin_id)
+                if error:
+                    raise SystemExit(f"❌ create_receipt failed: {error}")
+                timings.append(time.perf_counter() - started)
+
+    login_timings = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def login(client_index):
+        client = app.test_client()
+        for i in range(args.logins):
+            email = emails[(client_index + i) % len(emails)]
+            started = time.perf_counter()
+            response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+            with lock:
+                login_timings.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    print(f"bcrypt cost {BCRYPT_LOG_ROUNDS}, pool workers {BCRYPT_WORKERS}, queue limit {BCRYPT_QUEUE_LIMIT}, "
+          f"{args.clients} clients x {args.logins} sign-ins")
+    idle = []
+    create_receipts(idle, count=20)
+
+    busy = []
+    stop = threading.Event()
+    writer = threading.Thread(target=create_receipts, args=(busy, stop))
+    clients = [threading.Thread(target=login, args=(i,)) for i in range(args.clients)]
+    started = time.perf_counter()
+    writer.start()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    writer.join()
+
+    ok = statuses.get(200, 0)
+    print(f"sign-ins: {ok} ok, {statuses.get(429, 0)} rejected (429), "
+          f"{sum(statuses.values()) - ok - statuses.get(429, 0)} other in {elapsed:.2f} s "
+          f"-> {ok / elapsed:.1f} ok/s")
+    print(f"sign-in latency   median {statistics.median(login_timings) * 1000:>8.1f} ms  "
+          f"p95 {percentile(login_timings, 0.95):>8.1f} ms")
+    print(f"receipt idle      median {statistics.median(idle) * 1000:>8.1f} ms  p95 {percentile(idle, 0.95):>8.1f} ms")
+    if busy:
+        print(f"receipt in burst  median {statistics.median(busy) * 1000:>8.1f} ms  "
+              f"p95 {percentile(busy, 0.95):>8.1f} ms  ({len(busy)} receipts)")
+
+
+if __name__ == '__main__':
+    main()
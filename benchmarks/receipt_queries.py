@@ -0,0 +1,49 @@
+"""SQL statements issued by ReceiptService.create_receipt per receipt, by item count.
+
+Run from the repository root: python -m benchmarks.receipt_queries
+"""
+import time
+from decimal import Decimal
+from benchmarks.common import create_benchmark_app, seed_products, admin_user_id, db
+from utils.query_counter import QueryCounter
+
+
+def receipt_payload(prod_ids, item_count):
+    return {
+        'recipient_name': 'Benchmark',
+        'package': 'Standard',
+        'package_amt': Decimal('0'),
+        'payment_mode': 'CASH',
+        'items': [
+            {
+                'prod_id': prod_ids[i % len(prod_ids)],
+                'is_free': i % 5 == 4,
+                'vendor_price': Decimal('12.50'),
+                'quantity': 1 + i % 3
+            }
+            for i in range(item_count)
+        ]
+    }
+
+
+def main(item_counts=(1, 5, 10, 15, 30), repeat=20):
+    app = create_benchmark_app()
+    from services.receipt_service import ReceiptService
+    with app.app_context():
+        user_id = admin_user_id()
+        prod_ids = seed_products(user_id)
+        print(f"{'items':>5} {'queries':>8} {'ms/receipt':>11}")
+        for item_count in item_counts:
+            payload = receipt_payload(prod_ids, item_count)
+            started = time.perf_counter()
+            with QueryCounter(db.engine) as counter:
+                for _ in range(repeat):
+                    _, error = ReceiptService.create_receipt(payload, user_id)
+                    if error:
+                        raise RuntimeError(error)
+            elapsed = (time.perf_counter() - started) * 1000 / repeat
+            print(f"{item_count:>5} {counter.count / repeat:>8.1f} {elapsed:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
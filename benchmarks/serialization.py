@@ -0,0 +1,94 @@
+"""Serialization cost of the largest API payloads: building the dicts and encoding them.
+
+Compares the stdlib (Flask default) JSON provider with FastJSONProvider on the
+dashboard payload and the receipt list / detail payloads, and checks that
+both decode to the same data:
+
+    python -m benchmarks.serialization --receipts 20000 --rounds 20
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import time
+
+
+def timed(fn, rounds):
+    fn()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def build_payloads(app, user_id, per_page):
+    """(name, payload) pairs; payload is the object the controller passes to jsonify, or a callable building it"""
+    from models.receipt import Receipt
+    from services.dashboard_services import DashboardService
+    from services.receipt_service import ReceiptService
+    from controllers.dashboard_controller import _dashboard_request_params
+    from utils.utility import transform_pre_generated_receipts_list
+    from models.loaders import receipt_detail_options
+
+    with app.test_request_context('/api/dashboard/dashboard-data'):
+        start_date, end_date, period, package, currency = _dashboard_request_params({'period': 'all'})
+        dashboard, code = DashboardService.build_dashboard_data_sql(start_date, end_date, package, currency, period)
+    receipts = ReceiptService.get_all_receipts(user_id, 1, per_page)
+    detailed = Receipt.query.options(*receipt_detail_options()).filter_by(deleted_at=None).limit(per_page).all()
+
+    return [
+        ('dashboard_data[all]', [dashboard, code]),
+        (f'receipt_list[{per_page}]', lambda: {
+            'receipt_list': transform_pre_generated_receipts_list(receipts), 'message': 'ok', 'status': True
+        }),
+        (f'receipt_details[{per_page}]', lambda: {'data': [receipt.to_dict() for receipt in detailed]}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='database to use (defaults to a throwaway SQLite file)')
+    parser.add_argument('--no-seed', action='store_true', help='benchmark the existing data in --database-url')
+    parser.add_argument('--receipts', type=int, default=5000)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+
+    from flask.json.provider import DefaultJSONProvider
+    from benchmarks.common import create_benchmark_app, admin_user_id
+    from benchmarks.datagen import generate
+    from utils.json_provider import FastJSONProvider, orjson
+    if orjson is None:
+        print("⚠️ orjson is not installed; FastJSONProvider falls back to the stdlib encoder")
+
+    app = create_benchmark_app()
+    providers = [('stdlib', DefaultJSONProvider(app)), ('fast', FastJSONProvider(app))]
+    with app.app_context():
+        if not args.no_seed:
+            generate(receipts=args.receipts)
+        print(f"{'payload':<24} {'build ms':>9} " + ' '.join(f"{name + ' ms':>10}" for name, _ in providers)
+              + f" {'speedup':>8} {'KB':>8}")
+        # The services print progress; keep it out of the results table
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            payloads = build_payloads(app, admin_user_id(), args.per_page)
+        for name, payload in payloads:
+            if callable(payload):
+                build = f"{timed(payload, args.rounds):>9.2f}"
+                obj = payload()
+            else:
+                build, obj = f"{'-':>9}", payload
+            encoded = [provider.response(obj).get_data() for _, provider in providers]
+            if len({json.dumps(json.loads(body), sort_keys=True) for body in encoded}) != 1:
+                raise SystemExit(f"❌ {name}: providers produced different JSON")
+            encode_ms = [timed(lambda: provider.response(obj).get_data(), args.rounds) for _, provider in providers]
+            print(f"{name:<24} {build} " + ' '.join(f"{ms:>10.2f}" for ms in encode_ms)
+                  + f" {encode_ms[0] / encode_ms[-1]:>7.1f}x {len(encoded[-1]) / 1024:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
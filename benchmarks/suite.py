@@ -0,0 +1,176 @@
+"""Latency, SQL statement count and peak memory of the hot service calls.
+
+Seeds a throwaway database with benchmarks.datagen (or uses --database-url
+as is when --no-seed is given), then times every case:
+
+    python -m benchmarks.suite --receipts 20000 --rounds 10
+    python -m benchmarks.suite --only dashboard --json results.json
+
+Latency comes from untraced rounds; queries and peak memory (tracemalloc)
+from one extra traced round, so tracing does not inflate the timings.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+PERIODS = ['today', '7', '30', 'all', 'custom']
+
+
+class BenchmarkResult:
+    def __init__(self, name, timings, queries, peak_bytes):
+        self.name = name
+        self.timings = sorted(timings)
+        self.queries = queries
+        self.peak_bytes = peak_bytes
+
+    @property
+    def median_ms(self):
+        return statistics.median(self.timings) * 1000
+
+    @property
+    def p95_ms(self):
+        return self.timings[min(len(self.timings) - 1, int(round(0.95 * (len(self.timings) - 1))))] * 1000
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'rounds': len(self.timings),
+            'min_ms': round(self.timings[0] * 1000, 3),
+            'median_ms': round(self.median_ms, 3),
+            'p95_ms': round(self.p95_ms, 3),
+            'max_ms': round(self.timings[-1] * 1000, 3),
+            'queries': self.queries,
+            'peak_kb': round(self.peak_bytes / 1024, 1)
+        }
+
+
+def run_case(name, fn, rounds, warmup=1):
+    """Time ``fn`` over ``rounds`` calls, then count its queries and peak memory in one traced call"""
+    from benchmarks.common import db
+    from utils.query_counter import QueryCounter
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(rounds):
+        db.session.expire_all()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    db.session.expire_all()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with QueryCounter(db.engine) as counter:
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(name, timings, counter.count, peak)
+
+
+def build_cases(app, user_id):
+    """(name, callable) pairs; callables run inside the caller's app context"""
+    from datetime import datetime, timedelta
+    from decimal import Decimal
+    from services.receipt_service import ReceiptService
+    from services.dashboard_services import DashboardService
+    from services.product_catalog import product_catalog
+    from services.sales_report_ver3 import generate_comprehensive_excel_report
+    from controllers.dashboard_controller import _dashboard_request_params
+
+    prod_ids = [product.prod_id for product in product_catalog.page(1, 5).items]
+    receipt = {
+        'recipient_name': 'Benchmark',
+        'package': 'Standard',
+        'package_amt': Decimal('0'),
+        'payment_mode': 'CASH',
+        'items': [
+            {'prod_id': prod_id, 'is_free': i == 4, 'vendor_price': Decimal('12.50'), 'quantity': 1 + i % 3}
+            for i, prod_id in enumerate(prod_ids)
+        ]
+    }
+
+    def create_receipt():
+        _, error = ReceiptService.create_receipt(receipt, user_id)
+        if error:
+            raise RuntimeError(error)
+
+    def dashboard(period):
+        today = datetime.now()
+        params = {'period': period, 'start_date': (today - timedelta(days=90)).strftime('%Y-%m-%d'),
+                  'end_date': today.strftime('%Y-%m-%d')}
+
+        def call():
+            with app.test_request_context('/api/dashboard/dashboard-data'):
+                start_date, end_date, period_, package, currency = _dashboard_request_params(params)
+                response = DashboardService.get_dashboard_data(start_date, end_date, package, currency, period_)
+                response.get_data()
+        return call
+
+    def receipts_dashboard():
+        today = datetime.now()
+        _, error = DashboardService.get_receipts_dashboard(
+            (today - timedelta(days=30)).strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
+        if error:
+            raise RuntimeError(error)
+
+    with app.test_request_context('/api/dashboard/dashboard-data'):
+        start_date, end_date, period, package, currency = _dashboard_request_params({'period': 'all'})
+        report, _ = DashboardService.build_dashboard_data_sql(start_date, end_date, package, currency, period)
+    dashboard_data = report['data']
+
+    def excel_report():
+        generate_comprehensive_excel_report(dashboard_data, currency)
+
+    cases = [('create_receipt', create_receipt)]
+    cases += [(f'dashboard_data[{period}]', dashboard(period)) for period in PERIODS]
+    cases += [('receipts_dashboard[30 days]', receipts_dashboard), ('excel_report[all]', excel_report)]
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='database to use (defaults to a throwaway SQLite file)')
+    parser.add_argument('--no-seed', action='store_true', help='benchmark the existing data in --database-url')
+    parser.add_argument('--receipts', type=int, default=5000)
+    parser.add_argument('--products', type=int, default=20)
+    parser.add_argument('--days', type=int, default=400)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--only', help='run only cases whose name contains this text')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+
+    from benchmarks.common import create_benchmark_app, admin_user_id
+    from benchmarks.datagen import generate
+    app = create_benchmark_app()
+    results = []
+    with app.app_context():
+        if not args.no_seed:
+            counts = generate(products=args.products, receipts=args.receipts, days=args.days, seed=args.seed)
+            print(', '.join(f"{name}: {count}" for name, count in counts.items()))
+        for name, fn in build_cases(app, admin_user_id()):
+            if args.only and args.only not in name:
+                continue
+            # The services print progress; keep it out of the results table
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                result = run_case(name, fn, args.rounds)
+            results.append(result)
+            print(f"{name:<28} median {result.median_ms:>9.2f} ms  p95 {result.p95_ms:>9.2f} ms  "
+                  f"queries {result.queries:>3}  peak {result.peak_bytes / 1024:>9.1f} KB")
+            sys.stdout.flush()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([result.to_dict() for result in results], f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
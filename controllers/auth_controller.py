@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.auth_service import AuthService
 from services.user_service import UserService
+from services.password_hasher import PasswordHasherBusy
 from validators.schemas import LoginSchema, UserCreateSchema
 from utils.decorators import validate_json
 from pydantic import ValidationError
@@ -15,7 +16,7 @@ def login(validated_data):
     try:
         email = validated_data['email']
         password = validated_data['password']
-        print(f"Attempting login for email: {email} and password: {password}")
+        print(f"Attempting login for email: {email}")
         user = AuthService.authenticate_user(email, password)
         if not user:
             return jsonify({'message': 'Invalid email or password'}), 401
@@ -27,6 +28,8 @@ def login(validated_data):
             'data': tokens
         }), 200
         
+    except PasswordHasherBusy as e:
+        return jsonify({'message': str(e)}), 429, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'message': f'Login failed: {str(e)}'}), 500
 
@@ -45,6 +48,8 @@ def register(validated_data):
             'data': tokens
         }), 201
         
+    except PasswordHasherBusy as e:
+        return jsonify({'message': str(e)}), 429, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'message': f'Registration failed: {str(e)}'}), 500
 
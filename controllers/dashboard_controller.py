@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, send_file, url_for
 from flask_jwt_extended import jwt_required
 from services.dashboard_services import DashboardService
+from services.sales_report_ver3 import REPORT_FILENAME, REPORT_MIMETYPE
 from utils.utility import transform_dashboard_data
 from datetime import datetime, timedelta
+from io import BytesIO
+import os
+import app
 # import logging
 
 dashboard_bp = Blueprint('dashboard', __name__)
@@ -105,12 +109,12 @@ def get_receipts_dashboard():
             'message': f"Internal server error-{str(e)}"
         }), 500
 
-@dashboard_bp.route('/dashboard-data', methods=['GET'])
-def get_dashboard_data():
-    # Get the period parameter
+def _dashboard_request_params(params=None):
+    """(start_date, end_date, period, package, currency) for the dashboard query string and host"""
+    params = request.args if params is None else params
     start_date = None
     end_date = None
-    period = request.args.get('period', 'all')
+    period = params.get('period', 'all')
     api_base_url = request.url_root.rstrip('/')
     currency = "₿"
     package = "Full Package"
@@ -134,19 +138,129 @@ def get_dashboard_data():
         end_date = datetime.now().strftime('%Y-%m-%d')
         start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
     elif period == "custom":
-        start_date = request.args.get("start_date")
-        end_date = request.args.get("end_date")
+        start_date = params.get("start_date")
+        end_date = params.get("end_date")
         if start_date and end_date:
             start_date = datetime.strptime(start_date, "%Y-%m-%d").strftime('%Y-%m-%d')
             end_date = datetime.strptime(end_date, "%Y-%m-%d").strftime('%Y-%m-%d')
+    return start_date, end_date, period, package, currency
+
+@dashboard_bp.route('/dashboard-data', methods=['GET'])
+def get_dashboard_data():
+    # Get the period parameter
+    start_date, end_date, period, package, currency = _dashboard_request_params()
     response = DashboardService.get_dashboard_data(
         start_date=start_date,
         end_date=end_date,
         period=period,
         package = package,
-        currency = currency
+        currency = currency,
+        engine = request.args.get('engine')
     )  
     # Convert back to the expected format for frontend
     print(f"Dashboard data response: {response}")
     return response
-    
\ No newline at end of file
+
+@dashboard_bp.route('/report.xlsx', methods=['GET'])
+def get_dashboard_report():
+    """Download the dashboard Excel workbook for the requested period"""
+    try:
+        start_date, end_date, period, package, currency = _dashboard_request_params()
+        excel_bytes, error = DashboardService.get_dashboard_report(
+            start_date=start_date,
+            end_date=end_date,
+            period=period,
+            package=package,
+            currency=currency
+        )
+        if error:
+            return jsonify({
+                'status': False,
+                'message': error
+            }), 400
+        return send_file(
+            BytesIO(excel_bytes),
+            mimetype=REPORT_MIMETYPE,
+            as_attachment=True,
+            download_name=REPORT_FILENAME
+        )
+    except ValueError as e:
+        return jsonify({
+            'status': False,
+            'message': f'Invalid parameter: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': False,
+            'message': 'Internal server error'
+        }), 500
+
+def _report_job_response(job):
+    """Job status as returned to the client, with a download link once the workbook is ready"""
+    if job['status'] == app.report_job_service.DONE:
+        job['download_url'] = url_for('dashboard.download_report_job', job_id=job['job_id'])
+    return job
+
+@dashboard_bp.route('/reports', methods=['POST'])
+@jwt_required()
+def create_report_job():
+    """Queue a dashboard Excel report for the requested period"""
+    try:
+        start_date, end_date, period, package, currency = _dashboard_request_params(
+            request.get_json(silent=True) or request.args
+        )
+        job = app.report_job_service.enqueue(
+            start_date=start_date,
+            end_date=end_date,
+            package=package,
+            currency=currency,
+            period=period
+        )
+        return jsonify({
+            'status': True,
+            'message': 'Report queued' if not job['coalesced'] else 'Report already in progress',
+            'job': _report_job_response(job)
+        }), 202
+    except ValueError as e:
+        return jsonify({
+            'status': False,
+            'message': f'Invalid parameter: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': False,
+            'message': 'Internal server error'
+        }), 500
+
+@dashboard_bp.route('/reports/<job_id>', methods=['GET'])
+@jwt_required()
+def get_report_job(job_id):
+    """Poll a queued dashboard report"""
+    job = app.report_job_service.get_job(job_id)
+    if not job:
+        return jsonify({
+            'status': False,
+            'message': 'Report not found or expired'
+        }), 404
+    return jsonify({
+        'status': True,
+        'job': _report_job_response(job)
+    }), 200
+
+@dashboard_bp.route('/reports/<job_id>/download', methods=['GET'])
+@jwt_required()
+def download_report_job(job_id):
+    """Download the workbook of a finished report job"""
+    job = app.report_job_service.get_job(job_id)
+    path = app.report_job_service.artifact_path(job_id)
+    if not job or job['status'] != app.report_job_service.DONE or not os.path.exists(path):
+        return jsonify({
+            'status': False,
+            'message': 'Report not ready or expired'
+        }), 404
+    return send_file(
+        path,
+        mimetype=REPORT_MIMETYPE,
+        as_attachment=True,
+        download_name=REPORT_FILENAME
+    )
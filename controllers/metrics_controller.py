@@ -0,0 +1,40 @@
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import jwt_required
+from utils.decorators import admin_required
+from utils.query_counter import query_metrics
+from utils.metrics import registry
+from environment import METRICS_TOKEN
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/queries', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_query_metrics():
+    """Per-endpoint SQL statement counts and DB time since startup (Admin only)"""
+    return jsonify({
+        'status': True,
+        'message': 'Query metrics retrieved successfully',
+        'data': query_metrics.snapshot()
+    }), 200
+
+@metrics_bp.route('/queries', methods=['DELETE'])
+@jwt_required()
+@admin_required
+def reset_query_metrics():
+    """Start the per-endpoint query metrics over (Admin only)"""
+    query_metrics.reset()
+    return jsonify({
+        'status': True,
+        'message': 'Query metrics reset'
+    }), 200
+
+
+prometheus_bp = Blueprint('prometheus', __name__)
+
+@prometheus_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request, pool, cache and job metrics in the Prometheus text format"""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return jsonify({'message': 'Invalid metrics token'}), 401
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -13,7 +13,9 @@ def get_products():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 10, type=int), 100)
-        products_paginated = ProductService.get_all_products(page, per_page)
+        # Keyset pagination when a cursor is passed ('' for the first page), offset otherwise
+        cursor = request.args.get('cursor')
+        products_paginated = ProductService.get_all_products(page, per_page, cursor)
         products = [product.to_dict() for product in products_paginated.items]
         fields_to_remove = ["updated_at", "created_at", "created_by"]
         # Process each item
@@ -27,11 +29,15 @@ def get_products():
             item["price"] = item.pop("unit_price")
             
         # return jsonify(op_lst,200)
-        return jsonify({
+        response = {
             'message': 'Products retrieved successfully',
             'data': products,
             "status":True
-        }), 200
+        }
+        if cursor is not None:
+            response['next_cursor'] = products_paginated.next_cursor
+            response['has_next'] = products_paginated.has_next
+        return jsonify(response), 200
                 # 'pagination': {
                 #     'page': products_paginated.page,
                 #     'per_page': products_paginated.per_page,
@@ -43,6 +49,8 @@ def get_products():
             
         
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Failed to retrieve products: {str(e)}'}), 500
 
@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.receipt_service import ReceiptService
-from validators.schemas import ReceiptCreateSchema
-from utils.decorators import validate_json
+from validators.schemas import ReceiptCreateSchema, ReceiptBulkCreateSchema
+from utils.decorators import idempotent, validate_json
 from utils.utility import transform_receipt_data, transform_pre_generated_receipts_list
+from environment import RECEIPT_BULK_MAX_ROWS
+import json
+from io import BytesIO
 
 receipt_bp = Blueprint('receipts', __name__)
 
@@ -15,21 +18,29 @@ def get_receipts():
         current_user_id = get_jwt_identity()
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 10, type=int), 100)
-        receipts = ReceiptService.get_all_receipts(current_user_id, page, per_page)
+        # Keyset pagination when a cursor is passed ('' for the first page), offset otherwise
+        cursor = request.args.get('cursor')
+        receipts = ReceiptService.get_all_receipts(current_user_id, page, per_page, cursor)
 
         if not receipts:
             return jsonify({'message': 'Receipt not found'}), 404
         data = transform_pre_generated_receipts_list(receipts)
         response = {"receipt_list": data}
+        if cursor is not None:
+            response["next_cursor"] = receipts.next_cursor
+            response["has_next"] = receipts.has_next
         response["message"] = 'Receipts retrieved successfully'
         response["status"] = True
         return jsonify(response),200
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Failed to retrieve receipts: {str(e)}'}), 500
 
 @receipt_bp.route('/create-receipt', methods=['POST'])
 @jwt_required()
+@idempotent
 @validate_json(ReceiptCreateSchema)
 def create_receipt(validated_data):
     """Create a new receipt"""
@@ -45,6 +56,72 @@ def create_receipt(validated_data):
     except Exception as e:
         return jsonify({'message': f'Failed to create receipt: {str(e)}'}), 500
 
+def _bulk_receipt_rows():
+    """Receipt dicts from a JSON array or an NDJSON body (one receipt per line); a row is an error string when unparsable"""
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+        rows = []
+        # @idempotent has already read the body to hash it when a key is sent
+        lines = BytesIO(request.get_data()) if request.headers.get('Idempotency-Key') else request.stream
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(f'Invalid JSON: {str(e)}')
+            if len(rows) > RECEIPT_BULK_MAX_ROWS:
+                break
+        return rows
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        raise ValueError('Expected a JSON array of receipts or an NDJSON body')
+    return rows
+
+@receipt_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@idempotent
+def create_receipts_bulk():
+    """Create many receipts at once (offline counters replaying their queue).
+
+    Counters should send an Idempotency-Key per batch: a retried batch then
+    replays the stored results instead of creating its receipts again.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        try:
+            rows = _bulk_receipt_rows()
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        if not rows:
+            return jsonify({'message': 'No receipts provided'}), 400
+        if len(rows) > RECEIPT_BULK_MAX_ROWS:
+            return jsonify({'message': f'At most {RECEIPT_BULK_MAX_ROWS} receipts per request'}), 413
+
+        validated = []
+        for row in rows:
+            if not isinstance(row, dict):
+                validated.append(row if isinstance(row, str) else 'Receipt must be a JSON object')
+                continue
+            try:
+                validated.append(ReceiptBulkCreateSchema(**row).dict())
+            except Exception as e:
+                validated.append(f'Validation error: {str(e)}')
+
+        results, error = ReceiptService.create_receipts_bulk(validated, current_user_id)
+        if error:
+            return jsonify({'message': f'Failed to create receipts: {error}'}), 500
+        created = sum(1 for result in results if result['status'] == 'created')
+        return jsonify({
+            'message': f'{created} of {len(results)} receipts created',
+            'status': created == len(results),
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        }), 200 if created else 400
+    except Exception as e:
+        return jsonify({'message': f'Failed to create receipts: {str(e)}'}), 500
+
 @receipt_bp.route('get-receipt/<string:receipt_id>', methods=['GET'])
 @jwt_required()
 def get_receipt(receipt_id):
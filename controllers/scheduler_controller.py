@@ -1,6 +1,8 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from utils.decorators import admin_required
+from services.job_claim_service import JobClaimService, WORKER_ID
+from services.email_outbox_service import EmailOutboxService
 import app
 
 scheduler_bp = Blueprint('scheduler', __name__)
@@ -12,7 +14,12 @@ def trigger_check():
     """Manually trigger the daily receipt check (Admin only)"""
     try:
         if app.scheduler_service:
-            app.scheduler_service.trigger_check_now()
+            error = app.scheduler_service.trigger_check_now()
+            if error:
+                return jsonify({
+                    'status': False,
+                    'message': f'Failed to trigger check: {error}'
+                }), 500
             return jsonify({
                 'status': True,
                 'message': 'Daily receipt check triggered successfully'
@@ -53,7 +60,12 @@ def get_status():
                     'recipients': app.scheduler_service.alert_recipients,
                     'check_days': app.scheduler_service.check_days,
                     'check_time': f"{app.scheduler_service.check_hour:02d}:{app.scheduler_service.check_minute:02d}",
-                    'jobs': jobs
+                    'jobs': jobs,
+                    'worker': WORKER_ID,
+                    'recent_runs': [
+                        run.to_dict()
+                        for run in JobClaimService.recent_runs(app.scheduler_service.DAILY_CHECK_JOB)
+                    ]
                 }
             }), 200
         else:
@@ -66,4 +78,23 @@ def get_status():
         return jsonify({
             'status': False,
             'message': f'Failed to get scheduler status: {str(e)}'
-        }), 500
\ No newline at end of file
+        }), 500
+@scheduler_bp.route('/outbox', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_outbox():
+    """Recent queued emails and their delivery status (Admin only)"""
+    try:
+        messages = EmailOutboxService.recent(
+            status=request.args.get('status'),
+            limit=min(request.args.get('limit', 50, type=int), 200)
+        )
+        return jsonify({
+            'status': True,
+            'data': [message.to_dict() for message in messages]
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'status': False,
+            'message': f'Failed to get outbox: {str(e)}'
+        }), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.user_service import UserService
+from services.password_hasher import PasswordHasherBusy
 from validators.schemas import UserCreateSchema, UserUpdateSchema
 from utils.decorators import admin_required, validate_json
 
@@ -13,24 +14,32 @@ def get_users():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 10, type=int), 100)
+        # Keyset pagination when a cursor is passed ('' for the first page), offset otherwise
+        cursor = request.args.get('cursor')
         
-        users_paginated = UserService.get_all_users(page, per_page)
+        users_paginated = UserService.get_all_users(page, per_page, cursor)
+        if cursor is not None:
+            pagination = users_paginated.to_dict()
+        else:
+            pagination = {
+                'page': users_paginated.page,
+                'per_page': users_paginated.per_page,
+                'total': users_paginated.total,
+                'pages': users_paginated.pages,
+                'has_next': users_paginated.has_next,
+                'has_prev': users_paginated.has_prev
+            }
         
         return jsonify({
             'message': 'Users retrieved successfully',
             'data': {
                 'users': [user.to_dict() for user in users_paginated.items],
-                'pagination': {
-                    'page': users_paginated.page,
-                    'per_page': users_paginated.per_page,
-                    'total': users_paginated.total,
-                    'pages': users_paginated.pages,
-                    'has_next': users_paginated.has_next,
-                    'has_prev': users_paginated.has_prev
-                }
+                'pagination': pagination
             }
         }), 200
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Failed to retrieve users: {str(e)}'}), 500
 
@@ -48,6 +57,8 @@ def create_user(validated_data):
             'message': 'User created successfully',
             'data': user.to_dict()
         }), 201
+    except PasswordHasherBusy as e:
+        return jsonify({'message': str(e)}), 429, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'message': f'Failed to create user: {str(e)}'}), 500
 
@@ -84,6 +95,8 @@ def update_user(validated_data, user_id):
             'data': user.to_dict()
         }), 200
         
+    except PasswordHasherBusy as e:
+        return jsonify({'message': str(e)}), 429, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'message': f'Failed to update user: {str(e)}'}), 500
 
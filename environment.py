@@ -19,7 +19,90 @@ SMTP_USERNAME = os.getenv('SMTP_USERNAME')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
 FROM_EMAIL = os.getenv('FROM_EMAIL')
 FROM_NAME = os.getenv('FROM_NAME', 'BKK Print Service')
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'true').lower() == 'true'
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', 30))
+
+# Email outbox: scheduler emails are stored and sent by a background worker in batches over one SMTP session,
+# retried with exponential backoff (EMAIL_OUTBOX_RETRY_SECONDS, doubled per attempt) up to EMAIL_OUTBOX_MAX_ATTEMPTS
+EMAIL_OUTBOX_ENABLED = os.getenv('EMAIL_OUTBOX_ENABLED', 'true').lower() == 'true'
+EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv('EMAIL_OUTBOX_POLL_SECONDS', 15))
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+EMAIL_OUTBOX_RETRY_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETRY_SECONDS', 60))
+
+# JSON encoder for API responses: "orjson" (falls back to the stdlib when orjson is not installed) or "default"
+JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+
+# bcrypt: cost of new hashes (hashes with another cost are redone at login), hashes run at once on the dedicated
+# pool (0 = in the request thread), and calls allowed to wait for it before sign-ins are answered with 429
+BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", 2))
+BCRYPT_QUEUE_LIMIT = int(os.getenv("BCRYPT_QUEUE_LIMIT", 16))
+
+# Admin flag, deleted state and token version of users, checked on every authenticated request, are cached for
+# PRINCIPAL_CACHE_TTL seconds; set PRINCIPAL_CACHE_URL (redis://...) so revocations reach every worker at once
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", 30))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 1024))
+PRINCIPAL_CACHE_URL = os.getenv("PRINCIPAL_CACHE_URL")
+
+# Token bucket rate limits per client (user of the access token, else IP; sign-ins per IP and email) as comma
+# separated "<blueprint or blueprint.endpoint>=<count>/<second|minute|hour|day|seconds>"; RATE_LIMIT_URL
+# (redis://...) shares the buckets between workers, RATE_LIMIT_PROXY_HOPS is the number of proxies setting
+# X-Forwarded-For. Off by default: set RATE_LIMIT_PROXY_HOPS before enabling it behind nginx, or every
+# client shares the proxy's address
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+RATE_LIMITS = os.getenv("RATE_LIMITS", "auth.login=10/minute,auth.register=10/minute,dashboard=60/minute")
+RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL")
+RATE_LIMIT_PROXY_HOPS = int(os.getenv("RATE_LIMIT_PROXY_HOPS", 0))
 
 # Currency
 CURRENCY = os.getenv("CURRENCY","฿")
 # CURRENCY = os.getenv("CURRENCY","₩")
+
+# Dashboard aggregation engine: "sql" (GROUP BY in the database) or "pandas" (original pipeline)
+DASHBOARD_ENGINE = os.getenv("DASHBOARD_ENGINE", "sql")
+# Read dashboard product totals from the daily_product_sales rollup (enable after running `flask rebuild-sales-rollup`)
+DASHBOARD_USE_ROLLUP = os.getenv("DASHBOARD_USE_ROLLUP", "false").lower() == "true"
+# Threads computing the previous period's trend totals on their own session while the current period is
+# aggregated (0 = compute them inline afterwards)
+DASHBOARD_PREVIOUS_PERIOD_WORKERS = int(os.getenv("DASHBOARD_PREVIOUS_PERIOD_WORKERS", 4))
+
+# Dashboard response cache: ranges that include today expire after DASHBOARD_CACHE_TTL seconds (and on every
+# receipt write), closed historical ranges after DASHBOARD_CACHE_HISTORY_TTL. Set DASHBOARD_CACHE_URL
+# (redis://...) to share entries and invalidations between workers; without it every entry uses
+# DASHBOARD_CACHE_TTL, since a write on one worker cannot invalidate the others.
+DASHBOARD_CACHE_ENABLED = os.getenv("DASHBOARD_CACHE_ENABLED", "true").lower() == "true"
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", 60))
+DASHBOARD_CACHE_HISTORY_TTL = int(os.getenv("DASHBOARD_CACHE_HISTORY_TTL", 86400))
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", 256))
+DASHBOARD_CACHE_URL = os.getenv("DASHBOARD_CACHE_URL")
+
+# Background report jobs: worker threads, where finished workbooks are kept (every worker process must see the
+# same directory), and for how long (seconds)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", 2))
+REPORT_ARTIFACT_DIR = os.getenv("REPORT_ARTIFACT_DIR")
+REPORT_ARTIFACT_TTL = int(os.getenv("REPORT_ARTIFACT_TTL", 3600))
+# Queued or running report jobs older than this many seconds were abandoned by a stopped worker
+REPORT_JOB_TIMEOUT = int(os.getenv("REPORT_JOB_TIMEOUT", 1800))
+
+# Seconds between checks that another worker has not changed products behind the in-memory catalog
+CATALOG_PROBE_INTERVAL = float(os.getenv("CATALOG_PROBE_INTERVAL", 5))
+
+# Apply pending migrations from migrations/ in every process at startup. Off by default: run
+# `flask db-upgrade` once on deploy, before starting the workers
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "false").lower() == "true"
+
+# Log SQL statements slower than this many milliseconds (0 disables)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+
+# Bearer token Prometheus must send to scrape /metrics (unset = open, e.g. when only reachable internally)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# /api/receipts/bulk: receipts per transaction, and the most receipts accepted in one request
+RECEIPT_BULK_CHUNK_SIZE = int(os.getenv("RECEIPT_BULK_CHUNK_SIZE", 500))
+RECEIPT_BULK_MAX_ROWS = int(os.getenv("RECEIPT_BULK_MAX_ROWS", 5000))
+
+# Idempotency-Key on receipt creation: seconds a completed response is replayed for, and seconds after which a
+# key whose request never finished (e.g. the worker died) can be used again
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 86400))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 60))
@@ -0,0 +1,13 @@
+"""Versioned schema migrations, applied in order by services.migration_service.MigrationService.
+
+Each module defines VERSION, DESCRIPTION and upgrade(connection). Migrations
+must be idempotent: a fresh database already has everything db.create_all()
+builds from the models, and several workers may start at the same time.
+"""
+from migrations import m0001_hot_path_indexes, m0002_user_token_version, m0003_rollup_line_count
+
+MIGRATIONS = [
+    m0001_hot_path_indexes,
+    m0002_user_token_version,
+    m0003_rollup_line_count,
+]
@@ -0,0 +1,17 @@
+from models.receipt import Receipt
+from models.receipt_item import ReceiptItem
+
+VERSION = '0001'
+DESCRIPTION = 'Composite indexes for live receipts by created_at / created_by and receipt items by receipt'
+
+INDEXES = [
+    (Receipt.__table__, 'ix_receipts_deleted_at_created_at'),
+    (Receipt.__table__, 'ix_receipts_created_by_created_at'),
+    (ReceiptItem.__table__, 'ix_receipt_items_receipt_id'),
+]
+
+
+def upgrade(connection):
+    for table, name in INDEXES:
+        index = next(index for index in table.indexes if index.name == name)
+        index.create(bind=connection, checkfirst=True)
@@ -0,0 +1,10 @@
+from sqlalchemy import inspect, text
+
+VERSION = '0002'
+DESCRIPTION = 'users.token_version, bumped to revoke the tokens issued to a user'
+
+
+def upgrade(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('users')}
+    if 'token_version' not in columns:
+        connection.execute(text('ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0'))
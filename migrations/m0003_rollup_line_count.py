@@ -0,0 +1,13 @@
+from sqlalchemy import inspect, text
+
+VERSION = '0003'
+DESCRIPTION = 'daily_product_sales.receipt_count renamed to line_count (it counts item lines, not receipts)'
+
+
+def upgrade(connection):
+    inspector = inspect(connection)
+    if not inspector.has_table('daily_product_sales'):
+        return
+    columns = {column['name'] for column in inspector.get_columns('daily_product_sales')}
+    if 'receipt_count' in columns and 'line_count' not in columns:
+        connection.execute(text('ALTER TABLE daily_product_sales RENAME COLUMN receipt_count TO line_count'))
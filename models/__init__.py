@@ -1,4 +1,11 @@
 from .user import User
 from .product import Product
 from .receipt import Receipt
-from .receipt_item import ReceiptItem
\ No newline at end of file
+from .receipt_item import ReceiptItem
+from .daily_product_sales import DailyProductSales
+from .schema_migration import SchemaMigration
+from .scheduler_job_run import SchedulerJobRun
+from .email_outbox import EmailOutbox
+from .idempotency_key import IdempotencyKey
+from .report_job import ReportJob
+from .catalog_version import CatalogVersion
@@ -0,0 +1,13 @@
+from app import db
+
+
+class CatalogVersion(db.Model):
+    """Counter bumped in the same transaction as every product write.
+
+    Workers compare it with the version their in-memory product catalog was
+    loaded at to notice writes made by other workers.
+    """
+    __tablename__ = 'catalog_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,34 @@
+from app import db
+from sqlalchemy import func
+
+
+class DailyProductSales(db.Model):
+    """Per day / package / product sales rollup maintained alongside receipts"""
+    __tablename__ = 'daily_product_sales'
+
+    sales_date = db.Column(db.Date, primary_key=True)
+    package = db.Column(db.String(36), primary_key=True)
+    prod_id = db.Column(db.String(36), db.ForeignKey('products.prod_id'), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    total_std_price = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    total_vend_price = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    # Sums of the per-unit prices, so average prices can be derived per product
+    std_price_sum = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    vend_price_sum = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    # Item lines summed into the row (one per receipt item); divides the price sums into averages
+    line_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    # Columns incremented when a receipt is created and decremented when it is deleted
+    COUNTERS = ('quantity', 'total_std_price', 'total_vend_price', 'std_price_sum', 'vend_price_sum', 'line_count')
+
+    def to_dict(self):
+        return {
+            'sales_date': self.sales_date.isoformat() if self.sales_date else None,
+            'package': self.package,
+            'prod_id': self.prod_id,
+            'quantity': self.quantity,
+            'total_std_price': float(self.total_std_price),
+            'total_vend_price': float(self.total_vend_price),
+            'line_count': self.line_count
+        }
@@ -0,0 +1,43 @@
+from app import db
+from sqlalchemy import func
+import uuid
+
+
+class EmailOutbox(db.Model):
+    """Email waiting to be (or already) delivered by EmailOutboxService"""
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()), unique=True, nullable=False)
+    # Comma separated recipient addresses
+    to_emails = db.Column(db.Text, nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html_content = db.Column(db.Text, nullable=False)
+    text_content = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=func.now(), nullable=False)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=func.now(), nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    # Due messages for the sender worker
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt_at', status, next_attempt_at),
+    )
+
+    def recipients(self):
+        return [email for email in self.to_emails.split(',') if email]
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'to_emails': self.recipients(),
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
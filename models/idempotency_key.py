@@ -0,0 +1,18 @@
+from app import db
+from sqlalchemy import func
+
+
+class IdempotencyKey(db.Model):
+    """Response stored for a client's Idempotency-Key, replayed when the client retries the request"""
+    __tablename__ = 'idempotency_keys'
+
+    key = db.Column(db.String(100), primary_key=True)
+    user_id = db.Column(db.String(36), primary_key=True)
+    # sha256 of the method, path and body the key was first used with
+    request_hash = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    response_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=func.now(), nullable=False)
+    # Pending: when a crashed request's key may be claimed again; completed: when the key is purged
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,19 @@
+from sqlalchemy.orm import joinedload, selectinload
+from models.receipt import Receipt
+
+
+# Product names come from the in-memory catalog (services.product_catalog),
+# so products are no longer loaded alongside receipt items.
+
+def receipt_detail_options():
+    """Single receipt with its items in one joined query"""
+    return (
+        joinedload(Receipt.receipt_items),
+    )
+
+
+def receipt_list_options():
+    """Many receipts: items fetched with one extra IN query"""
+    return (
+        selectinload(Receipt.receipt_items),
+    )
@@ -24,6 +24,14 @@ class Receipt(db.Model):
     updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     deleted_at = db.Column(db.DateTime, nullable=True)
 
+    # Existing databases get these through migrations/m0001_hot_path_indexes.py
+    __table_args__ = (
+        # Live receipts in a created_at range (dashboard, scheduler, previous period)
+        db.Index('ix_receipts_deleted_at_created_at', deleted_at, created_at),
+        # A cashier's receipts, newest first (get_all_receipts)
+        db.Index('ix_receipts_created_by_created_at', created_by, created_at.desc()),
+    )
+
     # Relationships
     receipt_items = db.relationship('ReceiptItem', backref='receipt', lazy=True, cascade='all, delete-orphan')
     
@@ -60,8 +68,8 @@ class Receipt(db.Model):
     def is_deleted(self):
         return self.deleted_at is not None
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_items=True):
+        data = {
             'receipt_id': self.receipt_id,
             'receipt_number': self.receipt_number,
             'recipient_name': self.recipient_name,
@@ -77,5 +85,7 @@ class Receipt(db.Model):
             'created_by': self.created_by,
             'created_at': self.created_at.strftime('%d-%m-%Y %H:%M:%S') if self.created_at else None,
             'updated_at': self.updated_at.strftime('%d-%m-%Y') if self.updated_at else None,
-            'items': [item.to_dict() for item in self.receipt_items if not item.is_deleted()]
-        }
\ No newline at end of file
+        }
+        if include_items:
+            data['items'] = [item.to_dict() for item in self.receipt_items if not item.is_deleted()]
+        return data
\ No newline at end of file
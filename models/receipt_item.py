@@ -19,6 +19,11 @@ class ReceiptItem(db.Model):
     created_at = db.Column(db.DateTime, default=func.now(), nullable=False)
     updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     deleted_at = db.Column(db.DateTime, nullable=True)
+
+    # Items of a receipt (receipt detail, selectin loading, dashboard joins)
+    __table_args__ = (
+        db.Index('ix_receipt_items_receipt_id', receipt_id),
+    )
     
     def __init__(self, receipt_id, prod_id, is_free, quantity, std_price, vendor_price):
         self.receipt_id = receipt_id
@@ -58,11 +63,13 @@ class ReceiptItem(db.Model):
         return self.deleted_at is not None
     
     def to_dict(self):
+        # Imported here: the catalog service itself imports the models
+        from services.product_catalog import product_catalog
         return {
             'id': self.id,
             'receipt_id': self.receipt_id,
             'prod_id': self.prod_id,
-            'product_name': self.product.name if self.product else None,
+            'product_name': product_catalog.name(self.prod_id),
             'std_price': float(self.std_price),
             'vend_price': float(self.vendor_price),
             'quantity': self.quantity,
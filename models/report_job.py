@@ -0,0 +1,39 @@
+from app import db
+from sqlalchemy import func
+
+
+class ReportJob(db.Model):
+    """Background dashboard report, shared by every worker process (see ReportJobService)"""
+    __tablename__ = 'report_jobs'
+
+    job_id = db.Column(db.String(32), primary_key=True)
+    # period|start_date|end_date|package|currency; identical requests join the queued/running job
+    params_key = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    period = db.Column(db.String(20), nullable=True)
+    start_date = db.Column(db.String(10), nullable=True)
+    end_date = db.Column(db.String(10), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=func.now(), nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # Coalescing lookup for queued/running jobs with the same parameters
+        db.Index('ix_report_jobs_params_key_status', params_key, status),
+        # Purge of expired jobs
+        db.Index('ix_report_jobs_expires_at', expires_at),
+    )
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'period': self.period,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
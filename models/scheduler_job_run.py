@@ -0,0 +1,31 @@
+from app import db
+from sqlalchemy import func
+
+
+class SchedulerJobRun(db.Model):
+    """Claim on one run of a scheduled job, so only one worker process executes it"""
+    __tablename__ = 'scheduler_job_runs'
+
+    job_id = db.Column(db.String(100), primary_key=True)
+    # Identifies the scheduled run, e.g. the day the cron trigger fired
+    run_key = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='running')
+    attempts = db.Column(db.Integer, nullable=False, default=1)
+    lease_expires_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, default=func.now(), nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'run_key': self.run_key,
+            'holder': self.holder,
+            'status': self.status,
+            'attempts': self.attempts,
+            'lease_expires_at': self.lease_expires_at.isoformat() if self.lease_expires_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'error': self.error
+        }
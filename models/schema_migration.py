@@ -0,0 +1,11 @@
+from app import db
+from sqlalchemy import func
+
+
+class SchemaMigration(db.Model):
+    """Versions from migrations/ that have been applied to this database"""
+    __tablename__ = 'schema_migrations'
+
+    version = db.Column(db.String(20), primary_key=True)
+    description = db.Column(db.String(255), nullable=False)
+    applied_at = db.Column(db.DateTime, default=func.now(), nullable=False)
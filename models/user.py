@@ -1,7 +1,8 @@
-from app import db, bcrypt
+from app import db
 from datetime import datetime
 from sqlalchemy import func
 import uuid
+from services.password_hasher import password_hasher
 
 
 class User(db.Model):
@@ -13,6 +14,8 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)  # Increased length for MySQL
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
+    # Bumped to revoke every token issued to the user so far (e.g. on a role change)
+    token_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     created_by = db.Column(db.String(36), db.ForeignKey('users.user_id'), nullable=True)
     created_at = db.Column(db.DateTime, default=func.now(), nullable=False)
     updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now(), nullable=False)
@@ -36,10 +39,10 @@ class User(db.Model):
     
     @password.setter
     def password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
     
     def verify_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     def soft_delete(self):
         self.deleted_at = func.now()
@@ -1,6 +1,7 @@
 from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt_identity, JWTManager
 from models.user import User
 from app import db
+from services.password_hasher import password_hasher, PasswordHasherBusy
 
 class AuthService:
     @staticmethod
@@ -8,8 +9,22 @@ class AuthService:
         """Authenticate user with email and password"""
         user = User.query.filter_by(email=email, deleted_at=None).first()
         if user and user.verify_password(password):
+            if password_hasher.needs_rehash(user.password_hash):
+                AuthService._rehash_password(user, password)
             return user
         return None
+
+    @staticmethod
+    def _rehash_password(user, password):
+        """Re-hash a password stored with another bcrypt cost; a failure only postpones it to the next login"""
+        try:
+            user.password = password
+            db.session.commit()
+        except PasswordHasherBusy:
+            db.session.rollback()
+        except Exception as e:
+            db.session.rollback()
+            print("⚠️ Failed to rehash password:", str(e))
     
     @staticmethod
     def generate_tokens(user):
@@ -17,7 +32,8 @@ class AuthService:
         additional_claims = {
             'user_id': user.user_id,
             'is_admin': user.is_admin,
-            'email': user.email
+            'email': user.email,
+            'token_version': user.token_version or 0
         }
         
         access_token = create_access_token(
@@ -44,7 +60,8 @@ class AuthService:
         additional_claims = {
             'user_id': user.user_id,
             'is_admin': user.is_admin,
-            'email': user.email
+            'email': user.email,
+            'token_version': user.token_version or 0
         }
         
         new_access_token = create_access_token(
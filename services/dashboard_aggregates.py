@@ -0,0 +1,288 @@
+from models.receipt import Receipt
+from models.receipt_item import ReceiptItem
+from models.product import Product
+from app import db
+from sqlalchemy import func, case, distinct
+import pandas as pd
+from services.sales_rollup_service import SalesRollupService
+
+
+class DashboardAggregateService:
+    """SQL-side aggregation for the dashboard (GROUP BY in the database instead of pandas)"""
+
+    # Minute bucket used by revenueOverTime, matching pandas' "%Y-%m-%d %H:%M"
+    MINUTE_FORMATS = {
+        'sqlite': lambda col: func.strftime('%Y-%m-%d %H:%M', col),
+        'mysql': lambda col: func.date_format(col, '%Y-%m-%d %H:%i'),
+        'mariadb': lambda col: func.date_format(col, '%Y-%m-%d %H:%i'),
+        'postgresql': lambda col: func.to_char(col, 'YYYY-MM-DD HH24:MI'),
+    }
+
+    @staticmethod
+    def _minute_bucket(column):
+        """Dialect specific expression truncating a datetime column to the minute"""
+        dialect = db.session.get_bind().dialect.name
+        if dialect not in DashboardAggregateService.MINUTE_FORMATS:
+            raise ValueError(f"SQL dashboard engine does not support the '{dialect}' dialect")
+        return DashboardAggregateService.MINUTE_FORMATS[dialect](column)
+
+    @staticmethod
+    def window_filters(window):
+        """Receipt.created_at filters for a (lower, upper) window; either bound may be None"""
+        lower, upper = window
+        filters = []
+        if lower:
+            filters.append(Receipt.created_at >= lower)
+        if upper:
+            filters.append(Receipt.created_at < upper)
+        return filters
+
+    @staticmethod
+    def _items_query(*columns):
+        """Live receipt items joined to their receipt and product"""
+        return db.session.query(*columns).select_from(ReceiptItem).join(
+            Receipt, ReceiptItem.receipt_id == Receipt.receipt_id
+        ).join(
+            Product, ReceiptItem.prod_id == Product.prod_id
+        ).filter(
+            Receipt.deleted_at.is_(None),
+            ReceiptItem.deleted_at.is_(None)
+        )
+
+    @staticmethod
+    def _package_lines(filters, package):
+        """Subquery with one sales line per ``package`` receipt that has live items.
+
+        Columns: receipt_id, gross_amount and created_at, the time of the
+        receipt's first item (items of one receipt share their timestamp).
+        Package receipts without items have no sales line, as in the pandas engine.
+        """
+        return db.session.query(
+            Receipt.receipt_id.label('receipt_id'),
+            Receipt.gross_amount.label('gross_amount'),
+            func.min(ReceiptItem.created_at).label('created_at')
+        ).join(
+            ReceiptItem, ReceiptItem.receipt_id == Receipt.receipt_id
+        ).filter(
+            Receipt.deleted_at.is_(None),
+            ReceiptItem.deleted_at.is_(None),
+            Receipt.package == package,
+            *filters
+        ).group_by(Receipt.receipt_id, Receipt.gross_amount).subquery()
+
+    @staticmethod
+    def _first_seen_products(filters, package, count):
+        """Item product names of ordinary receipts in order of first appearance, receipts newest first.
+
+        Matches pandas' unique() over the sales lines. Reads items only until
+        ``count`` names were seen, which is usually a few recent receipts.
+        """
+        query = DashboardAggregateService._items_query(Product.name).filter(
+            Receipt.package != package, *filters
+        ).order_by(Receipt.created_at.desc())
+        names = {}
+        with db.session.execute(query.statement.execution_options(yield_per=1000)) as result:
+            for name in result.scalars():
+                names.setdefault(name, None)
+                if len(names) >= count:
+                    break
+        return list(names)
+
+    @staticmethod
+    def get_period_summary(window, package):
+        """Totals, product breakdown and revenue over time for the selected period.
+
+        Sales lines are the items of ordinary receipts plus one line per
+        ``package`` receipt with live items, priced at the receipt's gross
+        amount. Items named like the package are priced like it as well: each
+        line at its standard unit price. Returns None when no receipt falls
+        inside the window.
+        """
+        filters = DashboardAggregateService.window_filters(window)
+        total_receipts, total_revenue = db.session.query(
+            func.count(Receipt.receipt_id),
+            func.coalesce(func.sum(Receipt.gross_amount), 0)
+        ).filter(Receipt.deleted_at.is_(None), *filters).one()
+        if not total_receipts:
+            return None
+        package_lines = DashboardAggregateService._package_lines(filters, package)
+        package_count, package_revenue = db.session.query(
+            func.count(),
+            func.coalesce(func.sum(package_lines.c.gross_amount), 0)
+        ).select_from(package_lines).one()
+        package_revenue = float(package_revenue)
+
+        if SalesRollupService.covers(window):
+            products = SalesRollupService.get_product_totals(window, exclude_package=package)
+        else:
+            products = DashboardAggregateService._items_query(
+                Product.name,
+                func.sum(ReceiptItem.quantity),
+                func.sum(ReceiptItem.total_vend_price),
+                func.sum(ReceiptItem.total_std_price),
+                func.sum(ReceiptItem.std_price),
+                func.sum(ReceiptItem.vendor_price),
+                func.count(ReceiptItem.id)
+            ).filter(Receipt.package != package, *filters).group_by(Product.name).all()
+
+        # name -> [quantity, revenue, std revenue, std price sum, vend price sum, lines]
+        totals = {}
+        for name, quantity, revenue, std_revenue, std_sum, vend_sum, lines in products:
+            if name == package:
+                revenue = std_revenue = vend_sum = std_sum
+            totals[name] = [float(quantity), float(revenue), float(std_revenue), float(std_sum), float(vend_sum), int(lines)]
+        unique_products = DashboardAggregateService._first_seen_products(filters, package, len(totals)) if totals else []
+        if package_count:
+            line = totals.setdefault(package, [0.0, 0.0, 0.0, 0.0, 0.0, 0])
+            line[0] += package_count
+            for column in range(1, 5):
+                line[column] += package_revenue
+            line[5] += package_count
+            # Package lines follow every item line
+            if package not in unique_products:
+                unique_products.append(package)
+
+        names = sorted(totals)
+        return {
+            'totalReceipts': int(total_receipts),
+            'totalRevenue': float(total_revenue),
+            'totalStdRevenue': sum(totals[name][2] for name in names),
+            'totalProducts': sum(totals[name][0] for name in names),
+            'uniqueProducts': len(unique_products),
+            'uniqueProductslist': unique_products,
+            'productRevenue': [
+                {'name': name, 'revenue': totals[name][1], 'quantity': totals[name][0]} for name in names
+            ],
+            'priceComparison': [
+                {'name': name, 'std_price': totals[name][3] / totals[name][5], 'vend_price': totals[name][4] / totals[name][5]}
+                for name in names
+            ],
+            'revenueOverTime': DashboardAggregateService.get_revenue_over_time(window, package)
+        }
+
+    @staticmethod
+    def get_revenue_over_time(window, package):
+        """Revenue and receipt count per minute bucket of the sales lines"""
+        filters = DashboardAggregateService.window_filters(window)
+        item_bucket = DashboardAggregateService._minute_bucket(ReceiptItem.created_at)
+        item_rows = DashboardAggregateService._items_query(
+            item_bucket,
+            func.sum(case((Product.name == package, ReceiptItem.std_price), else_=ReceiptItem.total_vend_price)),
+            func.count(distinct(Receipt.receipt_id))
+        ).filter(Receipt.package != package, *filters).group_by(item_bucket).all()
+
+        package_lines = DashboardAggregateService._package_lines(filters, package)
+        package_bucket = DashboardAggregateService._minute_bucket(package_lines.c.created_at)
+        package_rows = db.session.query(
+            package_bucket,
+            func.sum(package_lines.c.gross_amount),
+            func.count()
+        ).select_from(package_lines).group_by(package_bucket).all()
+
+        # A receipt has either item lines or a package line, so receipt counts add up
+        buckets = {}
+        for bucket, revenue, receipts in list(item_rows) + list(package_rows):
+            entry = buckets.setdefault(bucket, {'date': bucket, 'revenue': 0.0, 'receipts': 0})
+            entry['revenue'] += float(revenue)
+            entry['receipts'] += int(receipts)
+        return [buckets[bucket] for bucket in sorted(buckets)]
+
+    @staticmethod
+    def empty_previous_summary():
+        """Previous period totals when there is nothing to compare against"""
+        return {
+            'totalRevenue': 0,
+            'totalReceipts': 0,
+            'totalProducts': 0,
+            'uniqueProducts': 0,
+            'productRevenue': []
+        }
+
+    @staticmethod
+    def get_previous_period_summary(window):
+        """Totals and product breakdown used for trend comparison"""
+        filters = DashboardAggregateService.window_filters(window)
+        total_receipts = db.session.query(func.count(Receipt.receipt_id)).filter(
+            Receipt.deleted_at.is_(None), *filters
+        ).scalar()
+        if not total_receipts:
+            return DashboardAggregateService.empty_previous_summary()
+
+        if SalesRollupService.covers(window):
+            products = [(name, revenue, quantity) for name, quantity, revenue, *_ in
+                        SalesRollupService.get_product_totals(window)]
+        else:
+            products = DashboardAggregateService._items_query(
+                Product.name,
+                func.sum(ReceiptItem.total_vend_price),
+                func.sum(ReceiptItem.quantity)
+            ).filter(*filters).group_by(Product.name).all()
+        product_revenue = [
+            {'name': name, 'revenue': float(revenue), 'quantity': int(quantity)}
+            for name, revenue, quantity in sorted(products)
+        ]
+        return {
+            'totalRevenue': sum(item['revenue'] for item in product_revenue),
+            'totalReceipts': int(total_receipts),
+            'totalProducts': sum(item['quantity'] for item in product_revenue),
+            'uniqueProducts': len(product_revenue),
+            'productRevenue': product_revenue
+        }
+
+    @staticmethod
+    def _sorted_by_created_at(keys):
+        """(receipt_number, created_at) keys sorted with DataFrame.sort_values on created_at.
+
+        That sort is not stable; using it keeps receipts stamped in the same
+        second in the order the pandas engine returns them.
+        """
+        order = pd.Series([created_at for _, created_at in keys]).sort_values().index
+        return [keys[position] for position in order]
+
+    @staticmethod
+    def get_receipt_reports(window, package):
+        """Per receipt quantity and revenue pivots (quantity_report / revenue_report).
+
+        Every live item counts, plus one line per ``package`` receipt at its
+        package amount; items named like the package are priced at their
+        standard unit price.
+        """
+        filters = DashboardAggregateService.window_filters(window)
+        rows = DashboardAggregateService._items_query(
+            Receipt.receipt_number,
+            Receipt.created_at,
+            Product.name,
+            func.sum(ReceiptItem.quantity),
+            func.sum(case((Product.name == package, ReceiptItem.std_price), else_=ReceiptItem.total_vend_price))
+        ).filter(*filters).group_by(
+            Receipt.receipt_number, Receipt.created_at, Product.name
+        ).all()
+        rows = [(number, created_at, name, float(quantity), float(revenue))
+                for number, created_at, name, quantity, revenue in rows]
+        package_rows = db.session.query(
+            Receipt.receipt_number,
+            Receipt.created_at,
+            Receipt.package_amt
+        ).filter(Receipt.deleted_at.is_(None), Receipt.package == package, *filters).all()
+        rows.extend((number, created_at, package, 1.0, float(amount))
+                    for number, created_at, amount in package_rows)
+
+        columns = sorted({row[2] for row in rows})
+        quantities = {}
+        revenues = {}
+        for number, created_at, name, quantity, revenue in rows:
+            key = (number, created_at.strftime('%d-%m-%Y %H:%M:%S'))
+            if key not in quantities:
+                base = {'receipt_number': number, 'created_at': key[1]}
+                quantities[key] = dict(base, **{column: 0.0 for column in columns})
+                revenues[key] = dict(base, **{column: 0.0 for column in columns})
+            quantities[key][name] += quantity
+            revenues[key][name] += revenue
+        # Pivot order first, then the revenue report moves receipts with package revenue last
+        keys = sorted(quantities)
+        revenue_keys = keys
+        if package in columns:
+            revenue_keys = ([key for key in keys if revenues[key][package] == 0] +
+                            [key for key in keys if revenues[key][package] != 0])
+        sort = DashboardAggregateService._sorted_by_created_at
+        return [quantities[key] for key in sort(keys)], [revenues[key] for key in sort(revenue_keys)]
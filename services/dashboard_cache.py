@@ -0,0 +1,94 @@
+from datetime import datetime, date
+from utils.cache import build_cache
+from utils.metrics import record_cache_lookup
+from environment import (
+    DASHBOARD_CACHE_ENABLED, DASHBOARD_CACHE_TTL, DASHBOARD_CACHE_HISTORY_TTL,
+    DASHBOARD_CACHE_SIZE, DASHBOARD_CACHE_URL
+)
+
+cache = build_cache(DASHBOARD_CACHE_URL, DASHBOARD_CACHE_SIZE)
+
+
+class DashboardCacheService:
+    """Caches serialized dashboard responses per (period, start, end, package, currency).
+
+    Keys embed two generation counters instead of being deleted one by one:
+    ``live`` is bumped by every receipt write and only appears in keys of
+    ranges that include today, ``all`` is bumped when historical data changes
+    (receipt deletes, rollup rebuilds) and appears in every key.
+
+    Without DASHBOARD_CACHE_URL the counters are per process, so a write on
+    one worker does not invalidate the others' entries; every entry then
+    expires after DASHBOARD_CACHE_TTL, historical ranges included.
+    """
+
+    ALL_GENERATION = 'dashboard:generation:all'
+    LIVE_GENERATION = 'dashboard:generation:live'
+
+    @staticmethod
+    def _day(value):
+        if value is None:
+            return None
+        if isinstance(value, (datetime, date)):
+            return value.strftime('%Y-%m-%d')
+        return str(value)
+
+    @staticmethod
+    def is_live(end_date):
+        """True when a range ending at ``end_date`` (None = open ended) includes today"""
+        end_day = DashboardCacheService._day(end_date)
+        return end_day is None or end_day >= date.today().strftime('%Y-%m-%d')
+
+    @staticmethod
+    def make_key(period, start_date, end_date, package, currency):
+        """Returns (key, live); None when caching is disabled or the backend is unavailable"""
+        if not DASHBOARD_CACHE_ENABLED:
+            return None, False
+        try:
+            live = DashboardCacheService.is_live(end_date)
+            generation = cache.get_counter(DashboardCacheService.ALL_GENERATION)
+            live_generation = cache.get_counter(DashboardCacheService.LIVE_GENERATION) if live else 0
+        except Exception as e:
+            print("⚠️ Dashboard cache unavailable:", str(e))
+            return None, False
+        parts = [period, DashboardCacheService._day(start_date), DashboardCacheService._day(end_date), package, currency]
+        key = f"dashboard:{generation}:{live_generation}:" + '|'.join('' if part is None else str(part) for part in parts)
+        return key, live
+
+    @staticmethod
+    def get(key):
+        if key is None:
+            return None
+        try:
+            body = cache.get(key)
+        except Exception as e:
+            print("⚠️ Dashboard cache read failed:", str(e))
+            return None
+        record_cache_lookup('dashboard', body is not None)
+        return body
+
+    @staticmethod
+    def set(key, body, live):
+        if key is None:
+            return
+        try:
+            long_lived = cache.shared and not live
+            cache.set(key, body, DASHBOARD_CACHE_HISTORY_TTL if long_lived else DASHBOARD_CACHE_TTL)
+        except Exception as e:
+            print("⚠️ Dashboard cache write failed:", str(e))
+
+    @staticmethod
+    def invalidate_live():
+        """Drop every cached range that includes today (call after a receipt write commits)"""
+        try:
+            cache.incr(DashboardCacheService.LIVE_GENERATION)
+        except Exception as e:
+            print("⚠️ Dashboard cache invalidation failed:", str(e))
+
+    @staticmethod
+    def invalidate_all():
+        """Drop every cached range, historical ones included"""
+        try:
+            cache.incr(DashboardCacheService.ALL_GENERATION)
+        except Exception as e:
+            print("⚠️ Dashboard cache invalidation failed:", str(e))
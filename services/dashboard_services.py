@@ -2,15 +2,35 @@ from models.receipt import Receipt
 from models.receipt_item import ReceiptItem
 from models.product import Product
 from models.user import User
+from models.loaders import receipt_list_options
 from app import db
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, or_, text
+from sqlalchemy import func, and_, or_, text, type_coerce
+from concurrent.futures import Future, ThreadPoolExecutor
 from decimal import Decimal
+import numpy as np
 import pandas as pd
-from flask import jsonify
+from flask import jsonify, current_app, url_for
 from io import BytesIO
 import base64
-from services.sales_report_ver3 import generate_comprehensive_excel_report
+from services.sales_report_ver3 import generate_comprehensive_excel_bytes, REPORT_FILENAME, REPORT_MIMETYPE
+from services.dashboard_aggregates import DashboardAggregateService
+from services.dashboard_cache import DashboardCacheService
+from services.product_catalog import product_catalog
+from environment import DASHBOARD_ENGINE, DASHBOARD_PREVIOUS_PERIOD_WORKERS
+
+# Previous period totals are aggregated here while the request thread works on the current period
+previous_period_executor = ThreadPoolExecutor(
+    max_workers=DASHBOARD_PREVIOUS_PERIOD_WORKERS, thread_name_prefix='dashboard-prev'
+) if DASHBOARD_PREVIOUS_PERIOD_WORKERS > 0 else None
+
+
+def _previous_period_summary(app, window):
+    # A fresh app context gives the worker its own session, removed again when the context ends
+    with app.app_context():
+        return DashboardAggregateService.get_previous_period_summary(window)
+
+
 class DashboardService:
 
     @staticmethod
@@ -19,7 +39,7 @@ class DashboardService:
         try:
             # Build base query
             # with app.app_context():
-            query = Receipt.query.filter_by(deleted_at=None)
+            query = Receipt.query.options(*receipt_list_options()).filter_by(deleted_at=None)
             # Apply date filters if provided
             if start_date:
                 try:
@@ -80,7 +100,7 @@ class DashboardService:
         try:
             # with app.app_context():
             # Build base query               
-            query = Receipt.query.filter_by(deleted_at=None)
+            query = Receipt.query.options(*receipt_list_options()).filter_by(deleted_at=None)
             # Apply date filters if provided
             if start_date:
                 try:
@@ -99,10 +119,7 @@ class DashboardService:
                     # return None, "Invalid end_date format. Use YYYY-MM-DD"
                     pass
             # Order by latest first
-                query = query.order_by(Receipt.created_at.desc())
-                # receipts_items = query.receipt_items()
-                receipts_paginated = query.all()  
-                receipts_paginated = [rcpt.to_dict() for rcpt in receipts_paginated]
+            query = query.order_by(Receipt.created_at.desc())
             # Paginate results
             # receipts_paginated = query.paginate(
             #     page=page, per_page=per_page, error_out=False
@@ -111,8 +128,7 @@ class DashboardService:
             # Group receipts by date
             receipts_by_date = {}
             for receipt in receipts_paginated:      
-                # date_key = receipt.created_at.strftime('%d-%m-%Y')
-                date_key = receipt["created_at"]
+                date_key = receipt.created_at.strftime('%d-%m-%Y')
                 
                 if date_key not in receipts_by_date:
                     receipts_by_date[date_key] = {
@@ -321,37 +337,6 @@ class DashboardService:
     #         return response
 
     # ------------------ Helpers ------------------
-    @staticmethod
-    def group_revenue_over_time(df: pd.DataFrame, period: str):
-        """Group revenue dynamically by period"""
-        print(f"Grouping revenue for period: {period}")
-        # if period == "today":
-        #     df["period_group"] = df["created_at"].dt.strftime("%H:00")   # hourly
-        if period == "today":
-            print("Grouping by hour started",df['created_at'].head())
-            df['created_at'] = pd.to_datetime(df['created_at'])
-            df["period_group"] = df["created_at"].dt.strftime("%Y-%m-%d %H:%M")
-        elif period == "7":
-            df["period_group"] = df["created_at"].dt.strftime("%Y-%m-%d")  # daily
-        elif period == "30":
-            print("Grouping by week started")
-            df["period_group"] = df["created_at"].dt.to_period("W").astype(str)  # weekly
-            print("Grouping by week Finished")
-        elif period in ["year", "all"]:
-            df["period_group"] = df["created_at"].dt.strftime("%Y-%m")  # monthly
-        else:
-            df["period_group"] = df["created_at"].dt.strftime("%Y-%m-%d")
-        print("Grouped DF:\n", df.head())
-        df['total_std_price'] = df['total_std_price'].astype(int)
-        return  (
-            df.groupby("period_group")
-            .agg(revenue=("total_vend_price", "sum"),
-                receipts=("receipt_number", pd.Series.nunique))
-            .reset_index()
-            .rename(columns={"period_group": "date"})
-            .to_dict("records")
-        )
-
     @staticmethod
     def calc_trend(current, prev):
         """Calculate % change between current and previous values"""
@@ -364,36 +349,30 @@ class DashboardService:
         return f"{sign}{change:.1f}%"
 
 
-    def get_previous_period_data(start_date, end_date):
-        """Fetch receipts for the previous period for trend comparison"""
-        # Convert to datetime if needed
-        if isinstance(start_date, str):
-            start_date = datetime.strptime(start_date, "%Y-%m-%d")
-        if isinstance(end_date, str):
-            end_date = datetime.strptime(end_date, "%Y-%m-%d")
-
-        print(f"Fetching previous period data for {start_date} to {end_date}")
+    @staticmethod
+    def previous_period_range(start_date, end_date):
+        """Window of the same length immediately before start_date"""
         delta = end_date - start_date
         
         # Handle zero-length period (e.g., today)
         if delta.total_seconds() <= 0:
             delta = timedelta(days=1)
-        
-        prev_start = start_date - delta
-        prev_end = start_date
-        # with app.app_context():
-        prev_query = Receipt.query.filter(
-            Receipt.deleted_at.is_(None),
-            Receipt.created_at >= prev_start,
-            Receipt.created_at < prev_end
-        ).all()
-        # prev_query[0].to_dict()
-            
-        
-        # print(f"Previous period receipts count: {len(prev_query)}")
-        return [r.to_dict() for r in prev_query]
-    
-    
+        return start_date - delta, start_date
+
+    @staticmethod
+    def submit_previous_period_summary(start_date, end_date):
+        """Future of DashboardAggregateService.get_previous_period_summary for the window before start_date"""
+        window = DashboardService.previous_period_range(start_date, end_date)
+        app = current_app._get_current_object()
+        if previous_period_executor is not None:
+            return previous_period_executor.submit(_previous_period_summary, app, window)
+        future = Future()
+        try:
+            future.set_result(_previous_period_summary(app, window))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
     # --- Growth Trend Calculation ---  
     def calc_growth_trend(*metrics_trends):
         """Calculate the average growth trend from individual metrics."""
@@ -405,31 +384,6 @@ class DashboardService:
         avg_trend = sum(float(trend.replace("%", "")) for trend in valid_trends) / len(valid_trends)
         return f"{avg_trend:.1f}%"
     
-    @staticmethod
-    def create_sales_report_data(df):
-        print("create_sales_report_data function initialized")
-        # Create the nested JSON report
-        report = {}
-        # Group by date and product name
-        grouped = df.groupby([df['created_at'], 'product_name']).agg(
-            total_quantity=('quantity', 'sum'),
-            total_revenue=('total_vend_price', 'sum')
-        ).reset_index()
-
-        # Loop through grouped data and build the nested structure
-        for _, row in grouped.iterrows():
-            date = row['created_at'] # Format the date as 'date1', 'date2', etc.
-            product = row['product_name']
-            quantity = row['total_quantity']
-            revenue = row['total_revenue']
-            
-            if date not in report:
-                report[date] = {}
-            
-            report[date][product] = {'quantity': quantity, 'revenue': revenue}
-            print("create_sales_report_data function finished")
-        return report
-    
     def periodic_product_revenue(currentproductRevenue, prev_productRevenue):
         # Combine both periods for comparison
         product_comparison = []
@@ -458,205 +412,303 @@ class DashboardService:
 
     # ------------------ Main Function ------------------
     @staticmethod
-    def get_dashboard_data(start_date, end_date, package, currency,period="today"):
-        """Get receipt dashboard with dynamic grouping and revenue trends"""
+    def resolve_date_window(start_date, end_date):
+        """Parse the requested range into a (lower, upper) Receipt.created_at window.
+
+        Returns (start_date, end_date, window, error); end_date is returned
+        already shifted past the last included day, as the trend window expects.
+        """
+        lower = upper = None
+        if start_date and not isinstance(start_date, datetime):
+            try:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d')
+            except ValueError:
+                return None, None, None, "Invalid start_date format. Use YYYY-MM-DD"
+        if start_date and isinstance(start_date, datetime):
+            lower = start_date
+        if end_date and not isinstance(end_date, datetime):
+            try:
+                end_date = datetime.strptime(end_date, '%Y-%m-%d')
+                end_date = end_date + timedelta(days=1)
+                upper = end_date
+            except ValueError:
+                return None, None, None, "Invalid end_date format. Use YYYY-MM-DD"
+        if end_date and isinstance(end_date, datetime):
+            end_date = end_date + timedelta(days=1)
+            upper = min(upper, end_date) if upper else end_date
+        return start_date, end_date, (lower, upper), None
+
+    @staticmethod
+    def report_link(period, start_date=None, end_date=None):
+        """Where the Excel workbook for this dashboard view can be downloaded"""
+        params = {'period': period}
+        if period == 'custom' and start_date and end_date:
+            params.update(start_date=start_date, end_date=end_date)
+        return {
+            'url': url_for('dashboard.get_dashboard_report', **params),
+            'filename': REPORT_FILENAME,
+            'mimeType': REPORT_MIMETYPE
+        }
+
+    @staticmethod
+    def get_dashboard_report(start_date, end_date, package, currency, period="today"):
+        """Excel workbook for the dashboard view as (xlsx bytes, error)"""
+        response, _ = DashboardService.build_dashboard_data_sql(start_date, end_date, package, currency, period)
+        if not response["status"]:
+            return None, response["message"]
+        try:
+            return generate_comprehensive_excel_bytes(response["data"], currency), None
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    def get_dashboard_data(start_date, end_date, package, currency, period="today", engine=None):
+        """Get receipt dashboard with dynamic grouping and revenue trends.
+
+        ``engine`` selects the SQL aggregation path (default) or the original
+        pandas pipeline ("pandas"), which is kept for verifying the former.
+        """
+        engine = engine or DASHBOARD_ENGINE
+        if engine == "pandas":
+            return DashboardService.get_dashboard_data_pandas(start_date, end_date, package, currency, period)
+        cache_key, live = DashboardCacheService.make_key(period, start_date, end_date, package, currency)
+        cached = DashboardCacheService.get(cache_key)
+        if cached is not None:
+            return current_app.response_class(cached, mimetype=current_app.json.mimetype)
+        sales_report = DashboardService.report_link(period, start_date, end_date)
+        response, code = DashboardService.build_dashboard_data_sql(start_date, end_date, package, currency, period)
+        if response["status"]:
+            response["data"]["sales_report"] = sales_report
+        result = jsonify(response, code)
+        if response["status"]:
+            DashboardCacheService.set(cache_key, result.get_data(), live)
+        return result
+
+    @staticmethod
+    def build_dashboard_data_sql(start_date, end_date, package, currency, period="today"):
+        """SQL dashboard payload as (response, code), before serialization"""
         response = {"status": False, "message": "Something went wrong", "data": None}
         try:
-            # with app.app_context():
-            query = Receipt.query.filter_by(deleted_at=None)
-            # --- Apply date filters ---
-            if start_date and not isinstance(start_date, datetime):
-                try:
-                    print("Parsing start_date:", start_date)
-                    start_date = datetime.strptime(start_date, '%Y-%m-%d')
-                except ValueError:
-                    print("Invalid start_date format")
-                    response["message"] = "Invalid start_date format. Use YYYY-MM-DD"
-                    return jsonify(response, 400)
-                    # return response
-            if start_date and isinstance(start_date, datetime):
-                query = query.filter(Receipt.created_at >= start_date)
-                # receipts = query.order_by(Receipt.created_at.desc()).all()
-                # receipts = [r.to_dict() for r in receipts]
-                # print("result from start_date:", receipts)
-            if end_date and not isinstance(end_date, datetime):
-                try:
-                    print("Parsing end_date:", end_date)
-                    end_date = datetime.strptime(end_date, '%Y-%m-%d')
-                    end_date = end_date + timedelta(days=1)
-                    print("Filtering up to end_date (adjusted):", end_date)
-                    query = query.filter(Receipt.created_at < end_date)
-                except ValueError:
-                    print("Invalid end_date format")
-                    response["message"] = "Invalid end_date format. Use YYYY-MM-DD"
-                    return jsonify(response, 400)
-                    # return response
-            print("End date before processing:", end_date)
-            if end_date and isinstance(end_date, datetime):
-                print("Filtering up to end_date:", start_date,end_date)
-                end_date = end_date + timedelta(days=1)
-                print("Filtering up to end_date (adjusted):", end_date)
-                query = query.filter(Receipt.created_at < end_date)
-            receipts = query.order_by(Receipt.created_at.desc()).all()
-            receipts = [r.to_dict() for r in receipts]
-            # print(f"Receipts are",receipts)
-            if not receipts:
+            start_date, end_date, window, error = DashboardService.resolve_date_window(start_date, end_date)
+            if error:
+                response["message"] = error
+                return response, 400
+            previous = DashboardService.submit_previous_period_summary(start_date, end_date) if (start_date and end_date) else None
+            summary = DashboardAggregateService.get_period_summary(window, package)
+            if not summary:
+                if previous:
+                    previous.cancel()
                 response["message"] = "No records available for the selected time period"
-                return jsonify(response, 204)
-                # return response
-
-            # --- Build DataFrames ---
-            receipt_df = pd.DataFrame(receipts)
-            print("Reeceipt DF", receipt_df)
-            # receipt_df.to_csv(r"C:\Users\RAVI KANT\Documents\backend_code\ravi.csv")
-            items = []
-            for r in receipts:
-                for itm in r['items']:
-                    itm["receipt_number"] = r['receipt_number']
-                #     itm["created_at"] = r['created_at']
-                #     itm["package"] = r['package']
-                items.extend(r["items"])
-            items_df = pd.DataFrame(items)      
-                 
-            # Add Package as Services rows
-            full_pkg = receipt_df[receipt_df["package"] == package].rename(
-                columns={"package": "product_name", "gross_amount": "std_price"}
+                return response, 204
+
+            prev = previous.result() if previous else DashboardAggregateService.empty_previous_summary()
+            product_comparison = DashboardService.periodic_product_revenue(summary["productRevenue"], prev["productRevenue"])
+            revenueTrend = DashboardService.calc_trend(summary["totalRevenue"], prev["totalRevenue"])
+            receiptsTrend = DashboardService.calc_trend(summary["totalReceipts"], prev["totalReceipts"])
+            productTrend = DashboardService.calc_trend(summary["totalProducts"], prev["totalProducts"])
+            uniqueProductTrend = DashboardService.calc_trend(summary["uniqueProducts"], prev["uniqueProducts"])
+            growthTrend = DashboardService.calc_growth_trend(
+                revenueTrend, receiptsTrend, productTrend, uniqueProductTrend
             )
-            full_pkg = full_pkg.reset_index(drop=True)
-                    
-            tmp_df =items_df[items_df['receipt_id'].isin(full_pkg['receipt_id'])]
-            tmp_df = tmp_df.drop_duplicates(subset=['receipt_id'], keep='first')
-            tmp_df = tmp_df.reset_index(drop=True)
-            
-            full_pkg = full_pkg.merge(tmp_df[['receipt_id', 'created_at']], on='receipt_id', how='inner', suffixes=('', '_from_df1'))
-            
-            # Now, overwrite the 'created_at' column in df2 with the 'created_at_from_df1' from df1
-            full_pkg['created_at'] = full_pkg['created_at_from_df1']
-            # Drop the temporary column 'created_at_from_df1' if it's no longer needed
-            full_pkg.drop(columns=['created_at_from_df1'], inplace=True)
-            items_df = items_df[~items_df['receipt_number'].isin(full_pkg['receipt_number'])]
-            merged_df = pd.concat([items_df, full_pkg], ignore_index=True, sort=False)
-            merged_df["quantity"] = merged_df["quantity"].fillna(1)
-            # merged_df["created_at"] = pd.to_datetime(merged_df["created_at"], errors="coerce")
-
-            # Fix prices for Full Package
-            cond = merged_df["product_name"] == package
-            
-            merged_df.loc[cond, "total_std_price"] = merged_df.loc[cond, "std_price"]
-            merged_df.loc[cond, "total_vend_price"] = merged_df.loc[cond, "std_price"]
-            merged_df.loc[cond, "vend_price"] = merged_df.loc[cond, "std_price"]
-            merged_df.drop(['id', 'receipt_id', 'prod_id','free','recipient_name', 'recipient_number',
-            'tot_vend_amt','tot_std_amt', 'tax_amount', 'payment_mode', 'transaction_number', 'created_by','updated_at','items'], axis =1, inplace=True)
-            
+            quantity_report, revenue_report = DashboardAggregateService.get_receipt_reports(window, package)
+
+            dashboard_data = {
+                "period": period,
+                "totalReceipts": summary["totalReceipts"],
+                "totalRevenue": summary["totalRevenue"],
+                "prev_totalRevenue": prev["totalRevenue"],
+                "totalStdRevenue": summary["totalStdRevenue"],
+                "totalProducts": summary["totalProducts"],
+                "uniqueProducts": summary["uniqueProducts"],
+                "productRevenue": summary["productRevenue"],
+                "product_comparison": product_comparison,
+                "revenueOverTime": summary["revenueOverTime"],
+                "priceComparison": summary["priceComparison"],
+                "revenueTrend": revenueTrend,
+                "receiptsTrend": receiptsTrend,
+                "productTrend": productTrend,
+                "uniqueProductTrend": uniqueProductTrend,
+                "growthTrend": growthTrend,
+                "quantity_report": quantity_report,
+                "revenue_report": revenue_report,
+                "uniqueProductslist": summary["uniqueProductslist"],
+            }
+            response["status"] = True
+            response["message"] = "Dashboard data generated successfully"
+            response["data"] = dashboard_data
+            response['period'] = period
+            return response, 200
+        except Exception as e:
+            response["message"] = str(e)
+            return response, 500
+
+    @staticmethod
+    def load_dashboard_columns(window):
+        """Live receipts of ``window`` (newest first) and their live items, as typed columns.
+
+        Items are grouped by receipt in receipt order; ``receipt`` holds the
+        position of each item's receipt in the receipts frame.
+        """
+        filters = [Receipt.deleted_at.is_(None), *DashboardAggregateService.window_filters(window)]
+        receipts = pd.DataFrame.from_records(
+            db.session.query(
+                Receipt.receipt_id,
+                Receipt.receipt_number,
+                Receipt.package,
+                type_coerce(Receipt.package_amt, db.Float),
+                type_coerce(Receipt.gross_amount, db.Float),
+                Receipt.created_at
+            ).filter(*filters).order_by(Receipt.created_at.desc()).all(),
+            columns=['receipt_id', 'receipt_number', 'package', 'package_amt', 'gross_amount', 'created_at']
+        ).astype({'package_amt': float, 'gross_amount': float})
+        items = pd.DataFrame.from_records(
+            db.session.query(
+                ReceiptItem.receipt_id,
+                ReceiptItem.prod_id,
+                ReceiptItem.quantity,
+                type_coerce(ReceiptItem.std_price, db.Float),
+                type_coerce(ReceiptItem.vendor_price, db.Float),
+                type_coerce(ReceiptItem.total_std_price, db.Float),
+                type_coerce(ReceiptItem.total_vend_price, db.Float),
+                ReceiptItem.created_at
+            ).join(Receipt, ReceiptItem.receipt_id == Receipt.receipt_id).filter(
+                *filters, ReceiptItem.deleted_at.is_(None)
+            ).all(),
+            columns=['receipt_id', 'prod_id', 'quantity', 'std_price', 'vend_price',
+                     'total_std_price', 'total_vend_price', 'created_at']
+        ).astype({'std_price': float, 'vend_price': float, 'total_std_price': float, 'total_vend_price': float})
+        position = pd.Index(receipts['receipt_id']).get_indexer(items['receipt_id'])
+        order = np.argsort(position, kind='stable')
+        items = items.iloc[order].reset_index(drop=True)
+        items['receipt'] = position[order]
+        # One catalog lookup per product rather than per item
+        names = {prod_id: product_catalog.name(prod_id) for prod_id in items['prod_id'].unique()}
+        items['product_name'] = items['prod_id'].map(names).astype('category')
+        return receipts, items
+
+    @staticmethod
+    def get_dashboard_data_pandas(start_date, end_date, package, currency, period="today"):
+        """Get receipt dashboard with dynamic grouping and revenue trends (pandas pipeline).
+
+        Works on columns loaded once by load_dashboard_columns; every figure is
+        a vectorized groupby / pivot over them.
+        """
+        response = {"status": False, "message": "Something went wrong", "data": None}
+        try:
+            report_link = DashboardService.report_link(period, start_date, end_date)
+            start_date, end_date, window, error = DashboardService.resolve_date_window(start_date, end_date)
+            if error:
+                response["message"] = error
+                return jsonify(response, 400)
+            previous = DashboardService.submit_previous_period_summary(start_date, end_date) if (start_date and end_date) else None
+            receipts, items = DashboardService.load_dashboard_columns(window)
+            if receipts.empty:
+                if previous:
+                    previous.cancel()
+                response["message"] = "No records available for the selected time period"
+                return jsonify(response, 204)
+
+            is_package = (receipts['package'] == package).to_numpy()
+            item_receipt = items['receipt'].to_numpy()
+            item_in_package = is_package[item_receipt]
+            item_is_package = (items['product_name'] == package).to_numpy()
+            quantity = items['quantity'].to_numpy(dtype=float)
+            # Product names stay categorical; package lines reuse the package's code
+            categories = items['product_name'].cat.categories.union([package])
+            name_codes = pd.Categorical(items['product_name'], categories=categories).codes
+            package_code = categories.get_loc(package)
+
+            # --- Sales lines: items of ordinary receipts, plus one line per package receipt ---
+            # A package receipt is priced at its gross amount and dated like its first item
+            first_items = np.flatnonzero(np.r_[True, item_receipt[1:] != item_receipt[:-1]]) if len(items) else item_receipt
+            first_items = first_items[item_in_package[first_items]]
+            package_receipts = item_receipt[first_items]
+            package_gross = receipts['gross_amount'].to_numpy()[package_receipts]
+            ordinary = ~item_in_package
+            # Items named like the package are priced like it as well
+            vend_price = np.where(item_is_package, items['std_price'], items['vend_price'])
+            total_std_price = np.where(item_is_package, items['std_price'], items['total_std_price'])
+            total_vend_price = np.where(item_is_package, items['std_price'], items['total_vend_price'])
+            lines = pd.DataFrame({
+                'product_name': pd.Categorical.from_codes(
+                    np.concatenate([name_codes[ordinary], np.full(len(first_items), package_code)]), categories
+                ),
+                'std_price': np.concatenate([items['std_price'].to_numpy()[ordinary], package_gross]),
+                'vend_price': np.concatenate([vend_price[ordinary], package_gross]),
+                'quantity': np.concatenate([quantity[ordinary], np.ones(len(first_items))]),
+                'total_std_price': np.concatenate([total_std_price[ordinary], package_gross]),
+                'total_vend_price': np.concatenate([total_vend_price[ordinary], package_gross]),
+                'receipt': np.concatenate([item_receipt[ordinary], package_receipts]),
+                'created_at': pd.to_datetime(np.concatenate([items['created_at'].to_numpy()[ordinary],
+                                                             items['created_at'].to_numpy()[first_items]]))
+            })
+
             # --- Totals ---
-            # merged_df.to_csv(r"C:\Users\RAVI KANT\Documents\backend_code\ravimerged.csv")
-            totalReceipts = receipt_df.shape[0]
-            totalRevenue = receipt_df['gross_amount'].sum()
-            # totalRevenue = merged_df["total_vend_price"].sum()
-            # total_vend_price is equalto gross_amount 
-            totalStdRevenue = merged_df["total_std_price"].sum()
-            totalProducts = merged_df["quantity"].sum()
-            uniqueProducts = merged_df["product_name"].nunique()
-            uniqueProductslist = merged_df["product_name"].unique().tolist()
-            # --- Product Revenue breakdown ---
-            productRevenue = (
-                merged_df.groupby("product_name")
+            totalReceipts = len(receipts)
+            totalRevenue = receipts['gross_amount'].sum()
+            totalStdRevenue = lines["total_std_price"].sum()
+            totalProducts = lines["quantity"].sum()
+            uniqueProducts = lines["product_name"].nunique()
+            uniqueProductslist = lines["product_name"].unique().tolist()
+            by_product = lines.groupby("product_name", observed=True).agg(
+                revenue=("total_vend_price", "sum"),
+                quantity=("quantity", "sum"),
+                std_price=("std_price", "mean"),
+                vend_price=("vend_price", "mean")
+            ).rename_axis("name").reset_index()
+            productRevenue = by_product[["name", "revenue", "quantity"]].to_dict("records")
+            priceComparison = by_product[["name", "std_price", "vend_price"]].to_dict("records")
+            # Bucket on the datetime and format only the bucket labels
+            revenueOverTime = (
+                lines.groupby(lines["created_at"].dt.floor("min"))
                 .agg(revenue=("total_vend_price", "sum"),
-                        quantity=("quantity", "sum"))
-                .reset_index()
-                .rename(columns={"product_name": "name"})
-                .to_dict("records")
-            )   
-            # --- Price Comparison ---
-            priceComparison = (
-                merged_df.groupby("product_name")
-                .agg(std_price=("std_price", "mean"),
-                        vend_price=("vend_price", "mean"))
+                     receipts=("receipt", "nunique"))
+                .rename_axis("date")
                 .reset_index()
-                .rename(columns={"product_name": "name"})
-                .to_dict("records")
             )
-            # priceComparison = (
-            #     merged_df.groupby("product_name")
-            #     .agg(std_price=("std_price", "sum"),
-            #             vend_price=("vend_price", "sum"))
-            #     .reset_index()
-            #     .rename(columns={"product_name": "name"})
-            #     .to_dict("records")
-            # )
-            revenueOverTime = DashboardService.group_revenue_over_time(merged_df, 'today')
+            revenueOverTime["date"] = revenueOverTime["date"].dt.strftime("%Y-%m-%d %H:%M")
+            revenueOverTime = revenueOverTime.to_dict("records")
 
-            # with app.app_context():
-            prev_receipts = DashboardService.get_previous_period_data(start_date, end_date) if (start_date and end_date) else []
-            # print(f"Previous period receipts count: {len(prev_receipts)}")
-            if prev_receipts:
-                prev_items = []
-                for r in prev_receipts:
-                    prev_items.extend(r["items"])
-                prev_df = pd.DataFrame(prev_items)
-                prev_totalRevenue = prev_df["total_vend_price"].sum()
-                prev_totalReceipts = len(prev_receipts)
-                prev_totalProducts = prev_df["quantity"].sum()
-                prev_uniqueProducts = prev_df["product_name"].nunique()
-                # --- Product Revenue breakdown ---
-                prev_productRevenue = (
-                    prev_df.groupby("product_name")
-                    .agg(revenue=("total_vend_price", "sum"),
-                            quantity=("quantity", "sum"))
-                    .reset_index()
-                    .rename(columns={"product_name": "name"})
-                    .to_dict("records")
-                )   
-            else:
-                prev_totalRevenue = prev_totalReceipts = prev_totalProducts = prev_uniqueProducts = 0
-                prev_productRevenue = []
+            # --- Previous period, aggregated concurrently ---
+            prev = previous.result() if previous else DashboardAggregateService.empty_previous_summary()
+            prev_totalRevenue = prev["totalRevenue"]
+            prev_totalReceipts = prev["totalReceipts"]
+            prev_totalProducts = prev["totalProducts"]
+            prev_uniqueProducts = prev["uniqueProducts"]
+            prev_productRevenue = prev["productRevenue"]
             product_comparison = DashboardService.periodic_product_revenue(productRevenue, prev_productRevenue)
             revenueTrend = DashboardService.calc_trend(totalRevenue, prev_totalRevenue)
             receiptsTrend = DashboardService.calc_trend(totalReceipts, prev_totalReceipts)
             productTrend = DashboardService.calc_trend(totalProducts, prev_totalProducts)
             uniqueProductTrend = DashboardService.calc_trend(uniqueProducts, prev_uniqueProducts)
 
-            # --- Calculate overall growth trend ---  
+            # --- Calculate overall growth trend ---
             growthTrend = DashboardService.calc_growth_trend(
                 revenueTrend, receiptsTrend, productTrend, uniqueProductTrend
             )
             print(f"Calculated growth trend: {growthTrend}")
-            if not receipts:
-                response["message"] = "No records available for the selected time period 2ndTime"
-                return jsonify(response, 204)
-            receipt_df = pd.DataFrame(receipts)
-            items = []
-            for r in receipts:
-                for itm in r['items']:
-                    itm["receipt_number"] = r['receipt_number']
-                    itm["created_at"] = r['created_at']
-                    itm["package"] = r['package']
-                items.extend(r["items"])
-            items_df = pd.DataFrame(items)
-            # print("Initial Items DF:\n", items_df.head())
-            # Add Full Package rows
-            full_pkg = receipt_df[receipt_df["package"] == package].rename(
-                columns={"package": "product_name", "package_amt": "std_price"}
+
+            # --- Per receipt reports: every item, plus a package line at package_amt per package receipt ---
+            packages = np.flatnonzero(is_package)
+            report_receipts = np.concatenate([item_receipt, packages])
+            receipt_numbers = receipts['receipt_number'].to_numpy(dtype=object)
+            receipt_dates = receipts['created_at'].dt.strftime('%d-%m-%Y %H:%M:%S').to_numpy(dtype=object)
+            report_lines = pd.DataFrame({
+                'receipt_number': receipt_numbers[report_receipts],
+                'created_at': receipt_dates[report_receipts],
+                'product_name': pd.Categorical.from_codes(
+                    np.concatenate([name_codes, np.full(len(packages), package_code)]), categories
+                ),
+                'quantity': np.concatenate([quantity, np.ones(len(packages))]),
+                'total_vend_price': np.concatenate([total_vend_price,
+                                                    receipts['package_amt'].to_numpy()[packages]]),
+            })
+            reports = report_lines.pivot_table(
+                index=["receipt_number", "created_at"], columns="product_name",
+                values=["quantity", "total_vend_price"], aggfunc="sum", fill_value=0, observed=True
             )
-            full_pkg['package'] = full_pkg['product_name']
-            merged_df = pd.concat([items_df, full_pkg], ignore_index=True, sort=False)
-            merged_df["quantity"] = merged_df["quantity"].fillna(1)
-            # merged_df["created_at"] = pd.to_datetime(merged_df["created_at"], errors="coerce")
-
-            # Fix prices for Full Package
-            cond = merged_df["product_name"] == package
-            merged_df.loc[cond, "total_std_price"] = merged_df.loc[cond, "std_price"]
-            merged_df.loc[cond, "total_vend_price"] = merged_df.loc[cond, "std_price"]
-            merged_df.loc[cond, "vend_price"] = merged_df.loc[cond, "std_price"]
-            merged_df.drop(['id', 'receipt_id', 'prod_id','free','recipient_name', 'recipient_number',
-            'tot_std_amt', 'tot_vend_amt', 'tax_amount', 'gross_amount',
-            'payment_mode', 'transaction_number', 'created_by','updated_at','items','package'], axis =1, inplace=True)
-            sales_report = DashboardService.create_sales_report_data(merged_df)
-            df_qt = merged_df.pivot_table(index=["receipt_number","created_at"], columns="product_name", values="quantity", aggfunc="sum", fill_value=0)
-            df_qt = df_qt.reset_index()
-            
-            df_prc = merged_df.pivot_table(index=["receipt_number", "created_at"], columns="product_name", values="total_vend_price", aggfunc="sum", fill_value=0)
-            df_prc = df_prc.reset_index()
+            df_qt = reports["quantity"].reset_index()
+            df_prc = reports["total_vend_price"].reset_index()
             if package in df_prc.columns:
                 df_prc2 = df_prc[df_prc[package]!=0]
                 df_prc1 = df_prc[df_prc[package]==0]
@@ -664,29 +716,6 @@ class DashboardService:
                 df_prc = pd.concat([df_prc1, df_prc2], ignore_index=True, sort=False)
             df_prc = df_prc.sort_values(by='created_at', ascending=True)
             df_qt = df_qt.sort_values(by='created_at', ascending=True)
-            # Generate Excel blob
-            dashboard_data = {
-                "period": period,
-                "totalReceipts": totalReceipts,
-                "totalRevenue": totalRevenue,
-                "prev_totalRevenue": prev_totalRevenue,
-                "totalStdRevenue": totalStdRevenue,
-                "totalProducts": totalProducts,
-                "uniqueProducts": uniqueProducts,
-                "productRevenue": productRevenue,
-                "product_comparison":product_comparison,
-                "revenueOverTime": revenueOverTime,
-                "priceComparison": priceComparison,
-                "revenueTrend": revenueTrend,
-                "receiptsTrend": receiptsTrend,
-                "productTrend": productTrend,
-                "uniqueProductTrend": uniqueProductTrend,
-                "growthTrend": growthTrend,    # placeholder
-                "quantity_report": df_qt.to_dict('records'),
-                "revenue_report": df_prc.to_dict('records'),
-                "sales_report": sales_report
-            }
-            excel_blob = generate_comprehensive_excel_report(dashboard_data, currency)
             # --- Final Response ---
             response["status"] = True
             response["message"] = "Dashboard data generated successfully"
@@ -706,14 +735,14 @@ class DashboardService:
                 "receiptsTrend": receiptsTrend,
                 "productTrend": productTrend,
                 "uniqueProductTrend": uniqueProductTrend,
-                "growthTrend": growthTrend,    
+                "growthTrend": growthTrend,
                 "quantity_report": df_qt.to_dict('records'),
                 "revenue_report": df_prc.to_dict('records'),
                 "uniqueProductslist": uniqueProductslist,
-                "sales_report": excel_blob
+                "sales_report": report_link
             }
             response['period'] = period
-            return jsonify(response, 200) 
+            return jsonify(response, 200)
         except Exception as e:
             response["message"] = str(e)
-            return jsonify(response, 500)          
\ No newline at end of file
+            return jsonify(response, 500)
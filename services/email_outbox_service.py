@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+import smtplib
+import threading
+from models.email_outbox import EmailOutbox
+from services.email_service import EmailService
+from app import db
+from environment import (
+    EMAIL_OUTBOX_POLL_SECONDS, EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_MAX_ATTEMPTS, EMAIL_OUTBOX_RETRY_SECONDS
+)
+
+
+class EmailOutboxService:
+    """Delivers queued emails from a background thread, a batch at a time over one SMTP session.
+
+    Every worker process runs a sender; a message is claimed with a
+    conditional UPDATE before it is sent, so only one of them sends it.
+    Delivery is at least once: a sender that dies between sending and
+    recording the result leaves the message to be sent again.
+    """
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    # Claims older than this belong to a sender that died mid-batch
+    CLAIM_TIMEOUT = timedelta(minutes=10)
+
+    # Set by enqueue so the sender in this process does not wait for its next poll
+    wakeup = threading.Event()
+
+    def __init__(self, app=None, email_service=None):
+        """Initialize email outbox service"""
+        self.app = app
+        self.email_service = email_service or EmailService(use_outbox=False)
+        self.stopping = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def enqueue(to_emails, subject, html_content, text_content=None):
+        """Store an email for delivery; returns (message, error)"""
+        try:
+            message = EmailOutbox(
+                to_emails=','.join(to_emails),
+                subject=subject,
+                html_content=html_content,
+                text_content=text_content,
+                status=EmailOutboxService.PENDING,
+                next_attempt_at=datetime.now()
+            )
+            db.session.add(message)
+            db.session.commit()
+            EmailOutboxService.wakeup.set()
+            return message, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
+    @staticmethod
+    def retry_delay(attempts):
+        """Backoff before the next attempt after ``attempts`` failed ones"""
+        return timedelta(seconds=EMAIL_OUTBOX_RETRY_SECONDS * 2 ** max(attempts - 1, 0))
+
+    def _claim_batch(self):
+        """Due messages claimed by this sender (status moved to sending)"""
+        now = datetime.now()
+        # Release messages claimed by a sender that never finished them
+        EmailOutbox.query.filter(
+            EmailOutbox.status == self.SENDING,
+            EmailOutbox.claimed_at < now - self.CLAIM_TIMEOUT
+        ).update({EmailOutbox.status: self.PENDING}, synchronize_session=False)
+        db.session.commit()
+
+        candidates = EmailOutbox.query.filter(
+            EmailOutbox.status == self.PENDING,
+            EmailOutbox.next_attempt_at <= now
+        ).order_by(EmailOutbox.created_at).limit(EMAIL_OUTBOX_BATCH_SIZE).with_entities(EmailOutbox.id).all()
+        claimed_ids = []
+        for (message_id,) in candidates:
+            claimed = EmailOutbox.query.filter_by(id=message_id, status=self.PENDING).update({
+                EmailOutbox.status: self.SENDING,
+                EmailOutbox.claimed_at: now,
+                EmailOutbox.attempts: EmailOutbox.attempts + 1
+            }, synchronize_session=False)
+            if claimed:
+                claimed_ids.append(message_id)
+        db.session.commit()
+        if not claimed_ids:
+            return []
+        return EmailOutbox.query.filter(EmailOutbox.id.in_(claimed_ids)).order_by(EmailOutbox.created_at).all()
+
+    def _record_failure(self, message, error):
+        message.last_error = error
+        message.claimed_at = None
+        if message.attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+            message.status = self.FAILED
+            print(f"❌ Email {message.id} failed after {message.attempts} attempts:", error)
+        else:
+            message.status = self.PENDING
+            message.next_attempt_at = datetime.now() + self.retry_delay(message.attempts)
+
+    def deliver_pending(self):
+        """Send one batch of due messages; returns (sent, failed) counts"""
+        try:
+            messages = self._claim_batch()
+        except Exception as e:
+            db.session.rollback()
+            print("❌ Failed to claim outbox messages:", str(e))
+            return 0, 0
+        if not messages:
+            return 0, 0
+
+        sent = 0
+        try:
+            server = self.email_service.open_connection()
+        except Exception as e:
+            for message in messages:
+                self._record_failure(message, f"SMTP connection failed: {str(e)}")
+            db.session.commit()
+            return 0, len(messages)
+
+        with server:
+            for i, message in enumerate(messages):
+                try:
+                    server.send_message(self.email_service.build_message(
+                        message.recipients(), message.subject, message.html_content, message.text_content
+                    ))
+                except smtplib.SMTPServerDisconnected as e:
+                    # The session is gone: this message and the rest of the batch go back to the queue
+                    for unsent in messages[i:]:
+                        self._record_failure(unsent, str(e))
+                    db.session.commit()
+                    break
+                except Exception as e:
+                    self._record_failure(message, str(e))
+                else:
+                    message.status = self.SENT
+                    message.sent_at = datetime.now()
+                    message.last_error = None
+                    sent += 1
+                db.session.commit()
+        if sent:
+            print(f"✅ Sent {sent} queued email(s)")
+        return sent, len(messages) - sent
+
+    def _run(self):
+        while not self.stopping.is_set():
+            with self.app.app_context():
+                try:
+                    sent, failed = self.deliver_pending()
+                finally:
+                    db.session.remove()
+            if sent + failed >= EMAIL_OUTBOX_BATCH_SIZE:
+                # Full batch: more messages are probably due
+                continue
+            self.wakeup.wait(EMAIL_OUTBOX_POLL_SECONDS)
+            self.wakeup.clear()
+
+    def start(self):
+        """Start the sender thread"""
+        self.thread = threading.Thread(target=self._run, name='email-outbox', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the sender thread after its current batch"""
+        self.stopping.set()
+        self.wakeup.set()
+
+    @staticmethod
+    def recent(status=None, limit=50):
+        query = EmailOutbox.query
+        if status:
+            query = query.filter_by(status=status)
+        return query.order_by(EmailOutbox.created_at.desc()).limit(limit).all()
@@ -4,17 +4,21 @@ from email.mime.multipart import MIMEMultipart
 from email.header import Header
 from email.utils import formataddr
 from datetime import datetime
+import html
 import os
 from environment import (
     SMTP_SERVER, SMTP_PORT, SMTP_USERNAME,
-    SMTP_PASSWORD, FROM_EMAIL, FROM_NAME
+    SMTP_PASSWORD, FROM_EMAIL, FROM_NAME, SMTP_STARTTLS, SMTP_TIMEOUT,
+    EMAIL_OUTBOX_ENABLED
 )
 
 
 class EmailService:
     """Service for sending email notifications"""
 
-    def __init__(self):
+    def __init__(self, use_outbox=EMAIL_OUTBOX_ENABLED):
+        # Queue messages for EmailOutboxService instead of sending them inline
+        self.use_outbox = use_outbox
         self.smtp_server = SMTP_SERVER
         self.smtp_port = int(SMTP_PORT)
         
@@ -51,40 +55,67 @@ class EmailService:
             .strip()
         )
 
+    def build_message(self, to_emails, subject, html_content, text_content=None):
+        """MIME message with cleaned UTF-8 headers and text / HTML alternatives"""
+        msg = MIMEMultipart('alternative')
+        
+        # Clean headers - be more aggressive
+        subject = self._clean_header(subject)
+        from_name = self._clean_header(self.from_name)
+        from_email = self._clean_header(self.from_email)
+        to_emails = [self._clean_header(e) for e in to_emails]
+
+        # UTF-8 safe headers - simplified approach
+        msg['Subject'] = str(Header(subject, 'utf-8'))
+        # Use simple string formatting instead of formataddr
+        msg['From'] = f"{from_name} <{from_email}>"
+        msg['To'] = ', '.join(to_emails)
+
+        # Clean and attach content
+        if text_content:
+            text_content = text_content.replace('\xa0', ' ')
+            msg.attach(MIMEText(text_content, 'plain', 'utf-8'))
+        
+        html_content = html_content.replace('\xa0', ' ')
+        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+        return msg
+
+    def open_connection(self):
+        """Connected (STARTTLS, logged in when credentials are set) SMTP session; close it with quit()"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=SMTP_TIMEOUT)
+        try:
+            if SMTP_STARTTLS:
+                server.starttls()
+            if self.smtp_username:
+                server.login(self.smtp_username, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
     def send_email(self, to_emails, subject, html_content, text_content=None):
+        """Queue the email in the outbox (when enabled) or send it right away"""
+        if self.use_outbox:
+            from services.email_outbox_service import EmailOutboxService
+            message, error = EmailOutboxService.enqueue(to_emails, subject, html_content, text_content)
+            if error:
+                print("❌ Email could not be queued:", error)
+                return False, error
+            print(f"📥 Email queued ({message.id})")
+            return True, None
+        return self.deliver(to_emails, subject, html_content, text_content)
+
+    def deliver(self, to_emails, subject, html_content, text_content=None):
+        """Send one email over its own SMTP session"""
         try:
-            msg = MIMEMultipart('alternative')
-            
-            # Clean headers - be more aggressive
-            subject = self._clean_header(subject)
-            from_name = self._clean_header(self.from_name)
-            from_email = self._clean_header(self.from_email)
-            to_emails = [self._clean_header(e) for e in to_emails]
-
-            # UTF-8 safe headers - simplified approach
-            msg['Subject'] = str(Header(subject, 'utf-8'))
-            # Use simple string formatting instead of formataddr
-            msg['From'] = f"{from_name} <{from_email}>"
-            msg['To'] = ', '.join(to_emails)
+            msg = self.build_message(to_emails, subject, html_content, text_content)
             
             print("SUBJECT is", msg['Subject'])
             print("FROM is", msg['From'])
             print("TO", msg['To'])
             
-            # Clean and attach content
-            if text_content:
-                text_content = text_content.replace('\xa0', ' ')
-                msg.attach(MIMEText(text_content, 'plain', 'utf-8'))
-                print("Text content", text_content[:100])
-            
-            html_content = html_content.replace('\xa0', ' ')
-            msg.attach(MIMEText(html_content, 'html', 'utf-8'))
-            print("HTML CONTENT", html_content[:100])
-            
             # Send email using send_message (simplest approach)
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
+            with self.open_connection() as server:
                 server.send_message(msg)
             
             print("✅ Email sent successfully")
@@ -136,6 +167,35 @@ This is an automated message from BKK Print Service
 
         total_receipts = summary_data.get('total_receipts', 0)
         total_revenue = summary_data.get('total_revenue', 0)
+        total_tax = summary_data.get('total_tax', 0)
+
+        # (title, first column, rows, row key of the first column, row key of the count column)
+        breakdowns = [
+            ('By Payment Mode', 'Payment Mode', summary_data.get('by_payment_mode', []), 'payment_mode', 'receipts'),
+            ('By Package', 'Package', summary_data.get('by_package', []), 'package', 'receipts'),
+            ('Top Products', 'Product', summary_data.get('top_products', []), 'name', 'quantity'),
+        ]
+        text_breakdowns = ''
+        html_breakdowns = ''
+        for title, label, rows, key, count_key in breakdowns:
+            if not rows:
+                continue
+            count_label = 'Receipts' if count_key == 'receipts' else 'Qty'
+            text_breakdowns += f"\n{title}:\n"
+            html_rows = ''
+            for row in rows:
+                revenue = f"{currency}{row['revenue']:,.2f}"
+                text_breakdowns += f"- {row[key]}: {row[count_key]} {count_label.lower()}, {revenue}\n"
+                html_rows += (
+                    f"<tr><td>{html.escape(str(row[key]))}</td>"
+                    f"<td>{row[count_key]}</td><td>{revenue}</td></tr>"
+                )
+            html_breakdowns += f"""
+            <h3>{title}</h3>
+            <table class="breakdown">
+                <tr><th>{label}</th><th>{count_label}</th><th>Revenue</th></tr>
+                {html_rows}
+            </table>"""
 
         # Plain Text
         text_content = f"""
@@ -146,7 +206,8 @@ Date: {date_str} ({day_name})
 Summary:
 - Total Receipts: {total_receipts}
 - Total Revenue: {currency}{total_revenue:,.2f}
-
+- Total Tax: {currency}{total_tax:,.2f}
+{text_breakdowns}
 ---
 This is an automated message from BKK Print Service
         """
@@ -209,6 +270,16 @@ This is an automated message from BKK Print Service
             color: #666;
             font-size: 12px;
         }}
+        .breakdown {{
+            width: 100%;
+            border-collapse: collapse;
+            margin-bottom: 20px;
+        }}
+        .breakdown th, .breakdown td {{
+            padding: 6px 8px;
+            border-bottom: 1px solid #eee;
+            text-align: left;
+        }}
     </style>
 </head>
 <body>
@@ -233,7 +304,11 @@ This is an automated message from BKK Print Service
                         {currency}{(total_revenue / total_receipts if total_receipts else 0):,.2f}
                     </div>
                 </div>
-            </div>
+                <div class="stat-card">
+                    <div class="stat-label">Total Tax</div>
+                    <div class="stat-value">{currency}{total_tax:,.2f}</div>
+                </div>
+            </div>{html_breakdowns}
         </div>
         <div class="footer">
             <p>
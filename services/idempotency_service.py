@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+import hashlib
+import time
+from models.idempotency_key import IdempotencyKey
+from app import db
+from sqlalchemy.exc import IntegrityError
+from environment import IDEMPOTENCY_KEY_TTL, IDEMPOTENCY_LOCK_SECONDS
+
+
+class IdempotencyService:
+    """Idempotency keys: the first request with a key runs and stores its response, retries replay it.
+
+    The first request inserts a pending row; the primary key makes concurrent
+    retries fail that insert, so only one of them runs the request.
+    """
+
+    PENDING = 'pending'
+    COMPLETED = 'completed'
+
+    # begin() errors
+    IN_PROGRESS = 'in_progress'
+    KEY_REUSED = 'key_reused'
+
+    # Expired keys are deleted at most this often (seconds) per process
+    PURGE_INTERVAL = 600
+    _purged_at = None
+
+    @staticmethod
+    def request_hash(method, path, body):
+        digest = hashlib.sha256(f'{method} {path}\n'.encode())
+        digest.update(body or b'')
+        return digest.hexdigest()
+
+    @staticmethod
+    def begin(user_id, key, request_hash):
+        """Claim ``key`` for a request; returns (stored, error).
+
+        (None, None): the caller owns the key, runs the request and calls complete() or release().
+        (row, None): the request already completed; replay row.response_code / row.response_body.
+        (None, IN_PROGRESS): another request with this key is still running.
+        (None, KEY_REUSED): the key was used with a different request.
+        """
+        IdempotencyService._purge_if_due()
+        now = datetime.now()
+        try:
+            db.session.add(IdempotencyKey(
+                key=key,
+                user_id=user_id,
+                request_hash=request_hash,
+                status=IdempotencyService.PENDING,
+                expires_at=now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)
+            ))
+            db.session.commit()
+            return None, None
+        except IntegrityError:
+            db.session.rollback()
+        try:
+            stored = IdempotencyKey.query.filter_by(key=key, user_id=user_id).first()
+            if stored is None:
+                # Purged between the insert and this read
+                return None, IdempotencyService.IN_PROGRESS
+            if stored.expires_at < now:
+                # Conditional update: of several requests racing for an expired key only one matches
+                taken = IdempotencyKey.query.filter(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.expires_at < now
+                ).update({
+                    IdempotencyKey.request_hash: request_hash,
+                    IdempotencyKey.status: IdempotencyService.PENDING,
+                    IdempotencyKey.response_code: None,
+                    IdempotencyKey.response_body: None,
+                    IdempotencyKey.created_at: now,
+                    IdempotencyKey.expires_at: now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)
+                }, synchronize_session=False)
+                db.session.commit()
+                return None, (None if taken == 1 else IdempotencyService.IN_PROGRESS)
+            if stored.request_hash != request_hash:
+                return None, IdempotencyService.KEY_REUSED
+            if stored.status == IdempotencyService.COMPLETED:
+                return stored, None
+            return None, IdempotencyService.IN_PROGRESS
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
+    @staticmethod
+    def complete(user_id, key, response_code, response_body):
+        """Store the response of the request that owns ``key``"""
+        try:
+            IdempotencyKey.query.filter_by(
+                key=key, user_id=user_id, status=IdempotencyService.PENDING
+            ).update({
+                IdempotencyKey.status: IdempotencyService.COMPLETED,
+                IdempotencyKey.response_code: response_code,
+                IdempotencyKey.response_body: response_body,
+                IdempotencyKey.expires_at: datetime.now() + timedelta(seconds=IDEMPOTENCY_KEY_TTL)
+            }, synchronize_session=False)
+            db.session.commit()
+            return True, None
+        except Exception as e:
+            db.session.rollback()
+            return False, str(e)
+
+    @staticmethod
+    def release(user_id, key):
+        """Drop a pending key whose request failed, so the client can retry it"""
+        try:
+            IdempotencyKey.query.filter_by(
+                key=key, user_id=user_id, status=IdempotencyService.PENDING
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print("⚠️ Failed to release idempotency key:", str(e))
+
+    @staticmethod
+    def purge_expired():
+        """Delete expired keys; returns (deleted, error)"""
+        try:
+            deleted = IdempotencyKey.query.filter(
+                IdempotencyKey.expires_at < datetime.now()
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            return deleted, None
+        except Exception as e:
+            db.session.rollback()
+            return 0, str(e)
+
+    @staticmethod
+    def _purge_if_due():
+        purged_at = IdempotencyService._purged_at
+        if purged_at is not None and time.monotonic() - purged_at < IdempotencyService.PURGE_INTERVAL:
+            return
+        IdempotencyService._purged_at = time.monotonic()
+        deleted, error = IdempotencyService.purge_expired()
+        if error:
+            print("⚠️ Failed to purge idempotency keys:", error)
+        elif deleted:
+            print(f"🧹 Purged {deleted} expired idempotency keys")
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+import os
+import socket
+from models.scheduler_job_run import SchedulerJobRun
+from app import db
+from sqlalchemy.exc import IntegrityError
+
+# Identifies this process in claims; unique across hosts and gunicorn workers
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobClaimService:
+    """Database-backed claims that let exactly one worker process run each scheduled job run.
+
+    The holder keeps its claim alive by renewing the lease while it works; a
+    claim whose lease expired while still running belongs to a dead worker and
+    can be taken over by another one.
+    """
+
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    @staticmethod
+    def claim(job_id, run_key, lease_seconds):
+        """Claim a run; returns (claimed, error). Also takes over a run whose holder stopped renewing"""
+        now = datetime.now()
+        try:
+            db.session.add(SchedulerJobRun(
+                job_id=job_id,
+                run_key=run_key,
+                holder=WORKER_ID,
+                status=JobClaimService.RUNNING,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                started_at=now
+            ))
+            db.session.commit()
+            return True, None
+        except IntegrityError:
+            db.session.rollback()
+        try:
+            # Conditional update: of several workers racing for a stale claim only one matches
+            taken = SchedulerJobRun.query.filter(
+                SchedulerJobRun.job_id == job_id,
+                SchedulerJobRun.run_key == run_key,
+                SchedulerJobRun.status == JobClaimService.RUNNING,
+                SchedulerJobRun.lease_expires_at < now
+            ).update({
+                SchedulerJobRun.holder: WORKER_ID,
+                SchedulerJobRun.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                SchedulerJobRun.attempts: SchedulerJobRun.attempts + 1
+            }, synchronize_session=False)
+            db.session.commit()
+            return taken == 1, None
+        except Exception as e:
+            db.session.rollback()
+            return False, str(e)
+
+    @staticmethod
+    def renew(job_id, run_key, lease_seconds):
+        """Extend this worker's lease on a run; False when the claim was lost"""
+        try:
+            renewed = SchedulerJobRun.query.filter_by(
+                job_id=job_id, run_key=run_key, holder=WORKER_ID, status=JobClaimService.RUNNING
+            ).update({
+                SchedulerJobRun.lease_expires_at: datetime.now() + timedelta(seconds=lease_seconds)
+            }, synchronize_session=False)
+            db.session.commit()
+            return renewed == 1
+        except Exception as e:
+            db.session.rollback()
+            print("⚠️ Failed to renew job lease:", str(e))
+            return False
+
+    @staticmethod
+    def finish(job_id, run_key, error=None):
+        """Mark this worker's run as done (or failed with ``error``)"""
+        try:
+            SchedulerJobRun.query.filter_by(
+                job_id=job_id, run_key=run_key, holder=WORKER_ID
+            ).update({
+                SchedulerJobRun.status: JobClaimService.FAILED if error else JobClaimService.DONE,
+                SchedulerJobRun.finished_at: datetime.now(),
+                SchedulerJobRun.error: error
+            }, synchronize_session=False)
+            db.session.commit()
+            return True, None
+        except Exception as e:
+            db.session.rollback()
+            return False, str(e)
+
+    @staticmethod
+    def stale_runs(job_id):
+        """Run keys of ``job_id`` still marked running whose holder stopped renewing the lease"""
+        rows = SchedulerJobRun.query.filter(
+            SchedulerJobRun.job_id == job_id,
+            SchedulerJobRun.status == JobClaimService.RUNNING,
+            SchedulerJobRun.lease_expires_at < datetime.now()
+        ).with_entities(SchedulerJobRun.run_key).all()
+        return [row.run_key for row in rows]
+
+    @staticmethod
+    def recent_runs(job_id, limit=5):
+        return SchedulerJobRun.query.filter_by(job_id=job_id).order_by(
+            SchedulerJobRun.started_at.desc()
+        ).limit(limit).all()
@@ -0,0 +1,48 @@
+from models.schema_migration import SchemaMigration
+from app import db
+from sqlalchemy.exc import IntegrityError
+
+
+class MigrationService:
+    """Applies the versioned migrations in migrations/ that this database has not seen yet"""
+
+    @staticmethod
+    def applied_versions():
+        return {row.version for row in SchemaMigration.query.all()}
+
+    @staticmethod
+    def pending():
+        from migrations import MIGRATIONS
+        applied = MigrationService.applied_versions()
+        return [migration for migration in MIGRATIONS if migration.VERSION not in applied]
+
+    @staticmethod
+    def stamp():
+        """Record every migration as applied, for a database db.create_all() has just built"""
+        try:
+            for migration in MigrationService.pending():
+                db.session.add(SchemaMigration(version=migration.VERSION, description=migration.DESCRIPTION))
+            db.session.commit()
+        except IntegrityError:
+            # Another worker stamped it first
+            db.session.rollback()
+
+    @staticmethod
+    def upgrade():
+        """Run pending migrations in order; returns (applied versions, error)"""
+        applied = []
+        try:
+            for migration in MigrationService.pending():
+                with db.engine.begin() as connection:
+                    migration.upgrade(connection)
+                try:
+                    db.session.add(SchemaMigration(version=migration.VERSION, description=migration.DESCRIPTION))
+                    db.session.commit()
+                except IntegrityError:
+                    # Another worker applied and recorded it first
+                    db.session.rollback()
+                applied.append(migration.VERSION)
+            return applied, None
+        except Exception as e:
+            db.session.rollback()
+            return applied, str(e)
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from app import bcrypt
+from environment import BCRYPT_LOG_ROUNDS, BCRYPT_WORKERS, BCRYPT_QUEUE_LIMIT
+from utils.metrics import password_hash_rejections
+
+
+class PasswordHasherBusy(Exception):
+    """Raised instead of queueing when the bcrypt pool is full; controllers answer 429"""
+
+    retry_after = 1
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated pool so a burst of logins cannot take the CPU from every request thread.
+
+    At most ``workers`` hashes run at once and ``queue_limit`` more wait for
+    the pool; further calls fail fast with PasswordHasherBusy. With
+    workers=0 bcrypt runs in the calling thread without admission control.
+    """
+
+    def __init__(self, workers=BCRYPT_WORKERS, queue_limit=BCRYPT_QUEUE_LIMIT, log_rounds=BCRYPT_LOG_ROUNDS):
+        self.log_rounds = log_rounds
+        self.executor = None
+        self.slots = None
+        if workers > 0:
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+            self.slots = threading.BoundedSemaphore(workers + queue_limit)
+
+    def _run(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        if not self.slots.acquire(blocking=False):
+            password_hash_rejections.inc()
+            raise PasswordHasherBusy('Too many sign-ins in progress, please retry shortly')
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """bcrypt hash of ``password`` at the configured cost"""
+        return self._run(bcrypt.generate_password_hash, password, self.log_rounds).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        return self._run(bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when the hash was made with another cost than BCRYPT_LOG_ROUNDS"""
+        parts = password_hash.split('$')
+        # $2b$<cost>$<salt and hash>
+        return len(parts) == 4 and parts[2].isdigit() and int(parts[2]) != self.log_rounds
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,84 @@
+from collections import namedtuple
+from flask import g, has_request_context
+from models.user import User
+from app import db
+from utils.cache import build_cache
+from utils.metrics import record_cache_lookup
+from environment import PRINCIPAL_CACHE_TTL, PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_URL
+
+cache = build_cache(PRINCIPAL_CACHE_URL, PRINCIPAL_CACHE_SIZE)
+
+Principal = namedtuple('Principal', ['is_admin', 'deleted', 'token_version'])
+
+
+class PrincipalService:
+    """What authorization needs to know about a user, cached per user id.
+
+    Every authenticated request checks its token against the cached
+    principal: tokens of deleted users, or with a token_version older than
+    the user's, are revoked. UserService invalidates the entry when it
+    changes a user; other workers see the change within PRINCIPAL_CACHE_TTL
+    unless PRINCIPAL_CACHE_URL points them at a shared cache.
+    """
+
+    @staticmethod
+    def _key(user_id):
+        return f'principal:{user_id}'
+
+    @staticmethod
+    def _encode(principal):
+        # Plain string so the same entry works in the in-process and the Redis cache; '' = no such user
+        if principal is None:
+            return ''
+        return f'{int(principal.is_admin)}|{int(principal.deleted)}|{principal.token_version}'
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, bytes):
+            value = value.decode()
+        if not value:
+            return None
+        is_admin, deleted, token_version = value.split('|')
+        return Principal(is_admin == '1', deleted == '1', int(token_version))
+
+    @staticmethod
+    def get(user_id):
+        """Principal of ``user_id`` (None when there is no such user), from the cache when possible"""
+        key = PrincipalService._key(user_id)
+        try:
+            value = cache.get(key)
+        except Exception as e:
+            print("⚠️ Principal cache read failed:", str(e))
+            value = None
+        record_cache_lookup('user_principal', value is not None)
+        if value is not None:
+            return PrincipalService._decode(value)
+
+        row = db.session.query(User.is_admin, User.deleted_at, User.token_version).filter_by(user_id=user_id).first()
+        principal = Principal(bool(row.is_admin), row.deleted_at is not None, row.token_version or 0) if row else None
+        try:
+            cache.set(key, PrincipalService._encode(principal), PRINCIPAL_CACHE_TTL)
+        except Exception as e:
+            print("⚠️ Principal cache write failed:", str(e))
+        return principal
+
+    @staticmethod
+    def invalidate(user_id):
+        try:
+            cache.delete(PrincipalService._key(user_id))
+        except Exception as e:
+            print("⚠️ Principal cache invalidation failed:", str(e))
+
+    @staticmethod
+    def is_token_revoked(jwt_header, jwt_payload):
+        """flask_jwt_extended blocklist check; tokens issued before token_version existed count as version 0"""
+        try:
+            principal = PrincipalService.get(jwt_payload['sub'])
+        except Exception as e:
+            print("❌ Failed to load principal:", str(e))
+            return True
+        if has_request_context():
+            g.principal = principal
+        if principal is None or principal.deleted:
+            return True
+        return jwt_payload.get('token_version', 0) != principal.token_version
@@ -0,0 +1,170 @@
+from bisect import bisect_right
+from collections import namedtuple
+import math
+import threading
+import time
+from models.product import Product
+from models.catalog_version import CatalogVersion
+from app import db
+from sqlalchemy.exc import IntegrityError
+from environment import CATALOG_PROBE_INTERVAL
+from utils.pagination import KeysetPage, decode_cursor, encode_cursor
+from utils.metrics import record_cache_lookup
+
+
+class CatalogProduct(namedtuple('CatalogProduct', ['prod_id', 'name', 'unit_price', 'deleted', 'data'])):
+    """Read-only product snapshot; ``data`` is the product's to_dict() at load time"""
+
+    def to_dict(self):
+        return dict(self.data)
+
+
+class CatalogPage:
+    """Page of catalog products exposing the same attributes as a Flask-SQLAlchemy pagination"""
+
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = math.ceil(total / per_page) if per_page else 0
+        self.has_prev = page > 1
+        self.has_next = page < self.pages
+
+
+class ProductCatalog:
+    """Process-local snapshot of the products table.
+
+    Every reload bumps ``version``. Product writes call bump() before they
+    commit, which increments the catalog version row in the database. Writes
+    made through ProductService refresh the snapshot right away; writes made
+    by other workers are noticed by probing that row at most once per
+    CATALOG_PROBE_INTERVAL.
+    """
+
+    VERSION_NAME = 'products'
+
+    def __init__(self, probe_interval=CATALOG_PROBE_INTERVAL):
+        self.probe_interval = probe_interval
+        self.version = 0
+        self.products = {}
+        self.active = []
+        # Active products ordered by (created_at, prod_id) for cursor pagination, and their sort keys
+        self.by_created = []
+        self.created_keys = []
+        # Database catalog version the snapshot was loaded at
+        self.db_version = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _probe():
+        """Database catalog version; 0 until the first product write"""
+        version = db.session.query(CatalogVersion.version).filter_by(name=ProductCatalog.VERSION_NAME).scalar()
+        return version or 0
+
+    @staticmethod
+    def bump():
+        """Increment the database catalog version in the current transaction (call before committing a product write)"""
+        counter = CatalogVersion.query.filter_by(name=ProductCatalog.VERSION_NAME)
+        if counter.update({CatalogVersion.version: CatalogVersion.version + 1}, synchronize_session=False):
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(CatalogVersion(name=ProductCatalog.VERSION_NAME, version=1))
+        except IntegrityError:
+            # Another worker created the row first
+            counter.update({CatalogVersion.version: CatalogVersion.version + 1}, synchronize_session=False)
+
+    def refresh(self):
+        """Reload every product (deleted ones included) into a new snapshot"""
+        # Read first: a write landing during the load only causes one extra reload
+        db_version = self._probe()
+        rows = Product.query.all()
+        products = {
+            row.prod_id: CatalogProduct(row.prod_id, row.name, row.unit_price, row.is_deleted(), row.to_dict())
+            for row in rows
+        }
+        active = [product for product in products.values() if not product.deleted]
+        by_created = sorted(active, key=self._created_key)
+        with self.lock:
+            self.products = products
+            self.active = active
+            self.by_created = by_created
+            self.created_keys = [self._created_key(product) for product in by_created]
+            self.db_version = db_version
+            self.version += 1
+            self.checked_at = time.monotonic()
+
+    @staticmethod
+    def _created_key(product):
+        return (product.data['created_at'] or '', product.prod_id)
+
+    def ensure_fresh(self):
+        """Load the snapshot, or reload it when the probe shows another worker changed products"""
+        if self.checked_at is None:
+            record_cache_lookup('product_catalog', False)
+            self.refresh()
+            return
+        if time.monotonic() - self.checked_at < self.probe_interval:
+            record_cache_lookup('product_catalog', True)
+            return
+        if self._probe() != self.db_version:
+            record_cache_lookup('product_catalog', False)
+            self.refresh()
+        else:
+            record_cache_lookup('product_catalog', True)
+            self.checked_at = time.monotonic()
+
+    def get(self, prod_id, include_deleted=False):
+        self.ensure_fresh()
+        product = self.products.get(str(prod_id))
+        if product is None or (product.deleted and not include_deleted):
+            return None
+        return product
+
+    def get_many(self, prod_ids):
+        """Active products for ``prod_ids``; reloads once when an id is unknown (e.g. created by another worker)"""
+        self.ensure_fresh()
+        prod_ids = {str(prod_id) for prod_id in prod_ids}
+        if any(prod_id not in self.products for prod_id in prod_ids):
+            self.refresh()
+        products = self.products
+        return {
+            prod_id: products[prod_id]
+            for prod_id in prod_ids
+            if prod_id in products and not products[prod_id].deleted
+        }
+
+    def name(self, prod_id):
+        """Product name for display, including products that were deleted since"""
+        product = self.get(prod_id, include_deleted=True)
+        return product.name if product else None
+
+    def page(self, page=1, per_page=10):
+        """Active products, paginated like Query.paginate(error_out=False)"""
+        self.ensure_fresh()
+        page = max(page, 1)
+        per_page = per_page if per_page > 0 else 20
+        active = self.active
+        start = (page - 1) * per_page
+        return CatalogPage(active[start:start + per_page], page, per_page, len(active))
+
+    def page_after(self, cursor=None, per_page=10):
+        """Active products after ``cursor`` in (created_at, prod_id) order"""
+        self.ensure_fresh()
+        per_page = max(per_page, 1)
+        by_created, keys = self.by_created, self.created_keys
+        start = 0
+        if cursor:
+            created_at, prod_id = decode_cursor(cursor)
+            start = bisect_right(keys, (created_at.isoformat(), prod_id))
+        items = by_created[start:start + per_page]
+        next_cursor = None
+        if start + per_page < len(by_created):
+            last = items[-1]
+            next_cursor = encode_cursor(last.data['created_at'], last.prod_id)
+        return KeysetPage(items, per_page, next_cursor)
+
+
+product_catalog = ProductCatalog()
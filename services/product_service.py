@@ -1,5 +1,6 @@
 from models.product import Product
 from app import db
+from services.product_catalog import product_catalog
 from decimal import Decimal
 
 class ProductService:
@@ -13,24 +14,25 @@ class ProductService:
                 created_by=created_by_id
             )
             db.session.add(product)
+            product_catalog.bump()
             db.session.commit()
+            product_catalog.refresh()
             return product, None
         except Exception as e:
             db.session.rollback()
             return None, str(e)
     
     @staticmethod
-    def get_all_products(page=1, per_page=10):
-        """Get all active products with pagination"""
-        products = Product.query.filter_by(deleted_at=None).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        return products
+    def get_all_products(page=1, per_page=10, cursor=None):
+        """Get all active products with pagination (served from the in-memory catalog)"""
+        if cursor is not None:
+            return product_catalog.page_after(cursor, per_page)
+        return product_catalog.page(page, per_page)
     
     @staticmethod
     def get_product_by_id(prod_id):
-        """Get product by ID"""
-        return Product.query.filter_by(prod_id=prod_id, deleted_at=None).first()
+        """Get product by ID (served from the in-memory catalog)"""
+        return product_catalog.get(prod_id)
     
     @staticmethod
     def update_product(prod_id, update_data):
@@ -44,7 +46,9 @@ class ProductService:
                 if value is not None and hasattr(product, key):
                     setattr(product, key, value)
             
+            product_catalog.bump()
             db.session.commit()
+            product_catalog.refresh()
             return product, None
             
         except Exception as e:
@@ -59,7 +63,9 @@ class ProductService:
             if not product:
                 return False, "Product not found"
             product.soft_delete()
+            product_catalog.bump()
             db.session.commit()
+            product_catalog.refresh()
             return True, None
         except Exception as e:
             db.session.rollback()
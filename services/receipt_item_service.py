@@ -20,7 +20,6 @@ class ReceiptItemService:
             # Build query
             # with app.app_context():
             query = ReceiptItem.query.filter_by(receipt_id=receipt_id)
-            items = query.all()
             if not include_deleted:
                 query = query.filter_by(deleted_at=None)
             # with app.app_context():
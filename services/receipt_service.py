@@ -1,124 +1,240 @@
 from models.receipt import Receipt
 from models.receipt_item import ReceiptItem
 from models.product import Product
+from models.loaders import receipt_detail_options
 from app import db
 from decimal import Decimal
-from environment import TAX_RATE
+from environment import TAX_RATE, RECEIPT_BULK_CHUNK_SIZE
+from services.sales_rollup_service import SalesRollupService
+from services.dashboard_cache import DashboardCacheService
+from services.product_catalog import product_catalog
+from utils.pagination import keyset_paginate
+from sqlalchemy import func, select
+from datetime import date
+import uuid
 
 
 
 class ReceiptService:
     TAX_RATE = Decimal(TAX_RATE)
     @staticmethod
-    def create_receipt(receipt_data, created_by_id,):
-        """Create a new receipt with items"""
-        try:
-            items_data = receipt_data['items']
-            # tax_rate = receipt_data.get('tax_rate', 0)                
-            tax_rate = TAX_RATE
-            recipient_name = receipt_data['recipient_name']
-            recipient_number = receipt_data.get('recipient_number', None)
-            package = receipt_data.get("package","Standard")
-            package_amt = receipt_data.get("package_amt", 0)
-            payment_mode = receipt_data.get('payment_mode', 'CASH')
-            transaction_number = receipt_data.get('transaction_number', None)
-            # Validate products exist and calculate amounts
-            sub_tot_vend_prc = Decimal('0.00')
-            sub_tot_std_prc = Decimal('0.00')
-            receipt_items = []
-            for item_data in items_data:
-                product = Product.query.filter_by(
-                    prod_id=str(item_data['prod_id']), 
-                    deleted_at=None
-                ).first()
-                if not product:
-                    return None, f"Product with ID {item_data['prod_id']} not found"
-                
-                if not item_data['is_free']:
-                    total_vend_price = item_data['vendor_price'] * item_data['quantity']
-                    sub_tot_vend_prc += total_vend_price
-                    item_total = product.unit_price * item_data['quantity']
-                    sub_tot_std_prc += item_total
+    def _build_receipt(receipt_data, created_by_id, products):
+        """Unsaved receipt and its items for ``receipt_data``; returns (receipt, items, error).
+
+        ``products`` maps prod_id to catalog products for every item.
+        """
+        items_data = receipt_data['items']
+        # tax_rate = receipt_data.get('tax_rate', 0)                
+        tax_rate = TAX_RATE
+        recipient_name = receipt_data['recipient_name']
+        recipient_number = receipt_data.get('recipient_number', None)
+        package = receipt_data.get("package","Standard")
+        package_amt = receipt_data.get("package_amt", 0)
+        payment_mode = receipt_data.get('payment_mode', 'CASH')
+        transaction_number = receipt_data.get('transaction_number', None)
+        # Validate products exist and calculate amounts
+        sub_tot_vend_prc = Decimal('0.00')
+        sub_tot_std_prc = Decimal('0.00')
+        receipt_items = []
+        for item_data in items_data:
+            product = products.get(str(item_data['prod_id']))
+            if not product:
+                return None, None, f"Product with ID {item_data['prod_id']} not found"
             
-                    receipt_items.append({
-                        'prod_id': product.prod_id,
-                        'std_price': product.unit_price,
-                        'is_free':item_data['is_free'],
-                        'vendor_price': item_data['vendor_price'],
-                        'quantity': item_data['quantity'],
-                        'sub_tot_vend_prc': sub_tot_vend_prc,
-                        "sub_tot_std_prc": sub_tot_std_prc
-                    })
-                else:
-                    receipt_items.append({
-                        'prod_id': product.prod_id,
-                        'std_price': 0,
-                        'is_free':item_data['is_free'],
-                        'vendor_price': 0,
-                        'quantity': item_data['quantity'],
-                        'sub_tot_vend_prc': 0,
-                        "sub_tot_std_prc": 0
-                    })
+            if not item_data['is_free']:
+                total_vend_price = item_data['vendor_price'] * item_data['quantity']
+                sub_tot_vend_prc += total_vend_price
+                item_total = product.unit_price * item_data['quantity']
+                sub_tot_std_prc += item_total
+        
+                receipt_items.append({
+                    'prod_id': product.prod_id,
+                    'std_price': product.unit_price,
+                    'is_free':item_data['is_free'],
+                    'vendor_price': item_data['vendor_price'],
+                    'quantity': item_data['quantity'],
+                    'sub_tot_vend_prc': sub_tot_vend_prc,
+                    "sub_tot_std_prc": sub_tot_std_prc
+                })
+            else:
+                receipt_items.append({
+                    'prod_id': product.prod_id,
+                    'std_price': 0,
+                    'is_free':item_data['is_free'],
+                    'vendor_price': 0,
+                    'quantity': item_data['quantity'],
+                    'sub_tot_vend_prc': 0,
+                    "sub_tot_std_prc": 0
+                })
 
-            tax_amount = sub_tot_vend_prc * Decimal(str(tax_rate))
-            total_amount = sub_tot_vend_prc + tax_amount
-            if receipt_data["package"]=='Full Package':
-                tax_amount = receipt_data["package_amt"] * Decimal(str(tax_rate))
-                total_amount = receipt_data["package_amt"]
-                
-            # Create receipt
-            receipt = Receipt(
-                recipient_name=recipient_name,
-                recipient_number=recipient_number,
-                package= package,
-                package_amt=package_amt,
-                total_std_amount = sub_tot_std_prc,
-                total_vend_amount=sub_tot_vend_prc,
-                tax_amount=tax_amount,
-                gross_amount=total_amount,
-                payment_mode=payment_mode,
-                transaction_number=transaction_number,
-                created_by=created_by_id
-            )
+        tax_amount = sub_tot_vend_prc * Decimal(str(tax_rate))
+        total_amount = sub_tot_vend_prc + tax_amount
+        if receipt_data["package"]=='Full Package':
+            tax_amount = receipt_data["package_amt"] * Decimal(str(tax_rate))
+            total_amount = receipt_data["package_amt"]
             
-            db.session.add(receipt)
-            db.session.flush()  # Get receipt ID
-            # Create receipt items
+        receipt = Receipt(
+            recipient_name=recipient_name,
+            recipient_number=recipient_number,
+            package= package,
+            package_amt=package_amt,
+            total_std_amount = sub_tot_std_prc,
+            total_vend_amount=sub_tot_vend_prc,
+            tax_amount=tax_amount,
+            gross_amount=total_amount,
+            payment_mode=payment_mode,
+            transaction_number=transaction_number,
+            created_by=created_by_id
+        )
+        # Assigned up front so items can reference the receipt without a flush
+        receipt.receipt_id = str(uuid.uuid4())
+        items = [
+            ReceiptItem(
+                receipt_id=receipt.receipt_id,
+                prod_id=item_data['prod_id'],
+                is_free = item_data['is_free'],
+                std_price = item_data['std_price'],
+                vendor_price = item_data['vendor_price'],
+                quantity=item_data['quantity'],
+                # total_std_price = item_data['sub_tot_std_prc'],
+                # total_vend_price = item_data['sub_tot_std_prc'],
+            )
+            for item_data in receipt_items
+        ]
+        return receipt, items, None
 
-            for item_data in receipt_items:
-                receipt_item = ReceiptItem(
-                    receipt_id=receipt.receipt_id,
-                    prod_id=item_data['prod_id'],
-                    is_free = item_data['is_free'],
-                    std_price = item_data['std_price'],
-                    vendor_price = item_data['vendor_price'],
-                    quantity=item_data['quantity'],
-                    # total_std_price = item_data['sub_tot_std_prc'],
-                    # total_vend_price = item_data['sub_tot_std_prc'],
-                )
-                db.session.add(receipt_item)
+    @staticmethod
+    def create_receipt(receipt_data, created_by_id,):
+        """Create a new receipt with items"""
+        try:
+            # Products come from the in-memory catalog (no per-receipt product query)
+            products = product_catalog.get_many(item_data['prod_id'] for item_data in receipt_data['items'])
+            receipt, created_items, error = ReceiptService._build_receipt(receipt_data, created_by_id, products)
+            if error:
+                return None, error
+            db.session.add(receipt)
+            db.session.flush()  # Get receipt timestamps
+            # Items are flushed together as one batched INSERT
+            db.session.add_all(created_items)
+            # Keep the daily rollup in the same transaction as the receipt
+            SalesRollupService.record_receipt(receipt, created_items)
             db.session.commit()
+            DashboardCacheService.invalidate_live()
             return receipt, None
         except Exception as e:
             db.session.rollback()
             return None, str(e)
-    
+
     @staticmethod
-    def get_all_receipts(current_user_id, page=1, per_page=10):
-        """Get all active receipts with pagination"""
+    def create_receipts_bulk(rows, created_by_id, chunk_size=RECEIPT_BULK_CHUNK_SIZE):
+        """Create many receipts, ``chunk_size`` per transaction; returns (results, error).
+
+        ``rows`` holds validated receipt dicts, or an error string for rows that
+        failed validation. Results follow the order of ``rows``: one dict per row
+        with its ``index``, ``status`` ('created' or 'error') and the receipt's
+        id and number or the error. A chunk that fails to commit is retried
+        row by row so one bad receipt does not reject its neighbours.
+        """
+        try:
+            results = [None] * len(rows)
+            # One catalog lookup for every product referenced in the request
+            products = product_catalog.get_many(
+                item_data['prod_id'] for row in rows if isinstance(row, dict) for item_data in row['items']
+            )
+            built = []
+            for index, row in enumerate(rows):
+                if not isinstance(row, dict):
+                    results[index] = {'index': index, 'status': 'error', 'error': row}
+                    continue
+                receipt, items, error = ReceiptService._build_receipt(row, created_by_id, products)
+                if error:
+                    results[index] = {'index': index, 'status': 'error', 'error': error}
+                    continue
+                # The counter's sale time when it sent one; _save_receipts stamps the rest
+                receipt.created_at = row.get('created_at')
+                built.append((index, receipt, items))
+                # Read now: committing expires the instances
+                results[index] = {
+                    'index': index,
+                    'status': 'created',
+                    'receipt_id': receipt.receipt_id,
+                    'receipt_number': receipt.receipt_number
+                }
+
+            created = 0
+            backdated = False
+            for offset in range(0, len(built), chunk_size):
+                chunk = built[offset:offset + chunk_size]
+                error = ReceiptService._save_receipts(chunk)
+                if error:
+                    # Isolate the failing receipts
+                    outcomes = [(entry, ReceiptService._save_receipts([entry])) for entry in chunk]
+                else:
+                    outcomes = [(entry, None) for entry in chunk]
+                for (index, _, _), row_error in outcomes:
+                    if row_error:
+                        results[index] = {'index': index, 'status': 'error', 'error': row_error}
+                    else:
+                        created += 1
+                        # Server-local like date.today() and the dashboard day windows
+                        sale_time = rows[index].get('created_at')
+                        backdated = backdated or (sale_time is not None and sale_time.date() < date.today())
+            if backdated:
+                # Replayed sales can land in historical ranges
+                DashboardCacheService.invalidate_all()
+            elif created:
+                DashboardCacheService.invalidate_live()
+            return results, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
+    @staticmethod
+    def _save_receipts(entries):
+        """Insert (index, receipt, items) entries and their rollup deltas in one transaction; returns an error or None"""
+        try:
+            # The database clock, as the column defaults use for single receipts
+            now = db.session.scalar(select(func.now()))
+            for _, receipt, items in entries:
+                # Set here rather than by the database so the rollup knows the day without a flush
+                if receipt.created_at is None:
+                    receipt.created_at = now
+                receipt.updated_at = now
+                db.session.add(receipt)
+                db.session.add_all(items)
+            SalesRollupService.record_receipts((receipt, items) for _, receipt, items in entries)
+            db.session.commit()
+            return None
+        except Exception as e:
+            db.session.rollback()
+            # Rolled back objects become transient again and can be retried
+            return str(e)
+
+    @staticmethod
+    def get_all_receipts(current_user_id, page=1, per_page=10, cursor=None):
+        """Get all active receipts, newest first (receipt columns only, items are not loaded).
+
+        Offset pagination by default; passing ``cursor`` (may be '') switches to keyset pagination.
+        """
         qry = Receipt.query.filter_by(deleted_at=None, created_by=current_user_id)
+        if cursor is not None:
+            return keyset_paginate(qry, Receipt.created_at, Receipt.receipt_id, cursor, per_page, descending=True)
         receipts = qry.order_by(Receipt.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
         return receipts
     
     @staticmethod
     def get_receipt_by_id(receipt_id):
         """Get receipt by ID with items"""
-        return Receipt.query.filter_by(receipt_id=receipt_id, deleted_at=None).first()
+        return Receipt.query.options(*receipt_detail_options()).filter_by(
+            receipt_id=receipt_id, deleted_at=None
+        ).first()
     
     @staticmethod
     def get_receipt_by_number(receipt_number):
         """Get receipt by receipt number"""
-        return Receipt.query.filter_by(receipt_number=receipt_number, deleted_at=None).first()
+        return Receipt.query.options(*receipt_detail_options()).filter_by(
+            receipt_number=receipt_number, deleted_at=None
+        ).first()
 
 
     @staticmethod
@@ -198,12 +314,19 @@ class ReceiptService:
             if not receipt:
                 return False, "Receipt not found"
             
+            live_items = [item for item in receipt.receipt_items if not item.is_deleted()]
+            SalesRollupService.remove_receipt(receipt, live_items)
             receipt.soft_delete()
             # Also soft delete receipt items
             for item in receipt.receipt_items:
                 item.soft_delete()
             
             db.session.commit()
+            # Deleting an older receipt also changes closed historical ranges
+            if receipt.created_at.date() < date.today():
+                DashboardCacheService.invalidate_all()
+            else:
+                DashboardCacheService.invalidate_live()
             return True, None
             
         except Exception as e:
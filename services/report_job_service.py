@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import os
+import tempfile
+import time
+import uuid
+from models.report_job import ReportJob
+from app import db
+from services.dashboard_services import DashboardService
+from services.sales_report_ver3 import write_comprehensive_excel_report
+from utils.metrics import observe_job
+from environment import REPORT_WORKERS, REPORT_ARTIFACT_DIR, REPORT_ARTIFACT_TTL, REPORT_JOB_TIMEOUT
+
+
+class ReportJobService:
+    """Builds dashboard Excel reports on a worker pool and keeps the files on disk until they expire.
+
+    Job state lives in the report_jobs table, so any worker can answer polls
+    and downloads for a job another worker runs (given a shared
+    REPORT_ARTIFACT_DIR), and jobs survive restarts. Queued or running jobs
+    older than REPORT_JOB_TIMEOUT were abandoned by a stopped worker and are
+    marked failed; workbook files are swept by age as well as with their job.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    # Seconds between purges of expired jobs and files
+    PURGE_INTERVAL = 60
+
+    def __init__(self, app=None):
+        """Initialize report job service"""
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix='report-job')
+        self.artifact_dir = REPORT_ARTIFACT_DIR or os.path.join(tempfile.gettempdir(), 'dashboard_reports')
+        self.ttl = timedelta(seconds=REPORT_ARTIFACT_TTL)
+        self.timeout = timedelta(seconds=REPORT_JOB_TIMEOUT)
+        self.purged_at = None
+        os.makedirs(self.artifact_dir, exist_ok=True)
+
+    @staticmethod
+    def _day(value):
+        return value.strftime('%Y-%m-%d') if isinstance(value, datetime) else value
+
+    @staticmethod
+    def _key(period, start_date, end_date, package, currency):
+        parts = (period, ReportJobService._day(start_date), ReportJobService._day(end_date), package, currency)
+        return '|'.join('' if part is None else str(part) for part in parts)
+
+    def enqueue(self, start_date, end_date, package, currency, period="today"):
+        """Queue a report, or return the queued/running job for the same parameters"""
+        self._purge_if_due()
+        key = self._key(period, start_date, end_date, package, currency)
+        now = datetime.now()
+        try:
+            active = ReportJob.query.filter(
+                ReportJob.params_key == key,
+                ReportJob.status.in_([self.QUEUED, self.RUNNING]),
+                ReportJob.created_at > now - self.timeout
+            ).order_by(ReportJob.created_at.desc()).first()
+            if active:
+                return dict(active.to_dict(), coalesced=True)
+            job = ReportJob(
+                job_id=uuid.uuid4().hex,
+                params_key=key,
+                status=self.QUEUED,
+                period=period,
+                start_date=self._day(start_date),
+                end_date=self._day(end_date),
+                created_at=now
+            )
+            db.session.add(job)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self.executor.submit(self._run, job.job_id, start_date, end_date, package, currency, period)
+        return dict(job.to_dict(), coalesced=False)
+
+    @observe_job('dashboard_report')
+    def _run(self, job_id, start_date, end_date, package, currency, period):
+        """Worker: aggregate the dashboard data and write the workbook to disk"""
+        path = self.artifact_path(job_id)
+        with self.app.app_context():
+            self._update(job_id, status=self.RUNNING)
+            try:
+                response, _ = DashboardService.build_dashboard_data_sql(start_date, end_date, package, currency, period)
+                if not response["status"]:
+                    raise ValueError(response["message"])
+                write_comprehensive_excel_report(response["data"], currency, path)
+                now = datetime.now()
+                self._update(job_id, status=self.DONE, finished_at=now, expires_at=now + self.ttl)
+            except Exception as e:
+                db.session.rollback()
+                if os.path.exists(path):
+                    os.remove(path)
+                now = datetime.now()
+                self._update(job_id, status=self.FAILED, error=str(e), finished_at=now, expires_at=now + self.ttl)
+
+    def _update(self, job_id, **fields):
+        try:
+            ReportJob.query.filter_by(job_id=job_id).update(fields, synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print("❌ Failed to update report job:", str(e))
+
+    def get_job(self, job_id):
+        """Job status, or None when unknown or expired"""
+        self._purge_if_due()
+        job = db.session.get(ReportJob, job_id)
+        if not job or (job.expires_at and job.expires_at <= datetime.now()):
+            return None
+        return job.to_dict()
+
+    def artifact_path(self, job_id):
+        return os.path.join(self.artifact_dir, f"{job_id}.xlsx")
+
+    def _purge_if_due(self):
+        if self.purged_at is not None and time.monotonic() - self.purged_at < self.PURGE_INTERVAL:
+            return
+        self.purged_at = time.monotonic()
+        self.purge_expired()
+
+    def purge_expired(self):
+        """Fail abandoned jobs, forget expired ones and delete their files and any workbook past its TTL"""
+        now = datetime.now()
+        try:
+            ReportJob.query.filter(
+                ReportJob.status.in_([self.QUEUED, self.RUNNING]),
+                ReportJob.created_at <= now - self.timeout
+            ).update({
+                ReportJob.status: self.FAILED,
+                ReportJob.error: 'Report was interrupted, please request it again',
+                ReportJob.finished_at: now,
+                ReportJob.expires_at: now + self.ttl
+            }, synchronize_session=False)
+            expired = {job_id for job_id, in db.session.query(ReportJob.job_id).filter(ReportJob.expires_at <= now)}
+            if expired:
+                ReportJob.query.filter(ReportJob.job_id.in_(expired)).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print("⚠️ Failed to purge report jobs:", str(e))
+            expired = set()
+        # Files outlive their job row when a worker stopped mid-way or the row was purged elsewhere
+        cutoff = time.time() - self.ttl.total_seconds()
+        for name in os.listdir(self.artifact_dir):
+            if not name.endswith('.xlsx'):
+                continue
+            path = os.path.join(self.artifact_dir, name)
+            try:
+                if name[:-len('.xlsx')] in expired or os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def stop(self):
+        """Stop accepting jobs and cancel the queued ones"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,7 +1,10 @@
 from io import BytesIO
 import base64
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.cell import WriteOnlyCell
+from copy import copy
 from flask import jsonify
 
 
@@ -73,6 +76,10 @@ def add_quantity_and_revenue_sheets(wb, dashboard_data, currency='₿'):
     write_report("Revenue Report", revenue_report, is_currency=True)
 
 
+REPORT_FILENAME = 'dashboard_comprehensive_report.xlsx'
+REPORT_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
 def generate_comprehensive_excel_report(dashboard_data, currency):
     """
     Generate comprehensive Excel report with multiple sheets
@@ -83,6 +90,40 @@ def generate_comprehensive_excel_report(dashboard_data, currency):
     Returns:
         dict with 'blob' (base64 string), 'filename', and 'mimeType'
     """
+    excel_bytes = generate_comprehensive_excel_bytes(dashboard_data, currency)
+    
+    # Convert to base64
+    excel_base64 = base64.b64encode(excel_bytes).decode('utf-8')
+    
+    return {
+        'blob': excel_base64,
+        'filename': REPORT_FILENAME,
+        'mimeType': REPORT_MIMETYPE
+    }
+
+
+def generate_comprehensive_excel_bytes(dashboard_data, currency, write_only=True):
+    """Build the comprehensive Excel report and return the raw .xlsx bytes"""
+    excel_buffer = BytesIO()
+    write_comprehensive_excel_report(dashboard_data, currency, excel_buffer, write_only)
+    return excel_buffer.getvalue()
+
+
+def write_comprehensive_excel_report(dashboard_data, currency, target, write_only=True):
+    """Save the comprehensive Excel report to ``target`` (a path or binary file object).
+
+    ``write_only`` streams rows through an openpyxl write-only workbook with
+    shared named styles; otherwise the full workbook is built in memory.
+    """
+    if write_only:
+        wb = _build_write_only_workbook(dashboard_data, currency)
+    else:
+        wb = _build_in_memory_workbook(dashboard_data, currency)
+    wb.save(target)
+
+
+def _build_in_memory_workbook(dashboard_data, currency):
+    """Comprehensive report built cell by cell on a regular workbook"""
     # Create workbook
     wb = openpyxl.Workbook()
     
@@ -248,29 +289,8 @@ def generate_comprehensive_excel_report(dashboard_data, currency):
     # Generate the detailed sales report from previous code
     ws_sales = wb.create_sheet("Sales Revenue Data", 3)
     
-    # Get sales data grouped by date
-    quantity_report = dashboard_data.get('quantity_report', [])
-    revenue_report = dashboard_data.get('revenue_report', [])
-    
     # Group data by date
-    sales_by_date = {}
-    for qty_entry, rev_entry in zip(quantity_report, revenue_report):
-        date = qty_entry.get('created_at')
-        if date not in sales_by_date:
-            sales_by_date[date] = {}
-        
-        for key, value in qty_entry.items():
-            if key not in ['created_at', 'receipt_number']:
-                if key not in sales_by_date[date]:
-                    sales_by_date[date][key] = {'quantity': 0, 'revenue': 0}
-                sales_by_date[date][key]['quantity'] += value
-                sales_by_date[date][key]['revenue'] += rev_entry.get(key, 0)
-    
-    # Get all unique services
-    all_services = set()
-    for date_data in sales_by_date.values():
-        all_services.update(date_data.keys())
-    services_list = sorted(all_services)
+    sales_by_date, services_list = _sales_by_date(dashboard_data)
     
     # Create headers
     ws_sales['A1'] = 'Date'
@@ -406,20 +426,271 @@ def generate_comprehensive_excel_report(dashboard_data, currency):
         ws_sales.column_dimensions[openpyxl.utils.get_column_letter(i)].width = 14
     
     add_quantity_and_revenue_sheets(wb, dashboard_data, currency='₿')
-    
-    # Save to BytesIO
-    excel_buffer = BytesIO()
-    wb.save(excel_buffer)
-    excel_bytes = excel_buffer.getvalue()
-    
-    # Convert to base64
-    excel_base64 = base64.b64encode(excel_bytes).decode('utf-8')
-    
-    return {
-        'blob': excel_base64,
-        'filename': 'dashboard_comprehensive_report.xlsx',
-        'mimeType': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    return wb
+def _sales_by_date(dashboard_data):
+    """Quantity/revenue per date and service for the "Sales Revenue Data" sheet"""
+    quantity_report = dashboard_data.get('quantity_report', [])
+    revenue_report = dashboard_data.get('revenue_report', [])
+    sales_by_date = {}
+    for qty_entry, rev_entry in zip(quantity_report, revenue_report):
+        date = qty_entry.get('created_at')
+        if date not in sales_by_date:
+            sales_by_date[date] = {}
+        for key, value in qty_entry.items():
+            if key not in ['created_at', 'receipt_number']:
+                if key not in sales_by_date[date]:
+                    sales_by_date[date][key] = {'quantity': 0, 'revenue': 0}
+                sales_by_date[date][key]['quantity'] += value
+                sales_by_date[date][key]['revenue'] += rev_entry.get(key, 0)
+    all_services = set()
+    for date_data in sales_by_date.values():
+        all_services.update(date_data.keys())
+    return sales_by_date, sorted(all_services)
+
+
+class _StyledCells:
+    """WriteOnlyCell factory for the report's shared named styles.
+
+    Each named style is resolved to its style array once, so styling a cell is
+    a copy instead of a lookup in the workbook's style collection.
+    """
+
+    def __init__(self, wb, currency):
+        self.style_arrays = {}
+        for style in _report_styles(currency):
+            wb.add_named_style(style)
+            self.style_arrays[style.name] = style.as_tuple()
+
+    def __call__(self, ws, value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell._style = copy(self.style_arrays[style])
+        return cell
+
+
+def _report_styles(currency):
+    """Named styles used by the write-only report"""
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    subheader_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+    subheader_font = Font(bold=True, size=10)
+    total_fill = PatternFill(start_color="FF6B35", end_color="FF6B35", fill_type="solid")
+    center_align = Alignment(horizontal='center', vertical='center')
+    right_align = Alignment(horizontal='right', vertical='center')
+    money = f'{currency}#,##0'
+    # Quantity / Revenue sheets keep their own currency, as in add_quantity_and_revenue_sheets
+    report_money = '"₿"#,##0.00'
+
+    styles = {
+        'title': dict(font=Font(bold=True, size=14)),
+        'label': dict(font=Font(bold=True), fill=subheader_fill, border=border),
+        'value': dict(border=border, alignment=right_align),
+        'value_money': dict(border=border, alignment=right_align, number_format=money),
+        'header': dict(font=header_font, fill=header_fill, border=border, alignment=center_align),
+        'subheader': dict(font=subheader_font, fill=subheader_fill, border=border, alignment=center_align),
+        'cell': dict(border=border),
+        'date': dict(border=border, alignment=center_align),
+        'number': dict(border=border, alignment=right_align),
+        'quantity': dict(border=border, alignment=right_align, number_format='0'),
+        'money': dict(border=border, alignment=right_align, number_format=money),
+        'price': dict(border=border, alignment=right_align, number_format='₿#,##0.00'),
+        'variance': dict(border=border, alignment=right_align, number_format='0.00"%"'),
+        'variance_high': dict(border=border, alignment=right_align, number_format='0.00"%"',
+                              fill=PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")),
+        'variance_low': dict(border=border, alignment=right_align, number_format='0.00"%"',
+                             fill=PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")),
+        'row_total': dict(border=border, alignment=right_align, number_format=money,
+                          fill=PatternFill(start_color="FFE5CC", end_color="FFE5CC", fill_type="solid")),
+        'total_label': dict(font=subheader_font, fill=subheader_fill, border=border),
+        'total_number': dict(font=subheader_font, fill=subheader_fill, border=border, alignment=right_align),
+        'total_quantity': dict(font=subheader_font, fill=subheader_fill, border=border, alignment=right_align,
+                               number_format='0'),
+        'total_money': dict(font=subheader_font, fill=subheader_fill, border=border, alignment=right_align,
+                            number_format=money),
+        'total_header': dict(font=Font(bold=True, color="FFFFFF", size=11), fill=total_fill, border=border,
+                             alignment=center_align),
+        'grand_total': dict(font=Font(bold=True, color="FFFFFF", size=10), fill=total_fill, border=border,
+                            alignment=right_align, number_format=money),
+        'report_header': dict(font=Font(bold=True), fill=subheader_fill, border=border, alignment=center_align),
+        'report_money': dict(border=border, number_format=report_money),
+        'report_totals': dict(font=Font(bold=True), alignment=Alignment(horizontal='right')),
+        'report_total': dict(font=Font(bold=True), border=border),
+        'report_total_money': dict(font=Font(bold=True), border=border, number_format=report_money),
     }
+    # Unstyled fonts fall back to the workbook default, as on a regular worksheet
+    return [NamedStyle(name=name, **dict({'font': copy(DEFAULT_FONT)}, **attributes))
+            for name, attributes in styles.items()]
+
+
+def _build_write_only_workbook(dashboard_data, currency):
+    """Comprehensive report streamed row by row; widths are computed from the data, not the cells"""
+    wb = openpyxl.Workbook(write_only=True)
+    _styled = _StyledCells(wb, currency)
+
+    # ==================== SHEET 1: Summary ====================
+    ws = wb.create_sheet("Summary")
+    ws.column_dimensions['A'].width = 25
+    ws.column_dimensions['B'].width = 20
+    ws.merged_cells.add('A1:B1')
+    ws.append([_styled(ws, 'Dashboard Summary Report', 'title')])
+    ws.append([])
+    summary_data = [
+        ['Period', dashboard_data.get('period', 'N/A')],
+        ['Growth Trend', dashboard_data.get('growthTrend', 'N/A')],
+        ['Total Products', dashboard_data.get('totalProducts', 0)],
+        ['Unique Products', dashboard_data.get('uniqueProducts', 0)],
+        ['Total Receipts', dashboard_data.get('totalReceipts', 0)],
+        ['Total Revenue (₿)', dashboard_data.get('totalRevenue', 0)],
+        ['Standard Revenue (₿)', dashboard_data.get('totalStdRevenue', 0)],
+        ['Revenue Trend', dashboard_data.get('revenueTrend', 'N/A')],
+        ['Receipts Trend', dashboard_data.get('receiptsTrend', 'N/A')],
+        ['Product Trend', dashboard_data.get('productTrend', 'N/A')],
+        ['Unique Product Trend', dashboard_data.get('uniqueProductTrend', 'N/A')]
+    ]
+    for row, (label, value) in enumerate(summary_data, start=3):
+        ws.append([
+            _styled(ws, label, 'label'),
+            _styled(ws, value, 'value_money' if row in (8, 9) else 'value')
+        ])
+
+    # ==================== SHEET 2: Product Revenue ====================
+    ws = wb.create_sheet("Product Revenue")
+    for column, width in zip('ABC', (28, 15, 15)):
+        ws.column_dimensions[column].width = width
+    ws.append([_styled(ws, header, 'header') for header in ['Product Name', 'Quantity Sold', 'Revenue (₿)']])
+    product_revenue = dashboard_data.get('productRevenue', [])
+    for product in product_revenue:
+        ws.append([
+            _styled(ws, product.get('name', ''), 'cell'),
+            _styled(ws, product.get('quantity', 0), 'number'),
+            _styled(ws, product.get('revenue', 0), 'money')
+        ])
+    total_row = len(product_revenue) + 2
+    ws.append([
+        _styled(ws, 'TOTAL', 'total_label'),
+        _styled(ws, f'=SUM(B2:B{total_row-1})', 'total_number'),
+        _styled(ws, f'=SUM(C2:C{total_row-1})', 'total_money')
+    ])
+
+    # ==================== SHEET 3: Price Comparison ====================
+    ws = wb.create_sheet("Price Comparison")
+    for column, width in zip('ABCDE', (28, 18, 18, 15, 12)):
+        ws.column_dimensions[column].width = width
+    headers = ['Product Name', 'Standard Price (₿)', 'Vendor Price (₿)', 'Difference (₿)', 'Variance %']
+    ws.append([_styled(ws, header, 'header') for header in headers])
+    for product in dashboard_data.get('priceComparison', []):
+        std_price = product.get('std_price', 0)
+        vend_price = product.get('vend_price', 0)
+        variance = ((std_price - vend_price) / std_price * 100) if std_price != 0 else 0
+        variance_style = 'variance_high' if variance > 20 else 'variance_low' if variance < 0 else 'variance'
+        ws.append([
+            _styled(ws, product.get('name', ''), 'cell'),
+            _styled(ws, std_price, 'price'),
+            _styled(ws, vend_price, 'price'),
+            _styled(ws, std_price - vend_price, 'price'),
+            _styled(ws, variance, variance_style)
+        ])
+
+    # ==================== SHEET 4: Sales Revenue Data ====================
+    ws = wb.create_sheet("Sales Revenue Data")
+    sales_by_date, services_list = _sales_by_date(dashboard_data)
+    total_col = 2 + 2 * len(services_list)
+    ws.column_dimensions['A'].width = 15
+    for i in range(2, total_col + 1):
+        ws.column_dimensions[get_column_letter(i)].width = 14
+    ws.merged_cells.add('A1:A2')
+    for col_idx in range(2, total_col, 2):
+        ws.merged_cells.add(f'{get_column_letter(col_idx)}1:{get_column_letter(col_idx + 1)}1')
+    ws.merged_cells.add(f'{get_column_letter(total_col)}1:{get_column_letter(total_col)}2')
+
+    header_row = [_styled(ws, 'Date', 'header')]
+    subheader_row = [None]
+    for service in services_list:
+        header_row += [_styled(ws, service, 'header'), _styled(ws, None, 'cell')]
+        subheader_row += [_styled(ws, 'Quantity', 'subheader'), _styled(ws, 'Revenue', 'subheader')]
+    header_row.append(_styled(ws, 'Total Revenue', 'total_header'))
+    ws.append(header_row)
+    ws.append(subheader_row)
+
+    revenue_cols = [get_column_letter(c) for c in range(3, total_col, 2)]
+    row = 3
+    for date, services in sorted(sales_by_date.items()):
+        cells = [_styled(ws, date, 'date')]
+        for service in services_list:
+            if service in services:
+                cells += [
+                    _styled(ws, services[service]['quantity'], 'quantity'),
+                    _styled(ws, services[service]['revenue'], 'money')
+                ]
+            else:
+                cells += [_styled(ws, None, 'cell'), _styled(ws, None, 'cell')]
+        total_formula = '+'.join([f'{col}{row}' for col in revenue_cols])
+        cells.append(_styled(ws, f'={total_formula}', 'row_total'))
+        ws.append(cells)
+        row += 1
+
+    cells = [_styled(ws, 'TOTAL', 'subheader')]
+    for col_idx in range(2, total_col, 2):
+        qty_col, rev_col = get_column_letter(col_idx), get_column_letter(col_idx + 1)
+        cells += [
+            _styled(ws, f'=SUM({qty_col}3:{qty_col}{row-1})', 'total_quantity'),
+            _styled(ws, f'=SUM({rev_col}3:{rev_col}{row-1})', 'total_money')
+        ]
+    total_letter = get_column_letter(total_col)
+    cells.append(_styled(ws, f'=SUM({total_letter}3:{total_letter}{row-1})', 'grand_total'))
+    ws.append(cells)
+
+    # ==================== SHEETS 5-6: Quantity / Revenue Report ====================
+    _write_only_report_sheet(wb, _styled, "Quantity Report", dashboard_data.get("quantity_report", []))
+    _write_only_report_sheet(wb, _styled, "Revenue Report", dashboard_data.get("revenue_report", []), is_currency=True)
+    return wb
+
+
+def _write_only_report_sheet(wb, _styled, sheet_name, data, is_currency=False):
+    """Streaming counterpart of add_quantity_and_revenue_sheets' write_report"""
+    if not data:
+        return
+    ws = wb.create_sheet(sheet_name)
+    headers = list(data[0].keys())
+    last_row = len(data) + 2
+    fixed = ["receipt_number", "created_at"]
+
+    # Totals row first so the widths below account for it
+    totals = {}
+    for col_num, header in enumerate(headers, 1):
+        if header not in fixed:
+            col_letter = get_column_letter(col_num)
+            totals[header] = f"=SUM({col_letter}2:{col_letter}{last_row-1})"
+    first_total = totals.get(headers[0], "TOTALS")
+
+    for col_num, header in enumerate(headers, 1):
+        max_length = max(len(str(record[header])) if record[header] else 0 for record in data)
+        max_length = max(max_length, len(str(header)), len(str(totals.get(header, ''))))
+        if col_num == 1:
+            max_length = max(max_length, len(first_total))
+        ws.column_dimensions[get_column_letter(col_num)].width = max(max_length + 2, 12)
+
+    ws.append([_styled(ws, header, 'report_header') for header in headers])
+    for record in data:
+        cells = []
+        for header in headers:
+            value = record[header]
+            money = is_currency and isinstance(value, (int, float)) and header not in fixed
+            cells.append(_styled(ws, value, 'report_money' if money else 'cell'))
+        ws.append(cells)
+
+    total_style = 'report_total_money' if is_currency else 'report_total'
+    cells = [_styled(ws, totals[headers[0]], total_style) if headers[0] in totals
+             else _styled(ws, "TOTALS", 'report_totals')]
+    cells += [_styled(ws, totals[header], total_style) if header in totals else None for header in headers[1:]]
+    ws.append(cells)
+
+
 # from io import BytesIO
 # import base64
 # import openpyxl
@@ -0,0 +1,162 @@
+from models.daily_product_sales import DailyProductSales
+from models.receipt import Receipt
+from models.receipt_item import ReceiptItem
+from models.product import Product
+from app import db
+from datetime import datetime, time
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from environment import DASHBOARD_USE_ROLLUP
+from services.dashboard_cache import DashboardCacheService
+
+
+class SalesRollupService:
+    """Maintains and reads the daily_product_sales rollup"""
+
+    KEY_COLUMNS = ('sales_date', 'package', 'prod_id')
+
+    @staticmethod
+    def _receipt_rows(receipt, items, sign=1):
+        """Rollup deltas contributed by one receipt"""
+        sales_date = receipt.created_at.date()
+        return [{
+            'sales_date': sales_date,
+            'package': receipt.package,
+            'prod_id': item.prod_id,
+            'quantity': sign * int(item.quantity),
+            'total_std_price': sign * item.total_std_price,
+            'total_vend_price': sign * item.total_vend_price,
+            'std_price_sum': sign * item.std_price,
+            'vend_price_sum': sign * item.vendor_price,
+            'line_count': sign
+        } for item in items]
+
+    @staticmethod
+    def _upsert(rows):
+        """Add the deltas in ``rows`` to the rollup in a single statement where the dialect allows it"""
+        if not rows:
+            return
+        table = DailyProductSales.__table__
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = insert(table).values(rows)
+            updates = {col: table.c[col] + stmt.excluded[col] for col in DailyProductSales.COUNTERS}
+            updates['updated_at'] = func.now()
+            stmt = stmt.on_conflict_do_update(index_elements=list(SalesRollupService.KEY_COLUMNS), set_=updates)
+            db.session.execute(stmt)
+        elif dialect in ('mysql', 'mariadb'):
+            stmt = mysql.insert(table).values(rows)
+            updates = {col: table.c[col] + stmt.inserted[col] for col in DailyProductSales.COUNTERS}
+            updates['updated_at'] = func.now()
+            db.session.execute(stmt.on_duplicate_key_update(updates))
+        else:
+            for row in rows:
+                key = tuple(row[col] for col in SalesRollupService.KEY_COLUMNS)
+                entry = db.session.get(DailyProductSales, key, with_for_update=True)
+                if entry is None:
+                    db.session.add(DailyProductSales(**row))
+                    continue
+                for col in DailyProductSales.COUNTERS:
+                    setattr(entry, col, getattr(entry, col) + row[col])
+
+    @staticmethod
+    def record_receipt(receipt, items):
+        """Add a new receipt to the rollup (caller commits)"""
+        SalesRollupService._upsert(SalesRollupService._receipt_rows(receipt, items))
+
+    @staticmethod
+    def record_receipts(receipts):
+        """Add many new (receipt, items) pairs to the rollup in one statement (caller commits)"""
+        merged = {}
+        for receipt, items in receipts:
+            for row in SalesRollupService._receipt_rows(receipt, items):
+                key = tuple(row[col] for col in SalesRollupService.KEY_COLUMNS)
+                # One row per key: an upsert may not touch the same row twice
+                if key in merged:
+                    for col in DailyProductSales.COUNTERS:
+                        merged[key][col] += row[col]
+                else:
+                    merged[key] = row
+        SalesRollupService._upsert(list(merged.values()))
+
+    @staticmethod
+    def remove_receipt(receipt, items):
+        """Subtract a deleted receipt from the rollup (caller commits)"""
+        SalesRollupService._upsert(SalesRollupService._receipt_rows(receipt, items, sign=-1))
+
+    @staticmethod
+    def rebuild(start_date=None, end_date=None):
+        """Recompute the rollup from receipts for [start_date, end_date] (whole history by default)"""
+        try:
+            sales_date = func.date(Receipt.created_at)
+            receipt_filters = [Receipt.deleted_at.is_(None), ReceiptItem.deleted_at.is_(None)]
+            delete = DailyProductSales.query
+            if start_date:
+                receipt_filters.append(Receipt.created_at >= datetime.combine(start_date, time.min))
+                delete = delete.filter(DailyProductSales.sales_date >= start_date)
+            if end_date:
+                receipt_filters.append(Receipt.created_at <= datetime.combine(end_date, time.max))
+                delete = delete.filter(DailyProductSales.sales_date <= end_date)
+            delete.delete(synchronize_session=False)
+
+            source = db.session.query(
+                sales_date,
+                Receipt.package,
+                ReceiptItem.prod_id,
+                func.sum(ReceiptItem.quantity),
+                func.sum(ReceiptItem.total_std_price),
+                func.sum(ReceiptItem.total_vend_price),
+                func.sum(ReceiptItem.std_price),
+                func.sum(ReceiptItem.vendor_price),
+                func.count(ReceiptItem.id),
+                func.now()
+            ).join(
+                Receipt, ReceiptItem.receipt_id == Receipt.receipt_id
+            ).filter(*receipt_filters).group_by(sales_date, Receipt.package, ReceiptItem.prod_id)
+            columns = list(SalesRollupService.KEY_COLUMNS) + list(DailyProductSales.COUNTERS) + ['updated_at']
+            result = db.session.execute(
+                DailyProductSales.__table__.insert().from_select(columns, source)
+            )
+            db.session.commit()
+            DashboardCacheService.invalidate_all()
+            return result.rowcount, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
+    @staticmethod
+    def covers(window):
+        """True when the rollup is enabled and the (lower, upper) window falls on day boundaries"""
+        if not DASHBOARD_USE_ROLLUP:
+            return False
+        return all(bound is None or bound.time() == time.min for bound in window)
+
+    @staticmethod
+    def _window_filters(window):
+        lower, upper = window
+        filters = []
+        if lower:
+            filters.append(DailyProductSales.sales_date >= lower.date())
+        if upper:
+            filters.append(DailyProductSales.sales_date < upper.date())
+        return filters
+
+    @staticmethod
+    def get_product_totals(window, exclude_package=None):
+        """Per product name: quantity, vend revenue, std revenue, std unit price sum, vend unit price sum, item lines"""
+        lines = func.sum(DailyProductSales.line_count)
+        query = db.session.query(
+            Product.name,
+            func.sum(DailyProductSales.quantity),
+            func.sum(DailyProductSales.total_vend_price),
+            func.sum(DailyProductSales.total_std_price),
+            func.sum(DailyProductSales.std_price_sum),
+            func.sum(DailyProductSales.vend_price_sum),
+            lines
+        ).join(
+            Product, DailyProductSales.prod_id == Product.prod_id
+        ).filter(*SalesRollupService._window_filters(window))
+        if exclude_package is not None:
+            query = query.filter(DailyProductSales.package != exclude_package)
+        return query.group_by(Product.name).having(lines > 0).all()
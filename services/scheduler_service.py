@@ -2,15 +2,23 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime, timedelta
 from models.receipt import Receipt
+from models.receipt_item import ReceiptItem
+from models.product import Product
 from services.email_service import EmailService
+from services.job_claim_service import JobClaimService
 from app import db
+from sqlalchemy import func
 from environment import CURRENCY
+from utils.metrics import observe_job
 import os
+import threading
 
 
 class SchedulerService:
     """Service for managing scheduled tasks"""
 
+    DAILY_CHECK_JOB = 'daily_receipt_check'
+
     def __init__(self, app=None):
         """Initialize scheduler service"""
         self.scheduler = BackgroundScheduler()
@@ -42,15 +50,79 @@ class SchedulerService:
             os.getenv('ALWAYS_SEND_SUMMARY', 'false').lower() == 'true'
         )
 
-    def check_daily_receipts(self):
-        """Check if receipts were generated today and send alert if none found"""
+        # Every worker process schedules the check; the one that claims a run
+        # holds it for this long and renews it while working
+        self.lease_seconds = int(os.getenv('SCHEDULER_LEASE_SECONDS', 120))
+
+    def run_daily_check(self, run_key=None):
+        """Cron entry point: run the daily check in the one worker that claims this run"""
+        run_key = run_key or datetime.now().strftime('%Y-%m-%d')
+        with self.app.app_context():
+            claimed, error = JobClaimService.claim(
+                self.DAILY_CHECK_JOB, run_key, self.lease_seconds
+            )
+        if error:
+            print(f"❌ Failed to claim {self.DAILY_CHECK_JOB}:", error)
+            return
+        if not claimed:
+            print(
+                f"⏭️ {self.DAILY_CHECK_JOB} for {run_key} "
+                "is handled by another worker"
+            )
+            return
+
+        stop_heartbeat = self._start_heartbeat(run_key)
+        error = None
+        try:
+            error = self.check_daily_receipts(datetime.strptime(run_key, '%Y-%m-%d'))
+        except Exception as e:
+            error = str(e)
+        finally:
+            stop_heartbeat.set()
+            with self.app.app_context():
+                JobClaimService.finish(self.DAILY_CHECK_JOB, run_key, error)
+
+    def _start_heartbeat(self, run_key):
+        """Renew the claim on a run until the returned event is set"""
+        stop = threading.Event()
+
+        def renew():
+            with self.app.app_context():
+                while not stop.wait(self.lease_seconds / 3):
+                    if not JobClaimService.renew(
+                        self.DAILY_CHECK_JOB, run_key, self.lease_seconds
+                    ):
+                        print(f"⚠️ Lost the claim on {self.DAILY_CHECK_JOB} for {run_key}")
+                        return
+
+        threading.Thread(target=renew, name='scheduler-lease', daemon=True).start()
+        return stop
+
+    def recover_stale_runs(self):
+        """Take over runs whose worker died before finishing them"""
+        try:
+            with self.app.app_context():
+                run_keys = JobClaimService.stale_runs(self.DAILY_CHECK_JOB)
+            for run_key in run_keys:
+                print(f"♻️ Taking over {self.DAILY_CHECK_JOB} for {run_key}")
+                self.run_daily_check(run_key)
+        except Exception as e:
+            print("❌ Error in recover_stale_runs:", str(e))
+
+    @observe_job('daily_receipt_check')
+    def check_daily_receipts(self, run_date=None):
+        """Check if receipts were generated today and send alert if none found.
+
+        Returns None on success, otherwise the error, so the run's claim is
+        recorded as failed.
+        """
         try:
             if not self.app:
                 print("❌ App context not available")
-                return
+                return "App context not available"
 
             with self.app.app_context():
-                today = datetime.now()
+                today = run_date or datetime.now()
 
                 # Check if today is a day we should check
                 if today.weekday() not in self.check_days:
@@ -75,13 +147,16 @@ class SchedulerService:
                     hour=23, minute=59, second=59, microsecond=999999
                 )
 
-                receipts = Receipt.query.filter(
+                day_filters = (
                     Receipt.deleted_at.is_(None),
                     Receipt.created_at >= start_of_day,
                     Receipt.created_at <= end_of_day
-                ).all()
+                )
+                has_receipts = db.session.query(
+                    Receipt.query.filter(*day_filters).exists()
+                ).scalar()
 
-                if not receipts:
+                if not has_receipts:
                     print(
                         f"No receipts found for {today.strftime('%Y-%m-%d')}"
                     )
@@ -102,16 +177,18 @@ class SchedulerService:
                             )
                         else:
                             print("❌ Failed to send alert:", error)
+                            return f"Failed to send alert: {error}"
                     else:
                         print("⚠️ No alert recipients configured")
                 else:
-                    print(
-                        f"Found {len(receipts)} receipts for "
-                        f"{today.strftime('%Y-%m-%d')}"
-                    )
+                    print(f"Found receipts for {today.strftime('%Y-%m-%d')}")
 
                     if self.always_send_summary and self.alert_recipients:
-                        summary_data = self._calculate_summary(receipts)
+                        summary_data = self._calculate_summary(day_filters)
+                        print(
+                            f"Summarized {summary_data['total_receipts']} "
+                            "receipts"
+                        )
                         success, error = (
                             self.email_service.send_daily_summary(
                                 self.alert_recipients,
@@ -125,20 +202,79 @@ class SchedulerService:
                             print("✅ Daily summary sent successfully")
                         else:
                             print("❌ Failed to send summary:", error)
+                            return f"Failed to send summary: {error}"
+            return None
 
         except Exception as e:
             print("❌ Error in check_daily_receipts:", str(e))
+            return str(e)
 
-    def _calculate_summary(self, receipts):
-        """Calculate summary statistics from receipts"""
-        total_receipts = len(receipts)
-        total_revenue = sum(
-            float(receipt.gross_amount) for receipt in receipts
-        )
+    def _calculate_summary(self, day_filters, top_products=5):
+        """Summary statistics for the receipts matching ``day_filters``.
+
+        One GROUP BY (payment mode, package) query yields the totals and both
+        breakdowns; a second one ranks the day's products by revenue.
+        """
+        groups = db.session.query(
+            Receipt.payment_mode,
+            Receipt.package,
+            func.count(Receipt.receipt_id),
+            func.coalesce(func.sum(Receipt.gross_amount), 0),
+            func.coalesce(func.sum(Receipt.tax_amount), 0)
+        ).filter(*day_filters).group_by(
+            Receipt.payment_mode, Receipt.package
+        ).all()
+
+        total_receipts = 0
+        total_revenue = 0.0
+        total_tax = 0.0
+        by_payment_mode = {}
+        by_package = {}
+        for payment_mode, package, count, revenue, tax in groups:
+            revenue = float(revenue)
+            total_receipts += count
+            total_revenue += revenue
+            total_tax += float(tax)
+            for breakdown, key in (
+                (by_payment_mode, payment_mode), (by_package, package)
+            ):
+                entry = breakdown.setdefault(key, {'receipts': 0, 'revenue': 0.0})
+                entry['receipts'] += count
+                entry['revenue'] += revenue
+
+        revenue = func.sum(ReceiptItem.total_vend_price)
+        products = db.session.query(
+            Product.name,
+            func.sum(ReceiptItem.quantity),
+            revenue
+        ).select_from(ReceiptItem).join(
+            Receipt, ReceiptItem.receipt_id == Receipt.receipt_id
+        ).join(
+            Product, ReceiptItem.prod_id == Product.prod_id
+        ).filter(
+            ReceiptItem.deleted_at.is_(None), *day_filters
+        ).group_by(Product.prod_id, Product.name).order_by(
+            revenue.desc()
+        ).limit(top_products).all()
+
+        def ranked(breakdown, label):
+            return [
+                {label: key, 'receipts': entry['receipts'], 'revenue': round(entry['revenue'], 2)}
+                for key, entry in sorted(
+                    breakdown.items(), key=lambda item: item[1]['revenue'], reverse=True
+                )
+            ]
 
         return {
             'total_receipts': total_receipts,
-            'total_revenue': total_revenue
+            'total_revenue': round(total_revenue, 2),
+            'total_tax': round(total_tax, 2),
+            'by_payment_mode': ranked(by_payment_mode, 'payment_mode'),
+            'by_package': ranked(by_package, 'package'),
+            'top_products': [
+                {'name': name, 'quantity': int(quantity or 0), 'revenue': round(float(total or 0), 2)}
+                for name, quantity, total in products
+            ]
         }
 
     def start(self):
@@ -151,17 +287,26 @@ class SchedulerService:
             return
 
         self.scheduler.add_job(
-            func=self.check_daily_receipts,
+            func=self.run_daily_check,
             trigger=CronTrigger(
                 hour=self.check_hour,
                 minute=self.check_minute,
                 day_of_week=','.join(map(str, self.check_days))
             ),
-            id='daily_receipt_check',
+            id=self.DAILY_CHECK_JOB,
             name='Check daily receipts and send alerts',
             replace_existing=True
         )
 
+        self.scheduler.add_job(
+            func=self.recover_stale_runs,
+            trigger='interval',
+            seconds=self.lease_seconds,
+            id='recover_stale_runs',
+            name='Take over daily checks abandoned by a dead worker',
+            replace_existing=True
+        )
+
         self.scheduler.start()
         print(
             f"✅ Scheduler started. Daily check scheduled for "
@@ -176,9 +321,9 @@ class SchedulerService:
             print("🛑 Scheduler stopped")
 
     def trigger_check_now(self):
-        """Manually trigger the daily check (for testing)"""
+        """Manually trigger the daily check (for testing); returns the error, if any"""
         print("▶️ Manually triggering daily receipt check...")
-        self.check_daily_receipts()
+        return self.check_daily_receipts()
 
 
 # from apscheduler.schedulers.background import BackgroundScheduler
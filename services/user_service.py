@@ -1,6 +1,9 @@
 from models.user import User
 from app import db
 from sqlalchemy.exc import IntegrityError
+from utils.pagination import keyset_paginate
+from services.password_hasher import PasswordHasherBusy
+from services.principal_service import PrincipalService
 
 class UserService:
     @staticmethod
@@ -22,14 +25,20 @@ class UserService:
         except IntegrityError as e:
             db.session.rollback()
             return None, f"Email already exists -{str(e)}"
+        except PasswordHasherBusy:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
             return None, str(e)
     
     @staticmethod
-    def get_all_users(page=1, per_page=10):
-        """Get all active users with pagination"""
-        users = User.query.filter_by(deleted_at=None).paginate(
+    def get_all_users(page=1, per_page=10, cursor=None):
+        """Get all active users with pagination (keyset on (created_at, user_id) when ``cursor`` is given)"""
+        query = User.query.filter_by(deleted_at=None)
+        if cursor is not None:
+            return keyset_paginate(query, User.created_at, User.user_id, cursor, per_page)
+        users = query.paginate(
             page=page, per_page=per_page, error_out=False
         )
         return users
@@ -47,16 +56,24 @@ class UserService:
             if not user:
                 return None, "User not found"
             
+            # A role change revokes the tokens carrying the old is_admin claim
+            revoke = update_data.get('is_admin') is not None and update_data['is_admin'] != user.is_admin
             for key, value in update_data.items():
                 if value is not None and hasattr(user, key):
                     setattr(user, key, value)
+            if revoke:
+                user.token_version = (user.token_version or 0) + 1
             
             db.session.commit()
+            PrincipalService.invalidate(user_id)
             return user, None
             
         except IntegrityError:
             db.session.rollback()
             return None, "Email already exists"
+        except PasswordHasherBusy:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
             return None, str(e)
@@ -71,6 +88,7 @@ class UserService:
             
             user.soft_delete()
             db.session.commit()
+            PrincipalService.invalidate(user_id)
             return True, None
             
         except Exception as e:
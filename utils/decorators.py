@@ -1,7 +1,8 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import jwt_required, get_jwt
+from flask import Response, jsonify, make_response, request
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from models.user import User
+from services.idempotency_service import IdempotencyService
 
 def admin_required(f):
     @wraps(f)
@@ -14,6 +15,49 @@ def admin_required(f):
     return decorated_function
 
 
+def idempotent(f):
+    """Replay the stored response when a request is retried with the same Idempotency-Key header.
+
+    Goes below @jwt_required(): keys are scoped per user. Only 2xx responses
+    are stored; after any other outcome the key is released so the client can retry.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > 100:
+            return jsonify({'message': 'Idempotency-Key must be at most 100 characters'}), 400
+
+        user_id = get_jwt_identity()
+        request_hash = IdempotencyService.request_hash(request.method, request.path, request.get_data())
+        stored, error = IdempotencyService.begin(user_id, key, request_hash)
+        if error == IdempotencyService.IN_PROGRESS:
+            return jsonify({'message': 'A request with this Idempotency-Key is still in progress'}), 409
+        if error == IdempotencyService.KEY_REUSED:
+            return jsonify({'message': 'Idempotency-Key was already used with a different request'}), 422
+        if error:
+            return jsonify({'message': f'Failed to check Idempotency-Key: {error}'}), 500
+        if stored is not None:
+            response = Response(stored.response_body, status=stored.response_code, mimetype='application/json')
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            IdempotencyService.release(user_id, key)
+            raise
+        if 200 <= response.status_code < 300:
+            _, error = IdempotencyService.complete(user_id, key, response.status_code, response.get_data(as_text=True))
+            if error:
+                print("⚠️ Failed to store idempotent response:", error)
+        else:
+            IdempotencyService.release(user_id, key)
+        return response
+    return decorated_function
+
+
 def validate_json(schema):
     def decorator(f):
         @wraps(f)
@@ -0,0 +1,64 @@
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _default(o):
+    # numpy scalars and arrays, e.g. values pulled out of pandas frames
+    if numpy is not None:
+        if isinstance(o, numpy.generic):
+            return o.item()
+        if isinstance(o, numpy.ndarray):
+            return o.tolist()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding with orjson when it is installed.
+
+    Output types match Flask's default provider (dates as HTTP dates,
+    Decimals and UUIDs as strings, sorted keys, indented in debug) so
+    responses and cached payloads keep their shape; numpy values are also
+    accepted. Non-ASCII text is written as UTF-8 instead of \\u escapes.
+    """
+
+    default = staticmethod(_default)
+
+    # Datetimes go through default() so they stay HTTP dates like with the stdlib encoder
+    OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+               if orjson is not None else 0)
+
+    def _encode(self, obj, indent=False, sort_keys=None):
+        option = self.OPTIONS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj, bool(kwargs.get('indent')), kwargs.get('sort_keys')).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        # orjson already returns bytes, so skip the str round trip of the default provider
+        return self._app.response_class(self._encode(obj, indent) + b'\n', mimetype=self.mimetype)
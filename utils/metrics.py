@@ -0,0 +1,247 @@
+import threading
+import time
+from functools import wraps
+from flask import g, request
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Seconds; shared by request latency, pool checkout wait and job duration histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(self._key(labels), 0)
+
+    def render(self):
+        with self.lock:
+            items = list(self.values.items())
+        return self.header() + [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def render(self):
+        with self.lock:
+            items = list(self.values.items())
+        return self.header() + [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                # Per-bucket (non cumulative) counts, then the sum
+                series = self.values[key] = [[0] * len(self.buckets), 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+
+    def render(self):
+        with self.lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self.values.items()]
+        lines = self.header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format.
+
+    Values are per process: with several workers each one is scraped (or
+    reports) its own series.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        # Callables run before rendering to refresh gauges read from live objects
+        self.collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+request_duration = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by blueprint and route', ('blueprint', 'endpoint', 'method'))
+requests_total = registry.counter(
+    'http_requests_total', 'Requests by blueprint, route and status code', ('blueprint', 'endpoint', 'method', 'status'))
+pool_checkout_wait = registry.histogram(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled database connection')
+pool_checkout_timeouts = registry.counter(
+    'db_pool_checkout_timeouts_total', 'Connection checkouts that gave up waiting for the pool')
+pool_connections = registry.gauge(
+    'db_pool_connections', 'Pool size, checked out and overflow connections, and the overflow limit', ('state',))
+cache_requests = registry.counter(
+    'cache_requests_total', 'Cache lookups by cache and result (hit / miss)', ('cache', 'result'))
+cache_hit_ratio = registry.gauge(
+    'cache_hit_ratio', 'Share of cache lookups served from the cache since startup', ('cache',))
+job_duration = registry.histogram(
+    'scheduler_job_duration_seconds', 'Duration of scheduled and background jobs', ('task',))
+rate_limited_requests = registry.counter(
+    'rate_limited_requests_total', 'Requests answered with 429 by the rate limiter, by rule', ('rule',))
+password_hash_rejections = registry.counter(
+    'password_hash_rejected_total', 'Password hash / check calls rejected because the bcrypt pool was full')
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_checkout_timeouts.inc()
+            raise
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def record_cache_lookup(cache, hit):
+    cache_requests.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def observe_job(task):
+    """Decorator recording the duration of every run of a job under ``task``"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                job_duration.observe(time.perf_counter() - started, task=task)
+        return decorated_function
+    return decorator
+
+
+def _collect_cache_ratios():
+    with cache_requests.lock:
+        totals = {}
+        for (cache, result), count in cache_requests.values.items():
+            hits, lookups = totals.get(cache, (0, 0))
+            totals[cache] = (hits + (count if result == 'hit' else 0), lookups + count)
+    for cache, (hits, lookups) in totals.items():
+        cache_hit_ratio.set(hits / lookups if lookups else 0.0, cache=cache)
+
+
+registry.collectors.append(_collect_cache_ratios)
+
+
+def init_metrics(app, engine):
+    """Time every request per blueprint/route and report the engine's pool usage at scrape time"""
+
+    def collect_pool():
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            pool_connections.set(pool.size(), state='size')
+            pool_connections.set(pool.checkedout(), state='checked_out')
+            pool_connections.set(max(pool.overflow(), 0), state='overflow')
+            pool_connections.set(pool._max_overflow, state='max_overflow')
+
+    registry.collectors.append(collect_pool)
+
+    @app.before_request
+    def start_metrics_timer():
+        g.metrics_started_at = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('metrics_started_at')
+        if started is not None:
+            blueprint = request.blueprint or 'app'
+            # Unmatched paths share one series so scanners cannot blow up the label set
+            endpoint = request.endpoint or 'unmatched'
+            request_duration.observe(time.perf_counter() - started,
+                                     blueprint=blueprint, endpoint=endpoint, method=request.method)
+            requests_total.inc(blueprint=blueprint, endpoint=endpoint, method=request.method,
+                               status=response.status_code)
+        return response
@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+class KeysetPage:
+    """One page of keyset (cursor) pagination"""
+
+    def __init__(self, items, per_page, next_cursor):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.has_next = next_cursor is not None
+
+    def to_dict(self):
+        return {'per_page': self.per_page, 'next_cursor': self.next_cursor, 'has_next': self.has_next}
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor for the (created_at, id) position of a row"""
+    created_at = created_at.isoformat() if isinstance(created_at, datetime) else created_at
+    raw = json.dumps([created_at, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor made by encode_cursor; raises ValueError when malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_paginate(query, created_at_column, id_column, cursor=None, per_page=10, descending=False):
+    """Page ``query`` on (created_at, id) without COUNT or OFFSET.
+
+    ``cursor`` is the next_cursor of the previous page (None or '' for the first page).
+    """
+    per_page = max(per_page, 1)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(or_(
+                created_at_column < created_at,
+                and_(created_at_column == created_at, id_column < row_id)
+            ))
+        else:
+            query = query.filter(or_(
+                created_at_column > created_at,
+                and_(created_at_column == created_at, id_column > row_id)
+            ))
+    if descending:
+        query = query.order_by(created_at_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(created_at_column.asc(), id_column.asc())
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, created_at_column.key), getattr(last, id_column.key))
+    return KeysetPage(items, per_page, next_cursor)
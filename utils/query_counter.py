@@ -0,0 +1,175 @@
+import heapq
+import re
+import threading
+import time
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from environment import SLOW_QUERY_THRESHOLD_MS
+
+# Slowest statements kept per request and per endpoint
+SLOWEST_KEPT = 3
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine while the block is active.
+
+    with QueryCounter(db.engine) as counter:
+        ReceiptService.get_all_receipts(user_id)
+    assert counter.count <= 3
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+        self._started = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+        self._started.append(time.perf_counter())
+
+    def _on_executed(self, conn, cursor, statement, parameters, context, executemany):
+        if self._started:
+            self.duration += time.perf_counter() - self._started.pop()
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        event.listen(self.engine, 'after_cursor_execute', self._on_executed)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        event.remove(self.engine, 'after_cursor_execute', self._on_executed)
+        return False
+
+
+class QueryMetrics:
+    """Per-endpoint totals of requests, SQL statements and DB / request time (seconds)"""
+
+    def __init__(self):
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, query_count, db_time, request_time, slowest):
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    'requests': 0, 'queries': 0, 'max_queries': 0,
+                    'db_time': 0.0, 'max_db_time': 0.0, 'request_time': 0.0,
+                    'slowest': []
+                }
+            stats['requests'] += 1
+            stats['queries'] += query_count
+            stats['max_queries'] = max(stats['max_queries'], query_count)
+            stats['db_time'] += db_time
+            stats['max_db_time'] = max(stats['max_db_time'], db_time)
+            stats['request_time'] += request_time
+            stats['slowest'] = heapq.nlargest(SLOWEST_KEPT, stats['slowest'] + slowest)
+
+    def snapshot(self):
+        """Copy of the totals with per-request averages, keyed by endpoint"""
+        with self.lock:
+            result = {}
+            for endpoint, stats in self.endpoints.items():
+                requests = stats['requests']
+                result[endpoint] = {
+                    'requests': requests,
+                    'queries': stats['queries'],
+                    'avg_queries': round(stats['queries'] / requests, 2),
+                    'max_queries': stats['max_queries'],
+                    'db_time_ms': round(stats['db_time'] * 1000, 2),
+                    'avg_db_time_ms': round(stats['db_time'] * 1000 / requests, 2),
+                    'max_db_time_ms': round(stats['max_db_time'] * 1000, 2),
+                    'avg_request_time_ms': round(stats['request_time'] * 1000 / requests, 2),
+                    'slowest': [
+                        {'ms': round(duration * 1000, 2), 'statement': statement}
+                        for duration, statement in stats['slowest']
+                    ]
+                }
+            return result
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+query_metrics = QueryMetrics()
+
+
+def _one_line(statement):
+    return re.sub(r'\s+', ' ', statement).strip()
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+
+def _record_request_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started_at')
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    if has_app_context():
+        g.query_count = g.get('query_count', 0) + 1
+        g.query_time = g.get('query_time', 0.0) + elapsed
+        slowest = g.setdefault('slowest_queries', [])
+        if len(slowest) < SLOWEST_KEPT or elapsed > slowest[0][0]:
+            entry = (elapsed, _one_line(statement))
+            if len(slowest) < SLOWEST_KEPT:
+                heapq.heappush(slowest, entry)
+            else:
+                heapq.heapreplace(slowest, entry)
+    if SLOW_QUERY_THRESHOLD_MS and elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        where = request.endpoint if has_request_context() else 'background'
+        print(f"⚠️ Slow query ({elapsed * 1000:.1f} ms, {where}): {_one_line(statement)}")
+
+
+def _discard_query_timer(context):
+    started = context.connection.info.get('query_started_at') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def get_request_query_count():
+    """Number of statements issued so far in the current app/request context"""
+    return g.get('query_count', 0) if has_app_context() else 0
+
+
+def get_request_query_time():
+    """Seconds spent executing statements so far in the current app/request context"""
+    return g.get('query_time', 0.0) if has_app_context() else 0.0
+
+
+def init_query_counter(app, engine):
+    """Count and time statements per request.
+
+    Every request is added to ``query_metrics`` under its endpoint; debug
+    responses also carry X-Query-Count and a Server-Timing header.
+    Statements slower than SLOW_QUERY_THRESHOLD_MS are logged.
+    """
+    event.listen(engine, 'before_cursor_execute', _start_query_timer)
+    event.listen(engine, 'after_cursor_execute', _record_request_query)
+    event.listen(engine, 'handle_error', _discard_query_timer)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started_at = time.perf_counter()
+
+    @app.after_request
+    def add_query_count_header(response):
+        started = g.get('request_started_at')
+        if started is None:
+            return response
+        request_time = time.perf_counter() - started
+        query_count = get_request_query_count()
+        query_time = get_request_query_time()
+        query_metrics.record(request.endpoint or 'unmatched', query_count, query_time, request_time,
+                             g.get('slowest_queries', []))
+        if app.debug:
+            response.headers['X-Query-Count'] = str(query_count)
+            response.headers['Server-Timing'] = (
+                f'db;dur={query_time * 1000:.2f};desc="{query_count} queries", '
+                f'app;dur={request_time * 1000:.2f}'
+            )
+        return response
@@ -0,0 +1,173 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from utils.metrics import rate_limited_requests
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Atomic token bucket in Redis; floats go back as strings since Redis truncates Lua numbers to integers
+_REDIS_TAKE = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+def parse_rules(spec):
+    """'auth.login=10/minute,dashboard=60/minute' -> {'auth.login': (10, 60), 'dashboard': (60, 60)}
+
+    Keys are blueprint names or blueprint.endpoint names; periods are
+    second, minute, hour, day or a number of seconds.
+    """
+    rules = {}
+    for part in (spec or '').split(','):
+        if not part.strip():
+            continue
+        target, _, rate = part.partition('=')
+        count, _, period = rate.partition('/')
+        period = period.strip()
+        seconds = PERIODS[period] if period in PERIODS else float(period)
+        rules[target.strip()] = (int(count), seconds)
+    return rules
+
+
+class MemoryBucketStore:
+    """Token buckets in this process; the least recently used buckets are dropped beyond ``max_keys``"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        """Take one token; returns (allowed, tokens left)"""
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated_at = self.buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker through Redis"""
+
+    def __init__(self, client, prefix='backend:ratelimit:'):
+        self.prefix = prefix
+        self.script = client.register_script(_REDIS_TAKE)
+
+    def take(self, key, capacity, rate):
+        allowed, tokens = self.script(keys=[self.prefix + key], args=[capacity, rate, time.time()])
+        return bool(allowed), float(tokens)
+
+
+def build_bucket_store(url=None, max_keys=10000):
+    """Redis backed buckets when ``url`` is set and redis is installed, in-process otherwise"""
+    if url:
+        try:
+            import redis
+            return RedisBucketStore(redis.Redis.from_url(url))
+        except ImportError:
+            print("⚠️ redis package not installed, falling back to in-process rate limits")
+    return MemoryBucketStore(max_keys)
+
+
+class RateLimiter:
+    """Token bucket per client and rule, for the blueprints / endpoints listed in ``rules``.
+
+    A client is the user of a valid access token, otherwise the remote
+    address (the X-Forwarded-For entry ``proxy_hops`` from the right when
+    behind that many proxies). Each bucket holds ``count`` tokens and
+    refills at count / period per second.
+    """
+
+    # Sign-ins are limited per address and account, so cashiers behind one NAT don't share a bucket
+    ACCOUNT_FIELDS = {'auth.login': 'email'}
+
+    def __init__(self, rules, store, proxy_hops=0):
+        self.rules = rules
+        self.store = store
+        self.proxy_hops = proxy_hops
+
+    def rule_for(self, endpoint, blueprint):
+        """(name, (count, period)) of the rule for a request, endpoint rules first"""
+        for name in (endpoint, blueprint):
+            if name and name in self.rules:
+                return name, self.rules[name]
+        return None, None
+
+    def client_address(self):
+        if self.proxy_hops:
+            forwarded = [address.strip() for address in request.headers.get('X-Forwarded-For', '').split(',')
+                         if address.strip()]
+            if len(forwarded) >= self.proxy_hops:
+                return forwarded[-self.proxy_hops]
+        return request.remote_addr or 'unknown'
+
+    def client_key(self, endpoint=None):
+        try:
+            # Signature and expiry only: the endpoint's jwt_required does the revocation (principal) lookup
+            verify_jwt_in_request(optional=True, skip_revocation_check=True)
+            identity = get_jwt_identity()
+        except Exception:
+            # Invalid tokens are rejected by the endpoint itself; limit them by address
+            identity = None
+        if identity:
+            return f'user:{identity}'
+        key = f'ip:{self.client_address()}'
+        field = self.ACCOUNT_FIELDS.get(endpoint)
+        if field:
+            body = request.get_json(silent=True)
+            account = body.get(field) if isinstance(body, dict) else None
+            if isinstance(account, str) and account.strip():
+                key += f':{account.strip().lower()[:255]}'
+        return key
+
+    def check(self):
+        """None when the request may proceed, otherwise the 429 response"""
+        name, rule = self.rule_for(request.endpoint, request.blueprint)
+        if rule is None or request.method == 'OPTIONS':
+            return None
+        count, period = rule
+        rate = count / period
+        try:
+            allowed, tokens = self.store.take(f'{name}:{self.client_key(request.endpoint)}', count, rate)
+        except Exception as e:
+            print("⚠️ Rate limit store unavailable:", str(e))
+            return None
+        if allowed:
+            return None
+        rate_limited_requests.inc(rule=name)
+        retry_after = max(1, math.ceil((1 - tokens) / rate))
+        response = jsonify({'message': f'Too many requests, retry in {retry_after} seconds'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+
+def init_rate_limiter(app, rules, url=None, proxy_hops=0):
+    """Apply ``rules`` to every request before it reaches its view"""
+    limiter = RateLimiter(rules, build_bucket_store(url), proxy_hops)
+    app.before_request(limiter.check)
+    return limiter
@@ -43,17 +43,19 @@ def transform_receipt_data(original_data):
 
 def transform_pre_generated_receipts_list(receipts):
     # Extract and transform the data
+    # Items are not part of the list view, so each receipt is serialized once without them
+    receipt_dicts = [rcpt.to_dict(include_items=False) for rcpt in receipts.items]
     new_data = [{
-        'recpt_id': rcpt.to_dict().get('receipt_id'),
-        'recpt_nmbr': rcpt.to_dict().get('receipt_number'),
-        'rcpnt_nm': rcpt.to_dict().get('recipient_name'),
-        'rcpnt_mob': rcpt.to_dict().get('recipient_number'),
-        'tot_incl_tax': rcpt.to_dict().get('gross_amount'),
-        # 'recpt_dt': rcpt.to_dict().get('created_at', '').split('T')[0],
-        'recpt_dt': rcpt.to_dict().get('created_at', ''),
-        'pmnt_mode': rcpt.to_dict().get('payment_mode', 'CASH'),
-        'trnsaction_nmbr': rcpt.to_dict().get('transaction_number'),
-        } for rcpt in receipts.items]
+        'recpt_id': rcpt.get('receipt_id'),
+        'recpt_nmbr': rcpt.get('receipt_number'),
+        'rcpnt_nm': rcpt.get('recipient_name'),
+        'rcpnt_mob': rcpt.get('recipient_number'),
+        'tot_incl_tax': rcpt.get('gross_amount'),
+        # 'recpt_dt': rcpt.get('created_at', '').split('T')[0],
+        'recpt_dt': rcpt.get('created_at', ''),
+        'pmnt_mode': rcpt.get('payment_mode', 'CASH'),
+        'trnsaction_nmbr': rcpt.get('transaction_number'),
+        } for rcpt in receipt_dicts]
     return new_data
 
 def transform_dashboard_data(receipts_data):
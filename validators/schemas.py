@@ -2,7 +2,7 @@ from pydantic import BaseModel, EmailStr, field_validator, Field
 from typing import Optional, List
 from decimal import Decimal
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timedelta
 
 class UserCreateSchema(BaseModel):
     user_name: str = Field(..., min_length=2, max_length=100)
@@ -101,4 +101,21 @@ class ReceiptCreateSchema(BaseModel):
         prod_ids = [item.prod_id for item in v]
         if len(prod_ids) != len(set(prod_ids)):
             raise ValueError('Duplicate products are not allowed')
-        return v
\ No newline at end of file
+        return v
+
+class ReceiptBulkCreateSchema(ReceiptCreateSchema):
+    # When the counter made the sale (server-local time unless it carries an offset);
+    # replayed receipts keep it instead of the upload time
+    created_at: Optional[datetime] = None
+
+    @field_validator('created_at')
+    @classmethod
+    def validate_created_at(cls, v):
+        if v is None:
+            return v
+        if v.tzinfo is not None:
+            # Stored naive in server-local time like every other receipt timestamp
+            v = v.astimezone().replace(tzinfo=None)
+        if v > datetime.now() + timedelta(minutes=5):
+            raise ValueError('created_at cannot be in the future')
+        return v